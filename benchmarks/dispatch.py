@@ -0,0 +1,115 @@
+"""
+Microbenchmark of the inbound call dispatch.
+
+Compares the per-serial lock dispatch with the lock-free one
+(``LOCK_FREE_DISPATCH = True``) without any network involved:
+
+* latency - mean time of one sequentially awaited call
+* memory - bytes allocated per in-flight call, measured with
+  :mod:`tracemalloc` while ``--concurrency`` calls are blocked
+
+Usage::
+
+    python benchmarks/dispatch.py --calls 100000 --concurrency 10000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from wsrpc_aiohttp import WSRPCBase
+from wsrpc_aiohttp.websocket.common import CallItem, Nothing
+from wsrpc_aiohttp.websocket.tools import awaitable
+
+
+class LockedRPC(WSRPCBase):
+    async def _send(self, **kwargs):
+        pass
+
+    async def _executor(self, func):
+        return await awaitable(func)()
+
+
+class LockFreeRPC(LockedRPC):
+    LOCK_FREE_DISPATCH = True
+
+
+def noop(socket):
+    return None
+
+
+def make_call(serial, method):
+    return CallItem(
+        serial=serial,
+        method=method,
+        result=Nothing(),
+        error=Nothing(),
+        params=None,
+    )
+
+
+async def measure_latency(rpc_class, calls):
+    rpc = rpc_class()
+    rpc_class.add_route("noop", noop)
+
+    started = time.perf_counter()
+    for serial in range(1, calls + 1):
+        await rpc._call_method(make_call(serial, "noop"))
+
+    return (time.perf_counter() - started) / calls
+
+
+async def measure_memory(rpc_class, concurrency):
+    rpc = rpc_class()
+    event = asyncio.Event()
+
+    async def block(socket):
+        await event.wait()
+
+    rpc_class.add_route("block", block)
+
+    items = [make_call(serial, "block") for serial in range(1, concurrency + 1)]
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    tasks = [asyncio.ensure_future(rpc._call_method(item)) for item in items]
+    await asyncio.sleep(0)
+
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    event.set()
+    await asyncio.gather(*tasks)
+
+    return (after - before) / concurrency
+
+
+async def run(arguments):
+    results = {}
+
+    for name, rpc_class in (("locked", LockedRPC), ("lock-free", LockFreeRPC)):
+        latency = await measure_latency(rpc_class, arguments.calls)
+        memory = await measure_memory(rpc_class, arguments.concurrency)
+
+        results[name] = {
+            "latency_us": round(latency * 1e6, 3),
+            "bytes_per_inflight_call": round(memory, 1),
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--concurrency", type=int, default=10000)
+    arguments = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(arguments)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""
+End-to-end load benchmark of the RPC server.
+
+The server is started in a separate process with the selected handler
+class and serializer, the clients are :class:`wsrpc_aiohttp.WSRPCClient`
+instances in the benchmark process:
+
+* calls - ``--clients`` clients perform ``--calls`` calls each keeping
+  ``--concurrency`` calls in flight, reports calls per second and the
+  p50/p99/p999 latency
+* broadcast - time of :func:`WebSocketBase.broadcast` to
+  ``--broadcast-clients`` clients, with and without waiting the replies
+* idle - server memory per idle connection of ``--idle-clients``
+  connections, measured with :mod:`tracemalloc` in the server process
+
+Every scenario runs for every handler (``async``, ``threaded``) and
+serializer (``json``, ``orjson``, ``orjson-str``, ``msgpack``, ``cbor``),
+the serializers which packages are not installed are skipped. ``orjson``
+passes the bytes to the transport as they are, ``orjson-str`` decodes
+them first as it was required before the transport accepted bytes. The
+results are printed or written to ``--output`` as JSON.
+
+Usage::
+
+    python benchmarks/load.py --clients 50 --calls 1000 --output load.json
+    python benchmarks/load.py --handlers async --serializers json orjson
+"""
+
+import argparse
+import asyncio
+import importlib.metadata
+import json
+import math
+import multiprocessing
+import platform
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+import aiohttp
+from aiohttp import web
+
+from wsrpc_aiohttp import (
+    CBORCodec,
+    MsgPackCodec,
+    WebSocketAsync,
+    WebSocketThreaded,
+    WSRPCClient,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+HANDLERS = {"async": WebSocketAsync, "threaded": WebSocketThreaded}
+SERIALIZERS = ("json", "orjson", "orjson-str", "msgpack", "cbor")
+SCENARIOS = ("calls", "broadcast", "idle")
+
+
+def orjson_str_dumps(value, **kwargs):
+    return orjson.dumps(value, **kwargs).decode()
+
+
+def serializer_options(name: str) -> Dict[str, Any]:
+    """Keyword arguments of the handler ``configure`` and of the client
+    for the serializer, raises ``RuntimeError`` when it is unavailable"""
+    if name == "json":
+        return dict(loads=json.loads, dumps=json.dumps)
+    if name in ("orjson", "orjson-str"):
+        if orjson is None:
+            raise RuntimeError("The orjson package is not installed")
+        if name == "orjson-str":
+            return dict(loads=orjson.loads, dumps=orjson_str_dumps)
+        return dict(loads=orjson.loads, dumps=orjson.dumps)
+    if name == "msgpack":
+        return dict(codecs=(MsgPackCodec(),))
+    if name == "cbor":
+        return dict(codecs=(CBORCodec(),))
+    raise ValueError(name)
+
+
+def echo(socket, value=None):
+    return value
+
+
+def noop(socket, **kwargs):
+    return None
+
+
+class BenchClient(WSRPCClient):
+    pass
+
+
+BenchClient.add_route("noop", noop)
+
+
+async def stats(request: web.Request) -> web.Response:
+    handler = request.app["handler"]
+    current, peak = tracemalloc.get_traced_memory()
+    return web.json_response(
+        dict(
+            clients=len(handler.get_clients()),
+            traced=tracemalloc.is_tracing(),
+            memory=current,
+            peak=peak,
+        )
+    )
+
+
+async def trace(request: web.Request) -> web.Response:
+    if request.query.get("enable") == "1":
+        tracemalloc.start()
+    else:
+        tracemalloc.stop()
+    return await stats(request)
+
+
+async def broadcast(request: web.Request) -> web.Response:
+    handler = request.app["handler"]
+    wait_replies = request.query.get("wait_replies") == "1"
+
+    started = time.perf_counter()
+    results = await handler.broadcast("noop", wait_replies=wait_replies)
+    elapsed = time.perf_counter() - started
+
+    errors = sum(isinstance(r, Exception) for r in results or ())
+    return web.json_response(
+        dict(
+            clients=len(handler.get_clients()),
+            seconds=elapsed,
+            errors=errors,
+        )
+    )
+
+
+def serve(handler_name: str, serializer: str, port_queue) -> None:
+    handler = type("BenchHandler", (HANDLERS[handler_name],), {})
+    handler.configure(
+        max_concurrent_requests=None,
+        keepalive_timeout=0,
+        **serializer_options(serializer),
+    )
+    handler.add_route("echo", echo)
+
+    app = web.Application()
+    app["handler"] = handler
+    app.router.add_route("*", "/ws/", handler)
+    app.router.add_get("/stats", stats)
+    app.router.add_post("/trace", trace)
+    app.router.add_post("/broadcast", broadcast)
+
+    async def start() -> None:
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port_queue.put(runner.addresses[0][1])
+        await asyncio.Event().wait()
+
+    asyncio.run(start())
+
+
+class Server:
+    def __init__(self, handler: str, serializer: str):
+        self.handler = handler
+        self.serializer = serializer
+        self.process = None
+        self.url = None
+
+    def __enter__(self) -> "Server":
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        self.process = context.Process(
+            target=serve,
+            args=(self.handler, self.serializer, queue),
+            daemon=True,
+        )
+        self.process.start()
+        self.url = "http://127.0.0.1:{0}".format(queue.get(timeout=30))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.process.terminate()
+        self.process.join()
+
+    async def request(self, method: str, path: str, **params) -> dict:
+        async with aiohttp.ClientSession() as session:
+            async with session.request(
+                method, self.url + path, params=params
+            ) as response:
+                response.raise_for_status()
+                return await response.json()
+
+
+async def connect(server: Server, count: int) -> List[WSRPCClient]:
+    options = serializer_options(server.serializer)
+    clients = [
+        BenchClient(server.url + "/ws/", **options) for _ in range(count)
+    ]
+
+    for idx in range(0, count, 100):
+        await asyncio.gather(*[c.connect() for c in clients[idx : idx + 100]])
+
+    return clients
+
+
+async def disconnect(clients: List[WSRPCClient]) -> None:
+    await asyncio.gather(*[client.close() for client in clients])
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of the sorted values"""
+    if not values:
+        return 0.0
+
+    rank = math.ceil(q / 100 * len(values)) - 1
+    return values[min(max(rank, 0), len(values) - 1)]
+
+
+async def run_calls(server: Server, arguments) -> Dict[str, Any]:
+    clients = await connect(server, arguments.clients)
+    latencies: List[float] = []
+    per_worker = max(arguments.calls // arguments.concurrency, 1)
+
+    async def worker(client: WSRPCClient) -> None:
+        for _ in range(per_worker):
+            started = time.perf_counter()
+            await client.call("echo", value="x" * arguments.payload)
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        # Warm up the connections and the dispatch tables
+        await asyncio.gather(*[c.call("echo") for c in clients])
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *[
+                worker(client)
+                for client in clients
+                for _ in range(arguments.concurrency)
+            ]
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        await disconnect(clients)
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "seconds": round(elapsed, 4),
+        "calls_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1e3, 3),
+            "p99": round(percentile(latencies, 99) * 1e3, 3),
+            "p999": round(percentile(latencies, 99.9) * 1e3, 3),
+            "max": round(latencies[-1] * 1e3, 3),
+        },
+    }
+
+
+async def run_broadcast(server: Server, arguments) -> Dict[str, Any]:
+    clients = await connect(server, arguments.broadcast_clients)
+    results: Dict[str, Any] = {"clients": len(clients)}
+
+    try:
+        for name, wait_replies in (("notify", "0"), ("call", "1")):
+            timings = []
+            for _ in range(arguments.repeat):
+                response = await server.request(
+                    "POST", "/broadcast", wait_replies=wait_replies
+                )
+                timings.append(response["seconds"])
+
+            timings.sort()
+            results[name] = {
+                "best_ms": round(timings[0] * 1e3, 3),
+                "median_ms": round(percentile(timings, 50) * 1e3, 3),
+            }
+    finally:
+        await disconnect(clients)
+
+    return results
+
+
+async def run_idle(server: Server, arguments) -> Dict[str, Any]:
+    before = await server.request("POST", "/trace", enable="1")
+
+    clients = await connect(server, arguments.idle_clients)
+    try:
+        # Let the server finish the handshakes
+        await asyncio.sleep(1)
+        after = await server.request("GET", "/stats")
+    finally:
+        await disconnect(clients)
+        await server.request("POST", "/trace", enable="0")
+
+    return {
+        "clients": after["clients"],
+        "bytes_per_connection": round(
+            (after["memory"] - before["memory"]) / max(after["clients"], 1), 1
+        ),
+    }
+
+
+def package_version():
+    try:
+        return importlib.metadata.version("wsrpc-aiohttp")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+RUNNERS = {"calls": run_calls, "broadcast": run_broadcast, "idle": run_idle}
+
+
+async def run(arguments) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+
+    for handler in arguments.handlers:
+        for serializer in arguments.serializers:
+            key = "{0}/{1}".format(handler, serializer)
+
+            try:
+                serializer_options(serializer)
+            except RuntimeError as e:
+                results[key] = {"skipped": str(e)}
+                continue
+
+            results[key] = {}
+            with Server(handler, serializer) as server:
+                for scenario in arguments.scenarios:
+                    results[key][scenario] = await RUNNERS[scenario](
+                        server, arguments
+                    )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument(
+        "--calls", type=int, default=1000, help="Calls per client"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=10, help="In-flight calls per client"
+    )
+    parser.add_argument(
+        "--payload", type=int, default=16, help="Echoed string length"
+    )
+    parser.add_argument("--broadcast-clients", type=int, default=1000)
+    parser.add_argument("--idle-clients", type=int, default=1000)
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Broadcast repetitions"
+    )
+    parser.add_argument(
+        "--handlers", nargs="+", choices=list(HANDLERS), default=list(HANDLERS)
+    )
+    parser.add_argument(
+        "--serializers", nargs="+", choices=SERIALIZERS, default=SERIALIZERS
+    )
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS
+    )
+    parser.add_argument("--output", help="Write the JSON report to the file")
+    arguments = parser.parse_args()
+
+    report = {
+        "version": package_version(),
+        "python": platform.python_version(),
+        "aiohttp": aiohttp.__version__,
+        "platform": platform.platform(),
+        "arguments": vars(arguments),
+        "results": asyncio.run(run(arguments)),
+    }
+
+    output = json.dumps(report, indent=2)
+
+    if arguments.output:
+        with open(arguments.output, "w") as fp:
+            fp.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
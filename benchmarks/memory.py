@@ -0,0 +1,82 @@
+"""
+Memory footprint of the idle connection handler.
+
+Creates ``--connections`` handler instances for the mocked request,
+without the network and the socket buffers, and measures them with
+:mod:`tracemalloc`:
+
+* bytes per idle connection of every handler class
+* source lines which allocate the most per connection
+* whether the instances are fully slotted (have no ``__dict__``)
+
+The whole server process footprint, socket included, is measured by the
+``idle`` scenario of ``benchmarks/load.py``.
+
+Usage::
+
+    python benchmarks/memory.py --connections 10000 --top 10
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tracemalloc
+
+from aiohttp.test_utils import make_mocked_request
+
+from wsrpc_aiohttp import WebSocketAsync, WebSocketThreaded
+
+HANDLERS = {"async": WebSocketAsync, "threaded": WebSocketThreaded}
+
+
+def measure(handler, connections, top):
+    request = make_mocked_request("GET", "/ws/")
+    # Warm up the class level caches
+    handler(request)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    instances = [handler(request) for _ in range(connections)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = [
+        stat
+        for stat in after.compare_to(before, "lineno")
+        if stat.size_diff > 0
+    ]
+    # The list of the instances is not the part of the connection
+    total = sum(stat.size_diff for stat in stats) - sys.getsizeof(instances)
+
+    return {
+        "bytes_per_connection": round(total / connections, 1),
+        "slotted": not hasattr(instances[0], "__dict__"),
+        "top": [
+            {
+                "line": str(stat.traceback[0]),
+                "bytes": round(stat.size_diff / connections, 1),
+            }
+            for stat in stats[:top]
+        ],
+    }
+
+
+async def run(arguments):
+    return {
+        name: measure(handler, arguments.connections, arguments.top)
+        for name, handler in HANDLERS.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--top", type=int, default=10)
+    arguments = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(arguments)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,12 @@ def download(url: str, dest: Path):
 def tests(session: nox.Session):
     session.run("poetry", "run", "pytest", "--asyncio-mode=auto", "-v", "tests")
 
+@nox.session(python=False)
+def benchmarks(session: nox.Session):
+    # Pass the arguments of benchmarks/load.py after "--", for example
+    # nox -s benchmarks -- --output load.json
+    session.run("poetry", "run", "python", "benchmarks/load.py", *session.posargs)
+
 @nox.session(python=False)
 def docs(session: nox.Session):
     docs = Path("docs")
@@ -25,8 +25,9 @@ def socket_path():
             loads=orjson.loads,
             dumps=lambda x, **kw: orjson.dumps(x, **kw).decode(),
         ),
+        dict(loads=orjson.loads, dumps=orjson.dumps),
     ],
-    ids=["json", "orjson"],
+    ids=["json", "orjson", "orjson-bytes"],
 )
 def application(request, handler, socket_path):
     app = Application()
@@ -47,8 +48,9 @@ async def session(aiohttp_client, application) -> ClientSession:
             loads=orjson.loads,
             dumps=lambda x, **kw: orjson.dumps(x, **kw).decode(),
         ),
+        dict(loads=orjson.loads, dumps=orjson.dumps),
     ],
-    ids=["json", "orjson"],
+    ids=["json", "orjson", "orjson-bytes"],
 )
 async def client(request, session: ClientSession, socket_path) -> WSRPCClient:
     return WSRPCClient(socket_path, session=session, **request.param)
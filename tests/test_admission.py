@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from wsrpc_aiohttp import (
+    ClientException,
+    OverloadPolicy,
+    WebSocketAsync,
+    WSRPCClient,
+)
+from wsrpc_aiohttp.websocket.admission import AdmissionControl
+
+
+class AdmissionHandler(WebSocketAsync):
+    pass
+
+
+@pytest.fixture
+def handler():
+    return AdmissionHandler
+
+
+@pytest.fixture
+def release(event_loop, handler):
+    event = asyncio.Event()
+
+    async def wait_release(_):
+        await event.wait()
+        return True
+
+    handler.add_route("wait_release", wait_release)
+    return event
+
+
+def server_socket(handler) -> WebSocketAsync:
+    (socket,) = handler.get_clients().values()
+    return socket
+
+
+async def test_reject(client: WSRPCClient, handler, release):
+    handler.MAX_CONCURRENT_REQUESTS = 1
+    handler.OVERLOAD_POLICY = OverloadPolicy.REJECT
+
+    async with client:
+        blocked = asyncio.ensure_future(client.proxy.wait_release())
+        await asyncio.sleep(0.1)
+
+        with pytest.raises(ClientException) as e:
+            await client.proxy.wait_release()
+
+        assert e.value.type == "OverloadedError"
+
+        admission = server_socket(handler).admission
+        assert admission.in_flight == 1
+        assert admission.rejected == 1
+
+        release.set()
+        assert await blocked
+        assert admission.in_flight == 0
+
+
+async def test_queue(client: WSRPCClient, handler, release):
+    handler.MAX_CONCURRENT_REQUESTS = 1
+    handler.MAX_QUEUED_REQUESTS = 1
+    handler.OVERLOAD_POLICY = OverloadPolicy.QUEUE
+
+    async with client:
+        running = asyncio.ensure_future(client.proxy.wait_release())
+        queued = asyncio.ensure_future(client.proxy.wait_release())
+        await asyncio.sleep(0.1)
+
+        with pytest.raises(ClientException) as e:
+            await client.proxy.wait_release()
+
+        assert e.value.type == "OverloadedError"
+
+        admission = server_socket(handler).admission
+        assert admission.queue_depth == 1
+        assert admission.queued == 1
+        assert admission.rejected == 1
+
+        release.set()
+        assert await asyncio.gather(running, queued) == [True, True]
+        assert admission.in_flight == 0
+        assert admission.queue_depth == 0
+
+
+async def test_backpressure(client: WSRPCClient, handler, release):
+    handler.MAX_CONCURRENT_REQUESTS = 1
+    handler.MAX_QUEUED_REQUESTS = 1
+    handler.OVERLOAD_POLICY = OverloadPolicy.BACKPRESSURE
+
+    async with client:
+        running = asyncio.ensure_future(client.proxy.wait_release())
+        await asyncio.sleep(0.1)
+
+        # Held until the slot will be released
+        queued = asyncio.ensure_future(client.proxy.wait_release())
+        pong = asyncio.ensure_future(client.proxy.ping())
+
+        done, _ = await asyncio.wait([pong], timeout=0.2)
+        assert not done
+
+        admission = server_socket(handler).admission
+        assert admission.queued == 2
+        assert admission.queue_depth == 2
+        assert admission.rejected == 0
+
+        release.set()
+        assert await asyncio.gather(running, queued) == [True, True]
+        assert await pong == {}
+        assert admission.queue_depth == 0
+
+
+class CallbackClient(WSRPCClient):
+    pass
+
+
+async def answer(socket, value):
+    await asyncio.sleep(0.01)
+    return value
+
+
+CallbackClient.add_route("answer", answer)
+
+
+async def test_backpressure_callbacks(session, socket_path, handler):
+    # Routes calling back the client wait for the replies, which are
+    # read while the calls over the limit are held
+    async def ask(socket: WebSocketAsync, value):
+        return await socket.call("answer", value=value)
+
+    handler.add_route("ask", ask)
+    handler.OVERLOAD_POLICY = OverloadPolicy.BACKPRESSURE
+    calls = handler.MAX_CONCURRENT_REQUESTS + 5
+
+    async with CallbackClient(session.make_url(socket_path)) as client:
+        results = await asyncio.wait_for(
+            asyncio.gather(*[client.proxy.ask(value=i) for i in range(calls)]),
+            timeout=5,
+        )
+
+    assert results == list(range(calls))
+
+
+async def test_wait_queue():
+    admission = AdmissionControl(limit=1, max_queue=1)
+    assert admission.try_acquire()
+
+    first, second = admission.enqueue(), admission.enqueue()
+    assert admission.is_overflowed()
+
+    drained = asyncio.ensure_future(admission.wait_queue())
+    await asyncio.sleep(0)
+    assert not drained.done()
+
+    admission.release()
+    await asyncio.wait_for(drained, timeout=1)
+    assert first.done() and not second.done()
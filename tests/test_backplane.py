@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+from aiohttp.web import Application
+
+from wsrpc_aiohttp import (
+    ClientException,
+    MemoryBackplane,
+    UnixSocketBackplane,
+    WebSocketAsync,
+    WSRPCClient,
+)
+from wsrpc_aiohttp.websocket.backplane import MemoryHub
+
+
+class FirstNode(WebSocketAsync):
+    pass
+
+
+class SecondNode(WebSocketAsync):
+    pass
+
+
+class NodeClient(WSRPCClient):
+    pass
+
+
+def whoami(socket, **kwargs):
+    return socket.name
+
+
+def fail(socket):
+    raise ValueError("failed")
+
+
+NodeClient.add_route("whoami", whoami)
+NodeClient.add_route("fail", fail)
+
+
+async def wait_for(predicate, timeout=5):
+    async def waiter():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(waiter(), timeout)
+
+
+@pytest.fixture(params=["memory", "unix"])
+def backplanes(request, tmp_path):
+    if request.param == "memory":
+        hub = MemoryHub()
+        return (
+            MemoryBackplane(hub, node_id="first"),
+            MemoryBackplane(hub, node_id="second"),
+        )
+
+    return (
+        UnixSocketBackplane(str(tmp_path), node_id="first"),
+        UnixSocketBackplane(str(tmp_path), node_id="second"),
+    )
+
+
+@pytest.fixture
+async def nodes(aiohttp_client, backplanes):
+    clients = []
+    handlers = (FirstNode, SecondNode)
+
+    for handler, backplane in zip(handlers, backplanes):
+        handler.configure()
+        backplane.install(handler)
+        await backplane.start()
+
+        app = Application()
+        app.router.add_route("*", "/ws/", handler)
+        session = await aiohttp_client(app)
+
+        for idx in range(2):
+            client = NodeClient(session.make_url("/ws/"))
+            client.name = "{0}-{1}".format(backplane.node_id, idx)
+            await client.connect()
+            clients.append(client)
+
+    await wait_for(
+        lambda: (
+            all(len(b.clients) == 2 for b in backplanes)
+            and all(len(h.get_clients()) == 2 for h in handlers)
+        )
+    )
+
+    try:
+        yield clients
+    finally:
+        for client in clients:
+            await client.close()
+
+        for backplane in backplanes:
+            await backplane.close()
+            backplane.uninstall()
+
+
+async def test_broadcast(nodes, backplanes):
+    results = await FirstNode.broadcast("whoami")
+    assert sorted(results) == sorted(c.name for c in nodes)
+
+    results = await SecondNode.broadcast("whoami")
+    assert sorted(results) == sorted(c.name for c in nodes)
+
+
+async def test_broadcast_errors(nodes):
+    results = await FirstNode.broadcast("fail")
+
+    assert len(results) == 4
+    for result in results:
+        assert isinstance(result, ClientException)
+        assert result.message == "failed"
+
+
+async def test_call_client(nodes, backplanes):
+    first, second = backplanes
+    remote = next(iter(SecondNode.get_clients().values()))
+    address = remote.address
+
+    assert address == "second/{0}".format(remote.id)
+    assert first.clients[address] == "second"
+
+    name = await FirstNode.call_client(address, "whoami")
+    assert name.startswith("second-")
+
+    with pytest.raises(ClientException):
+        await FirstNode.call_client(address, "fail")
+
+    with pytest.raises(KeyError):
+        await FirstNode.call_client("unknown", "whoami")
+
+    # Local connection is found by its address and by its id
+    local = next(iter(FirstNode.get_clients().values()))
+    assert FirstNode.find_client(local.address) is local
+    assert FirstNode.find_client(str(local.id)) is local
+    assert FirstNode.find_client("second/{0}".format(local.id)) is None
+
+
+async def test_registry(nodes, backplanes):
+    first, second = backplanes
+
+    client = nodes[-1]
+    await client.close()
+
+    await wait_for(lambda: len(first.clients) == 1)
+    assert set(first.clients.values()) == {"second"}
+
+
+async def test_batching(nodes, backplanes):
+    first, _ = backplanes
+    relayed, batches = first.relayed, first.batches
+
+    await asyncio.gather(*[FirstNode.broadcast("whoami") for _ in range(10)])
+
+    assert first.relayed - relayed == 10
+    assert first.batches - batches == 1
+
+
+async def test_node_gone(nodes, backplanes):
+    first, second = backplanes
+
+    await second.close()
+    await wait_for(lambda: not first.clients)
+
+    results = await FirstNode.broadcast("whoami")
+    assert sorted(results) == ["first-0", "first-1"]
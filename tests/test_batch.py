@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientSession
+
+from wsrpc_aiohttp import WebSocketAsync, WSRPCClient
+
+
+class CoalescingHandler(WebSocketAsync):
+    COALESCE_FRAMES = True
+
+
+class CoalescingClient(WSRPCClient):
+    COALESCE_FRAMES = True
+
+
+@pytest.fixture
+def handler():
+    return CoalescingHandler
+
+
+def echo(_, value):
+    return value
+
+
+async def test_batch_frame(client: WSRPCClient, handler, event_loop):
+    handler.add_route("echo", echo)
+
+    async with client:
+        futures = [
+            client._pending_calls.create(serial, event_loop)
+            for serial in (1001, 1003, 1005)
+        ]
+
+        await client.socket.send_json(
+            [
+                {"id": 1001, "method": "echo", "params": {"value": 1}},
+                {"id": 1003, "method": "echo", "params": {"value": 2}},
+                {"id": 1005, "method": "ping", "params": {"value": 3}},
+            ]
+        )
+
+        results = await asyncio.wait_for(asyncio.gather(*futures), timeout=5)
+        assert results == [1, 2, {"value": 3}]
+
+
+async def test_coalesced_frames(
+    session: ClientSession, handler, socket_path, monkeypatch
+):
+    handler.add_route("echo", echo)
+    frames = []
+
+    async with CoalescingClient(socket_path, session=session) as client:
+        write_frame = client._write_frame
+
+        async def counting_write_frame(frame):
+            # Skip replies to the keepalive pings
+            if "echo" in frame:
+                frames.append(frame)
+            return await write_frame(frame)
+
+        monkeypatch.setattr(client, "_write_frame", counting_write_frame)
+
+        results = await asyncio.gather(
+            *[client.proxy.echo(value=i) for i in range(10)]
+        )
+
+        assert results == list(range(10))
+        assert len(frames) == 1
@@ -0,0 +1,161 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import ClientSession
+
+from wsrpc_aiohttp import WebSocketAsync, WSRPCClient
+
+CLIENTS = 5
+
+
+class BroadcastHandler(WebSocketAsync):
+    pass
+
+
+@pytest.fixture
+def handler():
+    return BroadcastHandler
+
+
+@pytest.fixture
+async def clients(session: ClientSession, socket_path, handler):
+    received = []
+
+    def on_broadcast(socket, **kwargs):
+        received.append(kwargs)
+        return kwargs["value"] * 2
+
+    # Every client owns the session, because it will be closed together
+    # with the client
+    clients = [
+        WSRPCClient(session.make_url(socket_path)) for _ in range(CLIENTS)
+    ]
+
+    for client in clients:
+        client.add_route("on_broadcast", on_broadcast)
+        await client.connect()
+
+    while len(handler.get_clients()) < CLIENTS:
+        await asyncio.sleep(0.01)
+
+    yield received
+
+    for client in clients:
+        await client.close()
+
+
+async def test_broadcast_replies(clients, handler):
+    responses = []
+
+    results = await handler.broadcast(
+        "on_broadcast",
+        callback=lambda client, future: responses.append(future.result()),
+        value=21,
+        chunk_size=2,
+    )
+
+    assert results == [42] * CLIENTS
+    assert responses == [42] * CLIENTS
+    assert clients == [{"value": 21}] * CLIENTS
+
+    for socket in handler.get_clients().values():
+        assert not socket._pending_calls
+
+
+async def test_broadcast_no_wait(clients, handler):
+    assert (
+        await handler.broadcast("on_broadcast", wait_replies=False, value=1)
+        is None
+    )
+
+    while len(clients) < CLIENTS:
+        await asyncio.sleep(0.01)
+
+    assert clients == [{"value": 1}] * CLIENTS
+
+
+async def test_broadcast_encodes_once(clients, handler, monkeypatch):
+    calls = []
+
+    def dumps(value, **kwargs):
+        calls.append(value)
+        return json.dumps(value, **kwargs)
+
+    for socket in handler.get_clients().values():
+        monkeypatch.setattr(socket, "_json_dumps", dumps)
+
+    await handler.broadcast("on_broadcast", value=2)
+
+    assert calls == [{"method": "on_broadcast", "params": {"value": 2}}]
+
+
+async def test_broadcast_slow_client(clients, handler, monkeypatch):
+    sockets = list(handler.get_clients().values())
+    slow = sockets[0]
+    unblock = asyncio.Event()
+    write_frame = slow._write_frame
+
+    async def blocked_write(frame):
+        await unblock.wait()
+        await write_frame(frame)
+
+    monkeypatch.setattr(slow, "_write_frame", blocked_write)
+
+    task = handler.broadcast("on_broadcast", value=3)
+
+    # The other clients are called while the first one does not read
+    await asyncio.wait_for(_wait_received(clients, CLIENTS - 1), timeout=5)
+    assert not task.done()
+
+    unblock.set()
+    assert await asyncio.wait_for(task, timeout=5) == [6] * CLIENTS
+
+
+async def test_broadcast_raise_cleanup(clients, handler, monkeypatch):
+    sockets = list(handler.get_clients().values())
+
+    async def broken_write(frame):
+        raise ConnectionResetError("broken")
+
+    monkeypatch.setattr(sockets[0], "_write_frame", broken_write)
+
+    with pytest.raises(ConnectionResetError):
+        await handler.broadcast(
+            "on_broadcast", return_exceptions=False, value=4
+        )
+
+    for socket in sockets:
+        assert not socket._pending_calls
+
+
+async def test_broadcast_register_failure(clients, handler, monkeypatch):
+    sockets = list(handler.get_clients().values())
+    failed = []
+
+    broken = sockets[0]._pending_calls
+    original = type(broken).create
+
+    def create(self, serial, loop):
+        if self is broken:
+            raise RuntimeError("closing")
+        return original(self, serial, loop)
+
+    monkeypatch.setattr(type(broken), "create", create)
+
+    results = await handler.broadcast(
+        "on_broadcast",
+        callback=lambda client, future: failed.append(client),
+        value=5,
+    )
+
+    # The client which could not be called is not silently skipped
+    assert len(results) == CLIENTS
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == [10] * (CLIENTS - 1)
+    assert failed[0] is sockets[0]
+
+
+async def _wait_received(received, count):
+    while len(received) < count:
+        await asyncio.sleep(0.01)
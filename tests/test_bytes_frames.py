@@ -0,0 +1,62 @@
+import json
+
+import aiohttp
+import orjson
+import pytest
+
+from wsrpc_aiohttp import WebSocketAsync, WSRPCClient
+
+
+class BytesHandler(WebSocketAsync):
+    pass
+
+
+class BinaryJSONClient(WSRPCClient):
+    JSON_BINARY_FRAMES = True
+
+
+@pytest.fixture
+def handler():
+    return BytesHandler
+
+
+def memoryview_dumps(value, **kwargs):
+    return memoryview(orjson.dumps(value, **kwargs))
+
+
+@pytest.mark.parametrize("dumps", [orjson.dumps, memoryview_dumps])
+async def test_text_frame(session, handler, socket_path, dumps):
+    handler.JSON_DUMPS = staticmethod(dumps)
+
+    async with session.ws_connect(socket_path) as ws:
+        await ws.send_str(json.dumps(dict(id=1, method="ping", params={})))
+
+        message = await ws.receive(timeout=1)
+        assert message.type == aiohttp.WSMsgType.TEXT
+        assert json.loads(message.data) == dict(id=1, result={})
+
+
+async def test_inbound_binary_json(session, socket_path):
+    async with session.ws_connect(socket_path) as ws:
+        await ws.send_bytes(orjson.dumps(dict(id=1, method="ping")))
+
+        message = await ws.receive(timeout=1)
+        assert message.type == aiohttp.WSMsgType.TEXT
+        assert json.loads(message.data) == dict(id=1, result={})
+
+
+async def test_binary_json_frames(session, handler, socket_path):
+    handler.JSON_DUMPS = staticmethod(orjson.dumps)
+    handler.JSON_BINARY_FRAMES = True
+
+    try:
+        client = BinaryJSONClient(
+            session.make_url(socket_path),
+            loads=orjson.loads,
+            dumps=orjson.dumps,
+        )
+
+        async with client:
+            assert await client.proxy.ping(value=1) == {"value": 1}
+    finally:
+        handler.JSON_BINARY_FRAMES = False
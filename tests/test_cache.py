@@ -0,0 +1,180 @@
+import pytest
+
+from wsrpc_aiohttp import (
+    ClientException,
+    Metrics,
+    RouteScope,
+    WebSocketAsync,
+    WebSocketRoute,
+    WSRPCClient,
+    decorators,
+)
+from wsrpc_aiohttp.websocket.cache import CachePolicy, ResultCache, make_key
+
+
+class CachedHandler(WebSocketAsync):
+    __slots__ = ()
+
+    # Counter of the encoded replies
+    encoded_results = 0
+
+    def _encode(self, payload):
+        if "result" in payload:
+            CachedHandler.encoded_results += 1
+        return super()._encode(payload)
+
+
+@pytest.fixture
+def handler():
+    CachedHandler._RESULT_CACHES.pop(CachedHandler, None)
+    return CachedHandler
+
+
+CALLS = []
+
+
+@decorators.cached(ttl=60, maxsize=2)
+def lookup(socket, key):
+    CALLS.append(key)
+    return {"key": key, "calls": len(CALLS)}
+
+
+@decorators.cached()
+def failing(socket):
+    CALLS.append("failing")
+    raise ValueError("failed")
+
+
+class Config(WebSocketRoute):
+    __scope__ = RouteScope.SINGLETON
+
+    @decorators.cached(ttl=60)
+    async def get(self, socket, name):
+        CALLS.append(name)
+        return name.upper()
+
+
+CachedHandler.add_route("lookup", lookup)
+CachedHandler.add_route("failing", failing)
+CachedHandler.add_route("config", Config)
+
+
+@pytest.fixture(autouse=True)
+def calls():
+    CALLS.clear()
+    return CALLS
+
+
+def test_make_key():
+    assert make_key((), {}) == ""
+    assert make_key((), {"a": 1, "b": 2}) == make_key((), {"b": 2, "a": 1})
+    assert make_key((1,), {}) != make_key((), {"a": 1})
+    assert make_key((object(),), {}) is None
+
+
+def test_result_cache():
+    cache = ResultCache(CachePolicy(ttl=10, maxsize=2))
+
+    assert cache.get("a", 0) is None
+    cache.put("a", 1, 0)
+    cache.put("b", 2, 0)
+
+    assert cache.get("a", 1).result == 1
+    # "b" is the least recently used one
+    cache.put("c", 3, 1)
+    assert cache.get("b", 1) is None
+    assert len(cache) == 2
+
+    # Expired
+    assert cache.get("a", 10) is None
+    assert cache.get("c", 10.5) is not None
+
+    assert cache.hits == 2
+    assert cache.misses == 3
+
+    cache.invalidate("c")
+    assert cache.get("c", 0) is None
+    cache.invalidate()
+    assert not len(cache)
+
+
+async def test_cached(client: WSRPCClient, handler, calls):
+    async with client:
+        first = await client.proxy.lookup(key="a")
+        assert await client.proxy.lookup(key="a") == first
+        assert calls == ["a"]
+
+        assert await client.proxy.lookup(key="b") != first
+        assert calls == ["a", "b"]
+
+        cache = handler.get_result_cache("lookup")
+        assert cache.hits == 1
+        assert cache.misses == 2
+
+
+async def test_shared_by_connections(session, socket_path, handler, calls):
+    first = WSRPCClient(session.make_url(socket_path))
+    second = WSRPCClient(session.make_url(socket_path))
+
+    async with first, second:
+        assert await first.call("config.get", name="x") == "X"
+        assert await second.call("config.get", name="x") == "X"
+        assert calls == ["x"]
+
+
+async def test_invalidate(client: WSRPCClient, handler, calls):
+    async with client:
+        await client.proxy.lookup(key="a")
+        await client.proxy.lookup(key="b")
+
+        handler.invalidate_cache("lookup", key="a")
+        await client.proxy.lookup(key="a")
+        await client.proxy.lookup(key="b")
+        assert calls == ["a", "b", "a"]
+
+        handler.invalidate_cache("lookup")
+        await client.proxy.lookup(key="b")
+        assert calls == ["a", "b", "a", "b"]
+
+
+async def test_errors_not_cached(client: WSRPCClient, calls):
+    async with client:
+        for _ in range(2):
+            with pytest.raises(ClientException):
+                await client.proxy.failing()
+
+    assert calls == ["failing", "failing"]
+
+
+async def test_cache_metrics(client: WSRPCClient, handler):
+    metrics = Metrics().install(handler)
+
+    try:
+        async with client:
+            for _ in range(3):
+                await client.proxy.lookup(key="a")
+
+        assert metrics.methods["lookup"].cache_hits == 2
+        assert metrics.methods["lookup"].cache_misses == 1
+
+        output = metrics.render()
+        assert (
+            'wsrpc_cache_lookups_total{method="lookup",result="hit"} 2'
+            in output
+        )
+        # Hits are not executed, so not counted as the calls
+        assert metrics.methods["lookup"].success == 1
+    finally:
+        metrics.uninstall(handler)
+
+
+async def test_hit_skips_encoding(client: WSRPCClient, handler):
+    async with client:
+        await client.proxy.lookup(key="a")
+        encoded = handler.encoded_results
+
+        for _ in range(3):
+            assert (await client.proxy.lookup(key="a"))["key"] == "a"
+
+        # The cached reply template is reused with the new serial
+        assert handler.encoded_results == encoded
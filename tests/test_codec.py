@@ -0,0 +1,62 @@
+import pytest
+from aiohttp import ClientSession
+
+from wsrpc_aiohttp import (
+    CBORCodec,
+    MsgPackCodec,
+    WebSocketAsync,
+    WSRPCClient,
+)
+
+pytest.importorskip("msgpack")
+pytest.importorskip("cbor2")
+
+
+class CodecHandler(WebSocketAsync):
+    pass
+
+
+@pytest.fixture
+def handler():
+    return CodecHandler
+
+
+@pytest.fixture(params=[MsgPackCodec, CBORCodec], ids=["msgpack", "cbor"])
+def codec(request):
+    return request.param()
+
+
+def get_bytes(_, size):
+    return b"\xff" * size
+
+
+async def test_negotiation(
+    session: ClientSession, handler, socket_path, codec
+):
+    handler.CODECS = (MsgPackCodec(), CBORCodec())
+    handler.add_route("get_bytes", get_bytes)
+
+    async with WSRPCClient(
+        socket_path, session=session, codecs=[codec]
+    ) as client:
+        assert client.codec is not None
+        assert client.codec.name == codec.name
+
+        (socket,) = handler.get_clients().values()
+        assert socket.codec.name == codec.name
+
+        # bytes are not base64 encoded
+        assert await client.proxy.get_bytes(size=16) == b"\xff" * 16
+        assert await client.proxy.ping(data=b"\x00") == {"data": b"\x00"}
+
+
+async def test_fallback_to_json(
+    session: ClientSession, handler, socket_path, codec
+):
+    handler.CODECS = ()
+
+    async with WSRPCClient(
+        socket_path, session=session, codecs=[codec]
+    ) as client:
+        assert client.codec is None
+        assert await client.proxy.ping(pong=1) == {"pong": 1}
@@ -0,0 +1,104 @@
+import pytest
+
+from wsrpc_aiohttp import (
+    ClientException,
+    PrefixRoute,
+    WebSocketAsync,
+    WebSocketRoute,
+    WSRPCClient,
+    decorators,
+)
+
+
+class DispatchHandler(WebSocketAsync):
+    pass
+
+
+class Storage(WebSocketRoute):
+    def init(self):
+        self.data = {}
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def get(self, key):
+        return self.data[key]
+
+    @decorators.noproxy
+    def masked(self):
+        return "secret"
+
+
+class Prefixed(PrefixRoute):
+    def rpc_echo(self, value):
+        return value
+
+
+class Counter(WebSocketRoute):
+    def get(self, key):
+        return 0
+
+
+def function_route(socket, value):
+    return value
+
+
+@pytest.fixture
+def handler():
+    DispatchHandler.add_route("storage", Storage)
+    DispatchHandler.add_route("prefixed", Prefixed)
+    DispatchHandler.add_route("function", function_route)
+    return DispatchHandler
+
+
+def test_dispatch_table(handler):
+    table = handler.get_dispatch_table()
+
+    assert table["storage"].method == "init"
+    assert table["storage.get"].route == "storage"
+    assert "storage.masked" not in table
+
+    assert table["prefixed.echo"].method == "echo"
+    assert "prefixed.rpc_echo" not in table
+
+    assert table["function"].callee is function_route
+    assert table["function"].inject_socket
+
+    handler.remove_route("function")
+    assert "function" not in handler.get_dispatch_table()
+
+
+async def test_bound_methods_cache(
+    client: WSRPCClient, handler, monkeypatch
+):
+    async with client:
+        await client.proxy.storage()
+        await client.proxy.storage.set(key="foo", value="bar")
+
+        (socket,) = handler.get_clients().values()
+        assert "storage.set" in socket._bound
+
+        def resolver(func_name):
+            raise AssertionError("Resolver must not be called")
+
+        monkeypatch.setattr(socket, "resolver", resolver)
+
+        assert await client.proxy.storage.get(key="foo") == "bar"
+        assert await client.proxy.prefixed.echo(value=1) == 1
+        assert await client.proxy.function(value=2) == 2
+
+
+async def test_route_changes_on_live_connection(client: WSRPCClient, handler):
+    async with client:
+        await client.proxy.storage()
+        await client.proxy.storage.set(key="foo", value="bar")
+        assert await client.proxy.storage.get(key="foo") == "bar"
+
+        handler.remove_route("storage")
+
+        with pytest.raises(ClientException):
+            await client.proxy.storage.get(key="foo")
+
+        # The replaced route is not served by the old instance
+        handler.add_route("storage", Counter)
+        assert await client.proxy.storage.get(key="foo") == 0
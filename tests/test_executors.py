@@ -0,0 +1,149 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from wsrpc_aiohttp import (
+    ClientException,
+    InlineExecutor,
+    ProcessExecutor,
+    ThreadExecutor,
+    WebSocketRoute,
+    WebSocketThreaded,
+    WSRPCClient,
+)
+
+
+class ExecutorHandler(WebSocketThreaded):
+    EXECUTOR = InlineExecutor()
+
+
+@pytest.fixture
+def handler():
+    return ExecutorHandler
+
+
+def thread_name(_):
+    return threading.current_thread().name
+
+
+def get_pid():
+    return os.getpid()
+
+
+def slow(_, seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class Reports(WebSocketRoute):
+    __executor__ = ThreadExecutor(max_workers=1, thread_name_prefix="reports")
+
+    def thread_name(self):
+        return threading.current_thread().name
+
+
+async def test_handler_executor(client: WSRPCClient, handler):
+    handler.add_route("thread_name", thread_name)
+
+    async with client:
+        assert await client.proxy.thread_name() == "MainThread"
+
+
+async def test_route_class_executor(client: WSRPCClient, handler):
+    handler.add_route("reports", Reports)
+
+    async with client:
+        name = await client.proxy.reports.thread_name()
+        assert name.startswith("reports")
+
+
+async def test_thread_executor_limits(client: WSRPCClient, handler):
+    executor = ThreadExecutor(max_workers=1, max_queue=1)
+    handler.add_route("slow", slow, executor=executor)
+
+    try:
+        async with client:
+            first = asyncio.ensure_future(client.proxy.slow(seconds=0.2))
+            second = asyncio.ensure_future(client.proxy.slow(seconds=0.1))
+            await asyncio.sleep(0.05)
+
+            assert executor.in_flight == 1
+            assert executor.queue_depth == 1
+
+            with pytest.raises(ClientException) as e:
+                await client.proxy.slow(seconds=0)
+
+            assert e.value.type == "OverloadedError"
+            assert await asyncio.gather(first, second) == [0.2, 0.1]
+            assert executor.completed == 2
+            assert executor.admission.queued == 1
+            assert executor.admission.rejected == 1
+    finally:
+        executor.shutdown()
+
+
+async def test_process_executor(client: WSRPCClient, handler):
+    executor = ProcessExecutor(max_workers=1)
+    handler.add_route("get_pid", get_pid, executor=executor)
+
+    try:
+        async with client:
+            assert await client.proxy.get_pid() != os.getpid()
+    finally:
+        executor.shutdown()
+
+
+class ProcessReports(WebSocketRoute):
+    __executor__ = ProcessExecutor(max_workers=1)
+
+    def get_pid(self):
+        return os.getpid()
+
+
+def test_process_executor_route_class(handler):
+    with pytest.raises(TypeError):
+        handler.add_route("in_process", Reports, executor=ProcessExecutor())
+
+    with pytest.raises(TypeError):
+        handler.add_route("in_process", ProcessReports)
+
+    assert "in_process" not in handler.get_routes()
+
+
+class LateReports(WebSocketRoute):
+    def thread_name(self):
+        return threading.current_thread().name
+
+
+async def test_late_executor_configuration(client: WSRPCClient, handler):
+    handler.add_route("late", LateReports)
+    executor = ThreadExecutor(max_workers=1, thread_name_prefix="late")
+
+    try:
+        async with client:
+            assert await client.proxy.late.thread_name() == "MainThread"
+
+            # The executor set after the first call is not stale
+            LateReports.__executor__ = executor
+            name = await client.proxy.late.thread_name()
+            assert name.startswith("late")
+
+            # Nor is it unchecked
+            LateReports.__executor__ = ProcessExecutor()
+            with pytest.raises(ClientException) as e:
+                await client.proxy.late.thread_name()
+            assert e.value.type == "TypeError"
+
+            del LateReports.__executor__
+            handler.EXECUTOR = ProcessExecutor()
+            with pytest.raises(ClientException) as e:
+                await client.proxy.late.thread_name()
+            assert e.value.type == "TypeError"
+    finally:
+        handler.EXECUTOR = InlineExecutor()
+        LateReports.__executor__ = None
+        handler.remove_route("late")
+        executor.shutdown()
@@ -0,0 +1,113 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from wsrpc_aiohttp import KeepaliveMode, Metrics, WebSocketAsync, WSRPCClient
+from wsrpc_aiohttp.websocket.keepalive import KeepaliveScheduler
+
+
+class KeepaliveHandler(WebSocketAsync):
+    pass
+
+
+@pytest.fixture
+def handler():
+    return KeepaliveHandler
+
+
+@pytest.fixture
+def metrics(handler):
+    metrics = Metrics()
+    metrics.install(handler)
+
+    try:
+        yield metrics
+    finally:
+        metrics.uninstall(handler)
+
+
+class Connection:
+    def __init__(self):
+        self.visits = []
+
+    def _keepalive(self, now):
+        self.visits.append(now)
+
+
+async def test_scheduler():
+    scheduler = KeepaliveScheduler(0.2, buckets=4)
+    connections = [Connection() for _ in range(20)]
+
+    for connection in connections:
+        scheduler.add(connection)
+
+    assert len(scheduler) == 20
+
+    await asyncio.sleep(0.45)
+
+    for connection in connections:
+        assert len(connection.visits) == 2
+        assert connection.visits[1] - connection.visits[0] == pytest.approx(
+            0.2, abs=0.05
+        )
+
+    for connection in connections:
+        scheduler.discard(connection)
+
+    assert not len(scheduler)
+    assert scheduler._handle is None
+
+
+def configure(handler, mode=KeepaliveMode.RPC):
+    handler.KEEPALIVE_PING_TIMEOUT = 0.1
+    handler.KEEPALIVE_BUCKETS = 2
+    handler.KEEPALIVE_MODE = mode
+
+
+@pytest.mark.parametrize("mode", list(KeepaliveMode))
+async def test_idle_connection(client: WSRPCClient, handler, metrics, mode):
+    configure(handler, mode)
+
+    async with client:
+        await asyncio.sleep(0.5)
+
+        assert metrics.ping_rtt.count >= 1
+        assert len(handler.get_clients()) == 1
+        assert await client.proxy.ping() == {}
+
+
+async def test_active_connection(client: WSRPCClient, handler, metrics):
+    configure(handler)
+
+    async with client:
+        for _ in range(20):
+            await client.proxy.ping()
+            await asyncio.sleep(0.025)
+
+        assert metrics.ping_rtt.count == 0
+
+
+async def test_ping_timeout(session, handler, socket_path):
+    configure(handler)
+
+    # Connection which does not answer the pings
+    async with session.ws_connect(socket_path) as ws:
+        assert len(handler.get_clients()) == 1
+
+        message = await ws.receive_json(timeout=1)
+        assert message["method"] == "ping"
+
+        message = await ws.receive(timeout=1)
+        assert message.type == aiohttp.WSMsgType.CLOSE
+
+    assert not handler.get_clients()
+
+
+async def test_disabled(client: WSRPCClient, handler):
+    configure(handler)
+    handler.KEEPALIVE_PING_TIMEOUT = 0
+
+    async with client:
+        await asyncio.sleep(0.1)
+        assert not len(handler.get_keepalive_scheduler())
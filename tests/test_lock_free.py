@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from wsrpc_aiohttp import WebSocketAsync, WSRPCClient
+from wsrpc_aiohttp.websocket.tools import RecentSerials
+
+
+class LockFreeHandler(WebSocketAsync):
+    LOCK_FREE_DISPATCH = True
+
+
+@pytest.fixture
+def handler():
+    return LockFreeHandler
+
+
+def test_recent_serials():
+    serials = RecentSerials(2)
+
+    assert serials.add(1)
+    assert serials.add(2)
+    assert not serials.add(1)
+
+    # 1 is evicted as the oldest one
+    assert serials.add(3)
+    assert 1 not in serials
+    assert serials.add(1)
+    assert len(serials) == 2
+
+
+async def test_duplicate_serial_dropped(client: WSRPCClient, handler):
+    calls = []
+
+    def count(_):
+        calls.append(1)
+        return len(calls)
+
+    handler.add_route("count", count)
+
+    async with client:
+        for _ in range(2):
+            await client.socket.send_json({"id": 1001, "method": "count"})
+
+        assert await client.proxy.count() == 2
+        await asyncio.sleep(0.1)
+        assert len(calls) == 2
+
+        (socket,) = handler.get_clients().values()
+        assert not socket._locks
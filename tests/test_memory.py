@@ -0,0 +1,90 @@
+import pytest
+from aiohttp.abc import AbstractView
+from aiohttp.test_utils import make_mocked_request
+
+from wsrpc_aiohttp import WebSocketAsync, WebSocketThreaded, WSRPCClient
+
+
+class CompactHandler(WebSocketAsync):
+    __slots__ = ()
+
+
+def test_slotted():
+    request = make_mocked_request("GET", "/ws/")
+
+    for handler in (WebSocketAsync, WebSocketThreaded, CompactHandler):
+        socket = handler(request)
+        assert not hasattr(socket, "__dict__")
+        assert issubclass(handler, AbstractView)
+        assert socket.request is request
+
+
+def test_store():
+    request = make_mocked_request("GET", "/ws/")
+    socket = WebSocketAsync(request)
+
+    assert socket._store is None
+    socket.store["user"] = "admin"
+    assert socket.store == {"user": "admin"}
+
+    socket.store = {"user": "guest"}
+    assert socket.store == {"user": "guest"}
+
+    with pytest.raises(AttributeError):
+        socket.user = "admin"
+
+
+class DictHandler(WebSocketAsync):
+    # Subclasses without __slots__ get the __dict__ back
+    pass
+
+
+def test_subclass_attributes():
+    socket = DictHandler(make_mocked_request("GET", "/ws/"))
+
+    # Subclasses without __slots__ accept arbitrary attributes
+    socket.user = "admin"
+    assert socket.user == "admin"
+
+
+def test_lazy_collections():
+    socket = WebSocketAsync(make_mocked_request("GET", "/ws/"))
+
+    assert socket._pending_tasks is None
+    assert socket._event_listeners is None
+    assert socket._writer is None
+
+    # Created on the first use
+    assert socket.writer is socket.writer
+    assert socket._writer is not None
+
+
+def test_integer_ids():
+    request = make_mocked_request("GET", "/ws/")
+    first, second = WebSocketAsync(request), WebSocketAsync(request)
+
+    assert isinstance(first.id, int)
+    assert second.id > first.id
+    assert first.address == str(first.id)
+
+
+def test_shared_type_mapping():
+    request = make_mocked_request("GET", "/ws/")
+
+    mapping = WebSocketAsync.get_type_mapping()
+    assert WebSocketAsync(request).get_type_mapping() is mapping
+    assert CompactHandler.get_type_mapping() is not mapping
+    assert CompactHandler.get_type_mapping() == mapping
+    assert "_on_ping_frame" in mapping.values()
+    assert "_on_ping_frame" not in WSRPCClient.get_type_mapping().values()
+
+
+async def test_listeners(client: WSRPCClient):
+    events = []
+
+    async with client:
+        client.add_event_listener(events.append)
+        client.remove_event_listeners(events.append)
+        await client.proxy.ping()
+
+    assert client._event_listeners == set()
@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+from wsrpc_aiohttp import ClientException, Metrics, WebSocketAsync, WSRPCClient
+from wsrpc_aiohttp.signal import Signal
+from wsrpc_aiohttp.websocket.metrics import OTHER_METHOD, Histogram
+
+
+class MetricsHandler(WebSocketAsync):
+    pass
+
+
+@pytest.fixture
+def handler():
+    return MetricsHandler
+
+
+@pytest.fixture
+def metrics(handler):
+    metrics = Metrics()
+    metrics.install(handler)
+
+    try:
+        yield metrics
+    finally:
+        metrics.uninstall(handler)
+
+
+@pytest.fixture
+def application(application, metrics):
+    application.router.add_get("/metrics", metrics.handler)
+    application.router.add_route("*", "/ws/sub/", MetricsSubHandler)
+    return application
+
+
+async def success(_, value):
+    return value
+
+
+async def fail(_):
+    raise RuntimeError("fail")
+
+
+def test_histogram():
+    histogram = Histogram((0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 5):
+        histogram.observe(value)
+
+    assert list(histogram.cumulative()) == [
+        ("0.1", 2),
+        ("1.0", 3),
+        ("+Inf", 4),
+    ]
+    assert histogram.sum == pytest.approx(5.65)
+
+
+def test_method_cardinality():
+    metrics = Metrics(max_methods=2)
+
+    for method in ("a", "b", "c", "d"):
+        Metrics.call_finished(metrics.call_started(method), 0.1, True)
+
+    assert set(metrics.methods) == {"a", "b", OTHER_METHOD}
+    assert metrics.methods[OTHER_METHOD].success == 2
+
+
+async def test_calls(client: WSRPCClient, handler, metrics):
+    handler.add_route("success", success)
+    handler.add_route("fail", fail)
+
+    async with client:
+        assert await client.proxy.success(value=1) == 1
+        assert await client.proxy.success(value=2) == 2
+
+        with pytest.raises(ClientException):
+            await client.proxy.fail()
+
+        with pytest.raises(ClientException):
+            await client.proxy.unknown()
+
+        assert metrics.connections() == {
+            "MetricsHandler": 1,
+            "MetricsSubHandler": 0,
+        }
+
+    stats = metrics.methods["success"]
+    assert stats.success == 2
+    assert stats.fail == 0
+    assert stats.in_flight == 0
+    assert stats.duration.count == 2
+
+    assert metrics.methods["fail"].fail == 1
+    # Unresolvable methods are not accounted
+    assert "unknown" not in metrics.methods
+
+    assert metrics.frames_in >= 4
+    assert metrics.frames_out >= 4
+    assert metrics.bytes_in > 0
+    assert metrics.bytes_out > 0
+    assert metrics.encode_count >= 4
+    assert metrics.decode_count == metrics.frames_in
+
+
+class MetricsSubHandler(MetricsHandler):
+    pass
+
+
+async def test_subclass_connections(session, handler, metrics):
+    client = WSRPCClient(session.make_url("/ws/sub/"))
+
+    async with client:
+        await client.proxy.ping()
+
+        assert metrics.connections() == {
+            "MetricsHandler": 0,
+            "MetricsSubHandler": 1,
+        }
+        assert 'handler="MetricsSubHandler"} 1' in metrics.render()
+
+
+async def test_signal_duration(client: WSRPCClient, handler):
+    durations = []
+
+    async def slow(_):
+        await asyncio.sleep(0.1)
+
+    async def on_call_success(duration, **kwargs):
+        durations.append(duration)
+
+    handler.add_route("slow", slow)
+    handler.ON_CALL_SUCCESS = Signal()
+    handler.ON_CALL_SUCCESS.connect(on_call_success)
+
+    async with client:
+        await client.proxy.slow()
+
+    assert durations[0] >= 0.1
+
+
+async def test_exposition(client: WSRPCClient, handler, metrics, session):
+    handler.add_route("success", success)
+
+    async with client:
+        await client.proxy.success(value=1)
+
+        response = await session.get("/metrics")
+        assert response.status == 200
+        assert response.content_type == "text/plain"
+        body = await response.text()
+
+    lines = body.splitlines()
+    assert 'wsrpc_calls_total{method="success",status="success"} 1' in lines
+    assert 'wsrpc_calls_in_flight{method="success"} 0' in lines
+    assert (
+        'wsrpc_call_duration_seconds_bucket{method="success",le="+Inf"} 1'
+        in lines
+    )
+    assert 'wsrpc_connections{handler="MetricsHandler"} 1' in lines
+    assert "# TYPE wsrpc_frames_received_total counter" in lines
+    assert any(
+        line.startswith("wsrpc_ping_rtt_seconds_count") for line in lines
+    )
@@ -0,0 +1,61 @@
+import asyncio
+
+from wsrpc_aiohttp import WSRPCClient
+
+
+async def test_notify_server(client: WSRPCClient, handler, event_loop):
+    future = event_loop.create_future()
+
+    def telemetry(socket, **kwargs):
+        future.set_result(kwargs)
+        return "ignored"
+
+    handler.add_route("telemetry", telemetry)
+
+    async with client:
+        sent = []
+        original_send = client._send
+
+        async def send(**kwargs):
+            if "method" in kwargs:
+                sent.append(kwargs)
+            return await original_send(**kwargs)
+
+        client._send = send
+
+        await client.notify("telemetry", cpu=0.5)
+
+        assert await asyncio.wait_for(future, timeout=5) == {"cpu": 0.5}
+        assert sent == [{"method": "telemetry", "params": {"cpu": 0.5}}]
+        assert not client._pending_calls
+
+        # No reply is sent, so the next call gets its own result
+        assert await client.proxy.ping(seq=1) == {"seq": 1}
+
+
+async def test_notify_client(client: WSRPCClient, handler, event_loop):
+    future = event_loop.create_future()
+
+    async def notify_me(socket):
+        await socket.notify("on_notify", value=42)
+
+    def on_notify(socket, value):
+        future.set_result(value)
+
+    handler.add_route("notify_me", notify_me)
+    client.add_route("on_notify", on_notify)
+
+    async with client:
+        await client.proxy.notify_me()
+        assert await asyncio.wait_for(future, timeout=5) == 42
+
+
+async def test_notify_error_is_not_replied(client: WSRPCClient, handler):
+    def fail(socket):
+        raise RuntimeError("Oops")
+
+    handler.add_route("fail", fail)
+
+    async with client:
+        await client.notify("fail")
+        assert await client.proxy.ping() == {}
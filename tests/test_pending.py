@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from wsrpc_aiohttp import ClientException, WSRPCClient
+from wsrpc_aiohttp.websocket.common import TooManyPendingCallsError
+
+
+@pytest.fixture
+def sleep_route(handler):
+    async def sleep(_, seconds):
+        await asyncio.sleep(seconds)
+        return seconds
+
+    handler.add_route("sleep", sleep)
+
+
+async def test_timeout_cleanup(client: WSRPCClient, sleep_route):
+    async with client:
+        with pytest.raises(asyncio.TimeoutError):
+            await client.call("sleep", seconds=10, timeout=0.1)
+
+        assert client.pending_calls == 0
+
+
+async def test_error_cleanup(client: WSRPCClient, handler):
+    async with client:
+        with pytest.raises(ClientException):
+            await client.call("not_exists")
+
+        assert client.pending_calls == 0
+
+
+async def test_close_rejects_pending(client: WSRPCClient, sleep_route):
+    async with client:
+        task = asyncio.ensure_future(client.call("sleep", seconds=10))
+        await asyncio.sleep(0.1)
+        assert client.pending_calls == 1
+
+    with pytest.raises(ConnectionError):
+        await task
+
+    assert client.pending_calls == 0
+
+
+async def test_pending_limit(client: WSRPCClient, sleep_route):
+    async with client:
+        client._pending_calls.max_size = 1
+
+        task = asyncio.ensure_future(client.call("sleep", seconds=0.2))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(TooManyPendingCallsError):
+            await client.call("sleep", seconds=0)
+
+        assert await task == 0.2
+
+
+async def test_locks_cleanup(client: WSRPCClient, handler):
+    async with client:
+        await asyncio.gather(*[client.proxy.ping() for _ in range(10)])
+
+        (socket,) = handler.get_clients().values()
+        assert not socket._locks
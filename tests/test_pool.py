@@ -0,0 +1,154 @@
+import asyncio
+from collections import Counter
+
+import aiohttp
+import pytest
+
+from wsrpc_aiohttp import (
+    BalancingStrategy,
+    WebSocketAsync,
+    WSRPCClientPool,
+)
+
+
+class PoolHandler(WebSocketAsync):
+    pass
+
+
+@pytest.fixture
+def handler():
+    return PoolHandler
+
+
+@pytest.fixture
+def release(event_loop, handler):
+    event = asyncio.Event()
+
+    async def wait_release(socket):
+        await event.wait()
+        return str(socket.id)
+
+    def whoami(socket):
+        return str(socket.id)
+
+    handler.add_route("wait_release", wait_release)
+    handler.add_route("whoami", whoami)
+    return event
+
+
+@pytest.fixture
+async def make_pool(session, socket_path):
+    pools = []
+
+    def factory(**kwargs):
+        kwargs.setdefault("health_check_interval", None)
+        pool = WSRPCClientPool(session.make_url(socket_path), **kwargs)
+        pools.append(pool)
+        return pool
+
+    try:
+        yield factory
+    finally:
+        for pool in pools:
+            await pool.close()
+
+
+async def test_connect(make_pool, handler):
+    async with make_pool(size=3) as pool:
+        assert len(pool) == 3
+        assert len(handler.get_clients()) == 3
+        assert await pool.proxy.ping() == {}
+
+    assert not handler.get_clients()
+
+
+async def test_round_robin(make_pool, release):
+    pool = make_pool(size=3, strategy=BalancingStrategy.ROUND_ROBIN)
+
+    async with pool:
+        counter = Counter([await pool.proxy.whoami() for _ in range(9)])
+
+    assert sorted(counter.values()) == [3, 3, 3]
+
+
+async def test_least_in_flight(make_pool, release):
+    async with make_pool(size=3) as pool:
+        blocked = [
+            asyncio.ensure_future(pool.proxy.wait_release()) for _ in range(2)
+        ]
+        await asyncio.sleep(0.1)
+
+        idle = await pool.proxy.whoami()
+
+        release.set()
+        busy = await asyncio.gather(*blocked)
+
+    assert len(set(busy)) == 2
+    assert idle not in busy
+
+
+async def test_replace_dead_member(make_pool, handler):
+    async with make_pool(size=2, health_check_interval=0.05) as pool:
+        members = set(pool.members)
+
+        for socket in list(handler.get_clients().values())[:1]:
+            await socket.close()
+
+        await asyncio.sleep(0.3)
+
+        assert pool.replaced >= 1
+        assert len(pool) == 2
+        assert len(members & set(pool.members)) == 1
+        assert len(handler.get_clients()) == 2
+        assert await pool.proxy.ping() == {}
+
+
+async def test_replace_shared_session(make_pool, handler):
+    shared = aiohttp.ClientSession()
+
+    try:
+        pool = make_pool(size=2, health_check_interval=0.05, session=shared)
+
+        async with pool:
+            for socket in list(handler.get_clients().values())[:1]:
+                await socket.close()
+
+            for _ in range(100):
+                if pool.replaced:
+                    break
+                await asyncio.sleep(0.05)
+
+            assert pool.replaced
+
+            # The drained member did not close the session of the others
+            await asyncio.sleep(0.2)
+            assert not shared.closed
+            assert len(pool) == 2
+            assert await pool.proxy.ping() == {}
+
+        assert not shared.closed
+    finally:
+        await shared.close()
+
+
+async def test_multiple_endpoints(session, handler):
+    url = session.make_url("/ws/")
+    pool = WSRPCClientPool([url, str(url)], size=4, health_check_interval=None)
+
+    async with pool:
+        assert [str(m._url) for m in pool.members] == [str(url)] * 4
+        assert len(handler.get_clients()) == 4
+
+
+async def test_no_members(session):
+    pool = WSRPCClientPool(
+        session.make_url("/not-found/"), size=2, health_check_interval=None
+    )
+
+    with pytest.raises(Exception):
+        await pool.connect()
+
+    with pytest.raises(ConnectionError):
+        await pool.proxy.ping()
+
+    await pool.close()
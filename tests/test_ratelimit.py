@@ -0,0 +1,202 @@
+import asyncio
+
+import pytest
+
+from wsrpc_aiohttp import (
+    ClientException,
+    Metrics,
+    RateLimit,
+    RateLimitPolicy,
+    WebSocketAsync,
+    WSRPCClient,
+)
+from wsrpc_aiohttp.websocket.metrics import OTHER_METHOD
+from wsrpc_aiohttp.websocket.ratelimit import RateLimiter, TokenBucket
+
+
+class RateLimitedHandler(WebSocketAsync):
+    pass
+
+
+@pytest.fixture
+def handler():
+    return RateLimitedHandler
+
+
+def test_token_bucket():
+    bucket = TokenBucket(RateLimit(rate=10, burst=2), now=0)
+
+    assert bucket.consume(0) == 0
+    assert bucket.consume(0) == 0
+    assert bucket.consume(0) == pytest.approx(0.1)
+    assert bucket.throttled == 1
+
+    # Refilled by the rate
+    assert bucket.consume(0.1) == 0
+    # Never above the burst
+    assert bucket.consume(10) == 0
+    assert bucket.consume(10) == 0
+    assert bucket.consume(10) > 0
+
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket(RateLimit(rate=10, burst=1), now=0)
+
+    assert bucket.consume(0, reserve=True) == 0
+    assert bucket.consume(0, reserve=True) == pytest.approx(0.1)
+    assert bucket.consume(0, reserve=True) == pytest.approx(0.2)
+
+
+@pytest.mark.parametrize(
+    "limit", [RateLimit(rate=0), RateLimit(rate=-1), RateLimit(10, burst=0)]
+)
+def test_invalid_limits(handler, limit):
+    with pytest.raises(ValueError):
+        TokenBucket(limit)
+
+    with pytest.raises(ValueError):
+        RateLimiter(methods={"ping": limit})
+
+    with pytest.raises(ValueError):
+        handler.configure(method_rate_limits={"ping": limit})
+
+    assert not handler.METHOD_RATE_LIMITS
+
+
+def test_limiter_refunds():
+    limiter = RateLimiter(
+        connection=RateLimit(10),
+        methods={"slow": RateLimit(1)},
+    )
+
+    assert limiter.acquire("slow", 0) == 0
+    assert limiter.acquire("slow", 0) > 0
+    assert limiter.throttled == 1
+
+    # The rejected call did not take the connection token
+    assert limiter.connection is not None
+    assert limiter.connection.tokens == pytest.approx(9)
+
+    # Other methods are limited by the connection bucket only
+    for _ in range(9):
+        assert limiter.acquire("fast", 0) == 0
+    assert limiter.acquire("fast", 0) > 0
+
+
+async def test_no_limiter(client: WSRPCClient, handler):
+    async with client:
+        await client.proxy.ping()
+        (socket,) = handler.get_clients().values()
+        assert socket.rate_limiter is None
+
+
+async def test_reject(client: WSRPCClient, handler):
+    handler.RATE_LIMIT = RateLimit(rate=1, burst=3)
+
+    async with client:
+        results = await asyncio.gather(
+            *[client.proxy.ping() for _ in range(5)],
+            return_exceptions=True,
+        )
+
+        errors = [r for r in results if isinstance(r, ClientException)]
+        assert len(errors) == 2
+
+        for error in errors:
+            assert error.type == "RateLimitedError"
+            assert 0 < error.raw["retry_after"] <= 1
+
+        (socket,) = handler.get_clients().values()
+        assert socket.rate_limiter.throttled == 2
+
+
+async def test_method_limit(client: WSRPCClient, handler):
+    handler.METHOD_RATE_LIMITS = {"limited": RateLimit(rate=1)}
+    handler.add_route("limited", lambda _: True)
+
+    async with client:
+        assert await client.proxy.limited()
+
+        with pytest.raises(ClientException):
+            await client.proxy.limited()
+
+        assert await client.proxy.ping() == {}
+
+
+async def test_global_limit(session, handler, socket_path):
+    handler.GLOBAL_RATE_LIMIT = RateLimit(rate=1, burst=2)
+
+    clients = [WSRPCClient(session.make_url(socket_path)) for _ in range(3)]
+
+    try:
+        for client in clients:
+            await client.connect()
+
+        results = await asyncio.gather(
+            *[client.proxy.ping() for client in clients],
+            return_exceptions=True,
+        )
+
+        assert sum(isinstance(r, ClientException) for r in results) == 1
+        assert handler.get_global_bucket().throttled == 1
+    finally:
+        for client in clients:
+            await client.close()
+
+
+async def test_delay(client: WSRPCClient, handler, event_loop):
+    handler.RATE_LIMIT = RateLimit(rate=20, burst=1)
+    handler.RATE_LIMIT_POLICY = RateLimitPolicy.DELAY
+
+    async with client:
+        started = event_loop.time()
+        results = await asyncio.gather(
+            *[client.proxy.ping(value=i) for i in range(5)]
+        )
+
+        assert results == [{"value": i} for i in range(5)]
+        # Four calls waited for 1/20 of a second each
+        assert event_loop.time() - started >= 0.15
+
+
+async def test_metrics(client: WSRPCClient, handler):
+    handler.RATE_LIMIT = RateLimit(rate=1, burst=1)
+    metrics = Metrics().install(handler)
+
+    try:
+        async with client:
+            await client.proxy.ping()
+
+            with pytest.raises(ClientException):
+                await client.proxy.ping()
+
+        assert metrics.methods["ping"].throttled == 1
+        assert 'wsrpc_calls_throttled_total{method="ping"} 1' in (
+            metrics.render()
+        )
+    finally:
+        metrics.uninstall(handler)
+
+
+async def test_metrics_unknown_methods(client: WSRPCClient, handler):
+    handler.RATE_LIMIT = RateLimit(rate=1, burst=1)
+    metrics = Metrics(max_methods=4).install(handler)
+
+    try:
+        async with client:
+            await client.proxy.ping()
+
+            for idx in range(10):
+                with pytest.raises(ClientException):
+                    await client.call("missing_{0}".format(idx))
+
+            with pytest.raises(ClientException):
+                await client.proxy.ping()
+
+        # Unknown names are counted together and do not push the
+        # registered routes out of the per-method series
+        assert metrics.methods[OTHER_METHOD].throttled == 10
+        assert metrics.methods["ping"].throttled == 1
+        assert not [m for m in metrics.methods if m.startswith("missing")]
+    finally:
+        metrics.uninstall(handler)
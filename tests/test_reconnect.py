@@ -0,0 +1,181 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from wsrpc_aiohttp import ReconnectPolicy, WebSocketAsync, WSRPCClient
+
+
+class ReconnectHandler(WebSocketAsync):
+    pass
+
+
+@pytest.fixture
+def handler():
+    return ReconnectHandler
+
+
+@pytest.fixture
+def release(event_loop, handler):
+    event = asyncio.Event()
+
+    async def wait_release(_):
+        await event.wait()
+        return True
+
+    handler.add_route("wait_release", wait_release)
+    return event
+
+
+@pytest.fixture
+async def make_client(session, socket_path):
+    clients = []
+
+    def factory(**kwargs):
+        kwargs.setdefault("reconnect", ReconnectPolicy(initial_delay=0.01))
+        client = WSRPCClient(session.make_url(socket_path), **kwargs)
+        clients.append(client)
+        return client
+
+    try:
+        yield factory
+    finally:
+        for client in clients:
+            await client.close()
+
+
+async def drop_connections(handler):
+    for socket in list(handler.get_clients().values()):
+        await socket.close()
+
+
+async def test_reconnect(make_client, handler):
+    reconnected = []
+
+    async def on_reconnect(client):
+        # Calls of the hook are not waiting for the reconnection
+        reconnected.append(await client.proxy.ping(hook=True))
+
+    client = make_client(
+        reconnect=ReconnectPolicy(initial_delay=0.2, jitter=0),
+        on_reconnect=on_reconnect,
+    )
+
+    async with client:
+        await drop_connections(handler)
+        await asyncio.sleep(0.05)
+        assert not client.connected
+
+        # Waits for the reconnection
+        assert await client.proxy.ping() == {}
+        assert client.reconnects == 1
+        assert client.connected
+        assert reconnected == [{"hook": True}]
+
+
+async def test_idempotent_replay(make_client, handler, release):
+    policy = ReconnectPolicy(
+        initial_delay=0.01, idempotent_methods=("wait_release",)
+    )
+    client = make_client(reconnect=policy)
+
+    async with client:
+        replayed = asyncio.ensure_future(client.proxy.wait_release())
+        await asyncio.sleep(0.1)
+
+        await drop_connections(handler)
+        await asyncio.sleep(0.2)
+
+        assert client.reconnects == 1
+        assert not replayed.done()
+
+        release.set()
+        assert await replayed
+
+
+async def test_not_idempotent_fails(make_client, handler, release):
+    client = make_client()
+
+    async with client:
+        call = asyncio.ensure_future(client.proxy.wait_release())
+        await asyncio.sleep(0.1)
+
+        await drop_connections(handler)
+
+        with pytest.raises(ConnectionError):
+            await call
+
+        release.set()
+        assert await client.proxy.wait_release()
+
+
+async def test_queue_limit(make_client, handler):
+    policy = ReconnectPolicy(initial_delay=0.3, jitter=0, max_queue=1)
+    client = make_client(reconnect=policy)
+
+    async with client:
+        await drop_connections(handler)
+        await asyncio.sleep(0.05)
+
+        queued = asyncio.ensure_future(client.proxy.ping())
+        await asyncio.sleep(0)
+
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await client.proxy.ping()
+
+        assert await queued == {}
+
+
+async def test_timeout_covers_reconnect(make_client, handler):
+    policy = ReconnectPolicy(initial_delay=0.5, jitter=0)
+    client = make_client(reconnect=policy)
+
+    async with client:
+        await drop_connections(handler)
+        await asyncio.sleep(0.05)
+
+        started = asyncio.get_event_loop().time()
+        with pytest.raises(asyncio.TimeoutError):
+            await client.call("ping", timeout=0.1)
+
+        assert asyncio.get_event_loop().time() - started < 0.4
+        assert not client.pending_calls
+
+        # The call without the timeout still waits for the reconnection
+        assert await client.proxy.ping() == {}
+        assert client.reconnects == 1
+
+
+async def test_give_up(make_client, handler, monkeypatch):
+    policy = ReconnectPolicy(initial_delay=0.05, jitter=0, max_attempts=2)
+    client = make_client(reconnect=policy)
+
+    async with client:
+        attempts = 0
+
+        async def connect():
+            nonlocal attempts
+            attempts += 1
+            raise aiohttp.ClientConnectionError("refused")
+
+        monkeypatch.setattr(client, "connect", connect)
+        await drop_connections(handler)
+        await asyncio.sleep(0.02)
+
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await client.proxy.ping()
+
+        await asyncio.sleep(0.01)
+
+        assert attempts == 2
+        assert client.closed
+
+
+def test_policy_delay():
+    policy = ReconnectPolicy(initial_delay=1, max_delay=10, jitter=0)
+
+    assert [policy.delay(n) for n in range(6)] == [1, 2, 4, 8, 10, 10]
+    assert policy.delay(10000) == 10
+
+    policy = ReconnectPolicy(initial_delay=1, jitter=0.5)
+    assert all(0.5 <= policy.delay(0) <= 1 for _ in range(100))
@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+
+from wsrpc_aiohttp import (
+    ClientException,
+    RouteScope,
+    WebSocketAsync,
+    WebSocketRoute,
+    WSRPCClient,
+)
+from wsrpc_aiohttp.websocket.route import RoutePool
+
+
+class ScopedHandler(WebSocketAsync):
+    __slots__ = ()
+
+
+@pytest.fixture
+def handler():
+    return ScopedHandler
+
+
+class ConnectionRoute(WebSocketRoute):
+    def whoami(self):
+        return id(self)
+
+
+class SingletonRoute(WebSocketRoute):
+    __scope__ = RouteScope.SINGLETON
+
+    def init(self, socket):
+        return socket.id
+
+    def whoami(self, socket):
+        return [id(self), socket.id]
+
+    def own_socket(self, socket):
+        return self.socket.id
+
+
+class PooledRoute(WebSocketRoute):
+    __scope__ = RouteScope.POOLED
+    __pool_size__ = 2
+
+    async def slow(self, socket, delay):
+        await asyncio.sleep(delay)
+        return id(self)
+
+    def fast(self, socket):
+        return socket.id
+
+    async def ids(self, socket, count):
+        for _ in range(count):
+            await asyncio.sleep(0.01)
+            yield id(self)
+
+    def sync_ids(self, socket, count):
+        for _ in range(count):
+            yield id(self)
+
+
+ScopedHandler.add_route("connection", ConnectionRoute)
+ScopedHandler.add_route("singleton", SingletonRoute)
+ScopedHandler.add_route("pooled", PooledRoute)
+
+
+async def connect(session, socket_path, count):
+    clients = [WSRPCClient(session.make_url(socket_path)) for _ in range(count)]
+    for client in clients:
+        await client.connect()
+    return clients
+
+
+async def test_connection_scope(session, socket_path):
+    first, second = await connect(session, socket_path, 2)
+
+    try:
+        first_id = await first.call("connection.whoami")
+        assert await first.call("connection.whoami") == first_id
+        assert await second.call("connection.whoami") != first_id
+    finally:
+        await first.close()
+        await second.close()
+
+
+async def test_singleton_scope(session, socket_path, handler):
+    first, second = await connect(session, socket_path, 2)
+
+    try:
+        first_route, first_socket = await first.call("singleton.whoami")
+        second_route, second_socket = await second.call("singleton.whoami")
+
+        # One instance, the socket of the caller is passed explicitly
+        assert first_route == second_route == id(SingletonRoute.__shared__())
+        assert first_socket != second_socket
+        assert set(handler.get_clients()) == {first_socket, second_socket}
+
+        assert await first.call("singleton") == first_socket
+
+        with pytest.raises(ClientException) as e:
+            await first.call("singleton.own_socket")
+        assert e.value.type == "RuntimeError"
+
+        with pytest.raises(ClientException):
+            await first.call("singleton.unknown")
+
+        # No instances per connection
+        for socket in handler.get_clients().values():
+            assert not socket._handlers
+    finally:
+        await first.close()
+        await second.close()
+
+
+async def test_pooled_scope(session, socket_path):
+    pool = PooledRoute.__shared__()
+    assert isinstance(pool, RoutePool)
+
+    first, second = await connect(session, socket_path, 2)
+
+    try:
+        results = await asyncio.gather(
+            *[
+                client.call("pooled.slow", delay=0.01)
+                for client in (first, second) * 2
+            ]
+        )
+
+        # Concurrent calls never share the instance, up to
+        # the pool size of them are kept
+        assert len(set(results)) == 4
+        assert pool.idle == 2
+
+        # Idle instances are reused
+        created = pool.created
+        assert await first.call("pooled.slow", delay=0) in results
+        assert pool.created == created
+
+        assert await second.call("pooled.fast") != await first.call(
+            "pooled.fast"
+        )
+
+        with pytest.raises(ClientException):
+            await first.call("pooled")
+    finally:
+        await first.close()
+        await second.close()
+
+
+async def test_pooled_streams(session, socket_path):
+    pool = PooledRoute.__shared__()
+    first, second = await connect(session, socket_path, 2)
+
+    async def collect(client, method):
+        return [item async for item in client.stream(method, count=3)]
+
+    try:
+        streams = await asyncio.gather(
+            collect(first, "pooled.ids"), collect(second, "pooled.ids")
+        )
+
+        # The instance is borrowed until the stream is exhausted
+        assert len(set(streams[0])) == len(set(streams[1])) == 1
+        assert streams[0][0] != streams[1][0]
+        assert pool.idle == 2
+
+        items = await collect(first, "pooled.sync_ids")
+        assert len(set(items)) == 1
+        assert pool.idle == 2
+    finally:
+        await first.close()
+        await second.close()
@@ -1,8 +1,10 @@
+import asyncio
+
 import pytest
 from aiohttp import WSServerHandshakeError
 
 from wsrpc_aiohttp import ClientException, WebSocketAsync
-from wsrpc_aiohttp.signal import Signal
+from wsrpc_aiohttp.signal import Signal, SignalMode
 
 
 def reset_signals(handler):
@@ -188,3 +190,86 @@ async def test_on_conn_fail_signal(client, handler, monkeypatch):
 
     assert conn_fail
     assert isinstance(conn_err, RuntimeError)
+
+
+async def test_empty_signal_creates_no_coroutine():
+    signal = Signal()
+    assert not signal
+
+    awaitable = signal.call(value=1)
+    assert not asyncio.iscoroutine(awaitable)
+    assert await awaitable is None
+
+    signal.freeze()
+    assert await signal.call() is None
+
+
+async def test_concurrent_signal():
+    signal = Signal(mode=SignalMode.CONCURRENT)
+    events = []
+
+    async def slow(**kwargs):
+        events.append("slow-start")
+        await asyncio.sleep(0.01)
+        events.append("slow-end")
+
+    async def fast(**kwargs):
+        events.append("fast")
+
+    async def broken(**kwargs):
+        raise RuntimeError
+
+    for receiver in (slow, fast, broken):
+        signal.connect(receiver)
+
+    assert len(signal) == 3
+    await signal.call()
+
+    assert sorted(events) == ["fast", "slow-end", "slow-start"]
+    assert events[-1] == "slow-end"
+
+
+async def test_background_signal():
+    signal = Signal(mode=SignalMode.BACKGROUND)
+    event = asyncio.Event()
+    received = []
+
+    async def on_event(value):
+        await event.wait()
+        received.append(value)
+
+    signal.connect(on_event)
+    await signal.call(1)
+    assert received == []
+
+    event.set()
+    await signal.drain()
+    assert received == [1]
+
+
+async def test_signal_timeout(caplog):
+    signal = Signal(timeout=0.01)
+    finished = []
+
+    async def hanging():
+        await asyncio.sleep(10)
+
+    async def finishing():
+        finished.append(True)
+
+    signal.connect(hanging)
+    signal.connect(finishing)
+
+    await asyncio.wait_for(signal.call(), timeout=1)
+    assert finished == [True]
+    assert "did not finish" in caplog.text
+
+
+def test_copy_keeps_mode():
+    signal = Signal(mode=SignalMode.CONCURRENT, timeout=1)
+    signal.freeze()
+
+    clone = signal.copy()
+    assert not clone.is_frozen
+    assert clone.mode is SignalMode.CONCURRENT
+    assert clone.timeout == 1
@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+
+from wsrpc_aiohttp import (
+    ClientException,
+    Metrics,
+    WebSocketAsync,
+    WSRPCClient,
+    decorators,
+)
+from wsrpc_aiohttp.websocket.cache import SingleFlight
+
+
+class FlightHandler(WebSocketAsync):
+    __slots__ = ()
+
+    # Counter of the encoded replies
+    encoded_results = 0
+
+    def _encode(self, payload):
+        if "result" in payload:
+            FlightHandler.encoded_results += 1
+        return super()._encode(payload)
+
+
+@pytest.fixture
+def handler():
+    FlightHandler._FLIGHTS.pop(FlightHandler, None)
+    FlightHandler._RESULT_CACHES.pop(FlightHandler, None)
+    return FlightHandler
+
+
+CALLS = []
+
+
+@decorators.single_flight
+async def feed(socket, user):
+    CALLS.append(user)
+    await asyncio.sleep(0.05)
+    return {"user": user, "calls": len(CALLS)}
+
+
+@decorators.single_flight
+async def failing(socket):
+    CALLS.append("failing")
+    await asyncio.sleep(0.05)
+    raise ValueError("failed")
+
+
+@decorators.single_flight
+@decorators.cached(ttl=60)
+async def cached_feed(socket):
+    CALLS.append("cached")
+    await asyncio.sleep(0.05)
+    return len(CALLS)
+
+
+@decorators.single_flight
+async def stream(socket):
+    CALLS.append("stream")
+    await asyncio.sleep(0.05)
+    yield 1
+    yield 2
+
+
+FlightHandler.add_route("feed", feed)
+FlightHandler.add_route("failing", failing)
+FlightHandler.add_route("cached_feed", cached_feed)
+FlightHandler.add_route("stream", stream)
+
+
+@pytest.fixture(autouse=True)
+def calls():
+    CALLS.clear()
+    return CALLS
+
+
+@pytest.fixture
+async def clients(session, socket_path):
+    clients = [WSRPCClient(session.make_url(socket_path)) for _ in range(5)]
+
+    for client in clients:
+        await client.connect()
+
+    try:
+        yield clients
+    finally:
+        for client in clients:
+            await client.close()
+
+
+def test_single_flight(event_loop):
+    flights = SingleFlight()
+
+    assert flights.join("a") is None
+    flight = flights.start("a", event_loop)
+    assert flights.join("a") is flight
+    assert len(flights) == 1
+
+    flights.finish("a", flight, ValueError())
+    assert not len(flights)
+    assert isinstance(flight.exception(), ValueError)
+
+    assert flights.executed == 1
+    assert flights.coalesced == 1
+    assert flights.ratio == 0.5
+
+
+async def test_coalesced(clients, handler, calls):
+    encoded = handler.encoded_results
+
+    results = await asyncio.gather(
+        *[client.proxy.feed(user="a") for client in clients],
+        clients[0].proxy.feed(user="b"),
+    )
+
+    assert all(result == results[0] for result in results[:5])
+    assert results[0]["user"] == "a"
+    assert results[5]["user"] == "b"
+    assert sorted(calls) == ["a", "b"]
+
+    # One serialization per execution
+    assert handler.encoded_results - encoded == 2
+
+    flights = handler.get_single_flight("feed")
+    assert flights.executed == 2
+    assert flights.coalesced == 4
+    assert not len(flights)
+
+    # Sequential calls are executed again
+    assert (await clients[0].proxy.feed(user="a"))["calls"] == 3
+
+
+async def test_error_fanned_out(clients, calls):
+    results = await asyncio.gather(
+        *[client.proxy.failing() for client in clients],
+        return_exceptions=True,
+    )
+
+    assert calls == ["failing"]
+    for result in results:
+        assert isinstance(result, ClientException)
+        assert result.message == "failed"
+
+
+async def test_with_cache(clients, handler, calls):
+    results = await asyncio.gather(
+        *[client.proxy.cached_feed() for client in clients]
+    )
+    assert results == [1] * 5
+
+    assert await clients[0].proxy.cached_feed() == 1
+    assert calls == ["cached"]
+
+
+async def test_stream_not_shared(clients, calls):
+    results = await asyncio.gather(
+        *[client.proxy.stream() for client in clients[:2]]
+    )
+
+    assert results == [[1, 2], [1, 2]]
+    # The generator could not be shared, the waiter executed it
+    assert calls == ["stream", "stream"]
+
+
+async def test_metrics(clients, handler):
+    metrics = Metrics().install(handler)
+
+    try:
+        await asyncio.gather(
+            *[client.proxy.feed(user="a") for client in clients]
+        )
+
+        stats = metrics.methods["feed"]
+        assert stats.coalesced == 4
+        assert stats.success == 1
+        assert 'wsrpc_calls_coalesced_total{method="feed"} 4' in (
+            metrics.render()
+        )
+        assert handler.get_single_flight("feed").ratio == 0.8
+    finally:
+        metrics.uninstall(handler)
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from wsrpc_aiohttp import ClientException, WebSocketAsync, WSRPCClient
+from wsrpc_aiohttp.websocket.route import WebSocketRoute
+
+
+class StreamHandler(WebSocketAsync):
+    pass
+
+
+@pytest.fixture
+def handler():
+    return StreamHandler
+
+
+class State:
+    produced = 0
+    closed = False
+
+
+async def numbers(_, count):
+    for number in range(count):
+        State.produced += 1
+        yield number
+
+
+async def infinite(_):
+    number = 0
+    try:
+        while True:
+            State.produced += 1
+            yield number
+            number += 1
+    finally:
+        State.closed = True
+
+
+async def broken(_):
+    yield 1
+    raise RuntimeError("broken")
+
+
+def regular(_):
+    return [1, 2, 3]
+
+
+class Rows(WebSocketRoute):
+    def letters(self, text):
+        yield from text
+
+
+@pytest.fixture(autouse=True)
+def routes(handler):
+    State.produced = 0
+    State.closed = False
+
+    handler.add_route("numbers", numbers)
+    handler.add_route("infinite", infinite)
+    handler.add_route("broken", broken)
+    handler.add_route("regular", regular)
+    handler.add_route("rows", Rows)
+
+
+async def test_stream(client: WSRPCClient):
+    async with client:
+        items = [item async for item in client.stream("numbers", count=200)]
+
+    assert items == list(range(200))
+
+
+async def test_sync_generator_route(client: WSRPCClient):
+    async with client:
+        stream = client.stream("rows.letters", text="abc")
+        assert [item async for item in stream] == ["a", "b", "c"]
+
+
+async def test_not_streaming_caller(client: WSRPCClient):
+    async with client:
+        assert await client.proxy.numbers(count=3) == [0, 1, 2]
+        assert await client.proxy.rows.letters(text="ab") == ["a", "b"]
+
+
+async def test_regular_route(client: WSRPCClient):
+    async with client:
+        assert [item async for item in client.stream("regular")] == [1, 2, 3]
+
+
+async def test_flow_control(client: WSRPCClient):
+    async with client:
+        stream = client.stream("numbers", count=1000, credit=4)
+
+        assert await stream.__anext__() == 0
+        await asyncio.sleep(0.1)
+
+        # The server waits for the credit
+        assert State.produced <= 5
+        assert stream.buffered <= 3
+
+        items = [item async for item in stream]
+        assert items == list(range(1, 1000))
+
+
+async def test_cancel(client: WSRPCClient):
+    async with client:
+        async with client.stream("infinite", credit=2) as stream:
+            async for item in stream:
+                if item == 10:
+                    break
+
+        await asyncio.sleep(0.1)
+        assert State.closed
+        produced = State.produced
+
+        # Connection is still usable
+        assert await client.proxy.regular() == [1, 2, 3]
+        assert State.produced == produced
+
+
+async def test_error(client: WSRPCClient):
+    items = []
+
+    async with client:
+        with pytest.raises(ClientException) as e:
+            async for item in client.stream("broken"):
+                items.append(item)
+
+    assert items == [1]
+    assert e.value.message == "broken"
+
+
+async def test_connection_closed(client: WSRPCClient, handler):
+    async with client:
+        stream = client.stream("infinite", credit=2)
+        assert await stream.__anext__() == 0
+
+        for socket in list(handler.get_clients().values()):
+            await socket.close()
+
+        with pytest.raises(ConnectionError):
+            async for _ in stream:
+                pass
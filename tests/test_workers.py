@@ -0,0 +1,199 @@
+import asyncio
+from contextvars import ContextVar
+
+import pytest
+
+from wsrpc_aiohttp import WebSocketAsync, WSRPCClient
+from wsrpc_aiohttp.websocket.workers import CallWorkers
+
+
+@pytest.fixture
+async def spawn():
+    tasks = []
+
+    def spawn(coro):
+        task = asyncio.ensure_future(coro)
+        tasks.append(task)
+        return task
+
+    try:
+        yield spawn
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def test_workers_reused(spawn):
+    workers = CallWorkers(spawn, idle_timeout=1)
+    results = []
+
+    async def job(value):
+        await asyncio.sleep(0)
+        results.append(value)
+
+    for value in range(10):
+        workers.submit(job, value)
+        await asyncio.sleep(0.001)
+
+    await asyncio.sleep(0.01)
+
+    assert results == list(range(10))
+    assert workers.executed == 10
+    assert workers.spawned == 1
+    assert workers.idle == 1
+
+
+async def test_workers_concurrent(spawn):
+    workers = CallWorkers(spawn, idle_timeout=1)
+    event = asyncio.Event()
+
+    async def job():
+        await event.wait()
+
+    for _ in range(3):
+        workers.submit(job)
+
+    await asyncio.sleep(0)
+    assert workers.size == 3
+    assert workers.idle == 0
+
+    event.set()
+    await asyncio.sleep(0.01)
+    assert workers.idle == 3
+
+
+async def test_workers_idle_timeout(spawn):
+    workers = CallWorkers(spawn, idle_timeout=0.01)
+
+    async def job():
+        pass
+
+    workers.submit(job)
+    await asyncio.sleep(0)
+    assert workers.size == 1
+
+    await asyncio.sleep(0.05)
+    assert workers.size == 0
+    assert workers.idle == 0
+
+    workers.submit(job)
+    await asyncio.sleep(0)
+    assert workers.spawned == 2
+
+
+async def test_workers_single_timer(spawn, monkeypatch):
+    workers = CallWorkers(spawn, idle_timeout=1)
+    loop = asyncio.get_event_loop()
+    timers = []
+
+    def call_later(delay, callback, *args):
+        timers.append(delay)
+        return original(delay, callback, *args)
+
+    original = loop.call_later
+    monkeypatch.setattr(loop, "call_later", call_later)
+
+    async def job():
+        pass
+
+    for _ in range(10):
+        workers.submit(job)
+        await asyncio.sleep(0)
+
+    # The idle workers are expired by one sweep instead of the timer
+    # per executed call
+    assert workers.executed == 10
+    assert timers == [1]
+
+
+async def test_workers_context(spawn):
+    workers = CallWorkers(spawn, idle_timeout=1)
+    var: ContextVar = ContextVar("var", default=None)
+    seen = []
+
+    async def job(value):
+        seen.append(var.get())
+        var.set(value)
+        await asyncio.sleep(0)
+        seen.append(var.get())
+
+    var.set("submitter")
+    for value in range(3):
+        workers.submit(job, value)
+        await asyncio.sleep(0.01)
+
+    # Every call starts with the submitter's value and keeps its own
+    assert seen == ["submitter", 0, "submitter", 1, "submitter", 2]
+    assert workers.spawned == 1
+    assert var.get() == "submitter"
+
+
+async def test_workers_without_reuse(spawn):
+    workers = CallWorkers(spawn, idle_timeout=0)
+
+    async def job():
+        raise ValueError
+
+    workers.submit(job)
+    workers.submit(job)
+    await asyncio.sleep(0)
+
+    assert workers.spawned == 2
+    assert workers.executed == 2
+    assert workers.size == 0
+
+
+class CountingClient(WSRPCClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.spawned = 0
+
+    def _create_task(self, coro):
+        self.spawned += 1
+        return super()._create_task(coro)
+
+
+async def test_replies_inline(session, socket_path):
+    client = CountingClient(session.make_url(socket_path))
+
+    async with client:
+        await client.proxy.ping()
+        spawned = client.spawned
+
+        for _ in range(10):
+            await client.proxy.ping()
+
+        # No task per reply frame, the writer sends in place
+        assert client.spawned == spawned
+        assert CountingClient._inline_replies()
+
+
+class OverriddenClient(WSRPCClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.results = []
+
+    async def handle_result(self, serial, result):
+        self.results.append(result)
+        await super().handle_result(serial, result)
+
+
+async def test_overridden_handlers(session, socket_path):
+    client = OverriddenClient(session.make_url(socket_path))
+
+    async with client:
+        assert await client.proxy.ping(value=1) == {"value": 1}
+
+    assert not OverriddenClient._inline_replies()
+    assert client.results == [{"value": 1}]
+
+
+async def test_handler_workers(client: WSRPCClient, handler: WebSocketAsync):
+    async with client:
+        for _ in range(10):
+            await client.proxy.ping()
+
+        (socket,) = handler.get_clients().values()
+        assert socket.workers.executed == 10
+        assert socket.workers.spawned == 1
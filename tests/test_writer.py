@@ -0,0 +1,199 @@
+import asyncio
+import json
+
+import pytest
+
+from wsrpc_aiohttp import WebSocketAsync, WSRPCClient
+from wsrpc_aiohttp.websocket.writer import FrameWriter
+
+
+class Owner:
+    def __init__(self, delay=0.0):
+        self._loop = asyncio.get_event_loop()
+        self.delay = delay
+        self.frames = []
+        self.writing = 0
+        self.overlapped = False
+        self.tasks = set()
+
+    def _encode(self, payload):
+        return json.dumps(payload)
+
+    def _create_task(self, coro):
+        task = self._loop.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def _write_frame(self, frame):
+        self.writing += 1
+        self.overlapped = self.overlapped or self.writing > 1
+
+        try:
+            await asyncio.sleep(self.delay)
+            if frame == "broken":
+                raise ConnectionResetError(frame)
+            self.frames.append(frame)
+        finally:
+            self.writing -= 1
+
+
+async def test_writes_do_not_overlap():
+    owner = Owner(delay=0.001)
+    writer = FrameWriter(owner)
+
+    await asyncio.gather(*[writer.send(str(i)) for i in range(20)])
+
+    assert not owner.overlapped
+    assert owner.frames == [str(i) for i in range(20)]
+    assert writer.written == 20
+    assert writer.idle
+
+
+async def test_write_error_is_raised_to_the_sender():
+    owner = Owner()
+    writer = FrameWriter(owner)
+
+    results = await asyncio.gather(
+        writer.send("1"),
+        writer.send("broken"),
+        writer.send("3"),
+        return_exceptions=True,
+    )
+
+    assert results[0] is None
+    assert isinstance(results[1], ConnectionResetError)
+    assert results[2] is None
+    assert owner.frames == ["1", "3"]
+
+
+async def test_backpressure():
+    owner = Owner(delay=0.01)
+    writer = FrameWriter(owner, max_size=2)
+
+    tasks = [asyncio.ensure_future(writer.send(str(i))) for i in range(5)]
+    await asyncio.sleep(0)
+
+    # The first frame is written, the others are queued or waiting
+    assert writer.depth == 2
+    assert writer.is_full()
+
+    await writer.wait_capacity()
+    assert not writer.is_full()
+
+    await writer.drain()
+    assert writer.idle
+    assert owner.frames == [str(i) for i in range(5)]
+    await asyncio.gather(*tasks)
+
+
+async def test_coalesce():
+    owner = Owner()
+    writer = FrameWriter(owner, coalesce=True, max_batch=3)
+
+    await asyncio.gather(*[writer.send_payload({"id": i}) for i in range(5)])
+
+    assert [json.loads(frame) for frame in owner.frames] == [
+        [{"id": 0}, {"id": 1}, {"id": 2}],
+        [{"id": 3}, {"id": 4}],
+    ]
+
+
+async def test_coalesce_encoding_error():
+    owner = Owner()
+    writer = FrameWriter(owner, coalesce=True)
+
+    results = await asyncio.gather(
+        writer.send_payload({"id": 1}),
+        writer.send_payload({"id": object()}),
+        writer.send_payload({"id": 3}),
+        return_exceptions=True,
+    )
+
+    assert results[0] is None
+    assert isinstance(results[1], TypeError)
+    assert results[2] is None
+    assert [json.loads(f) for f in owner.frames] == [{"id": 1}, {"id": 3}]
+
+
+async def test_close_rejects_queued_frames():
+    owner = Owner(delay=0.1)
+    writer = FrameWriter(owner)
+
+    first = asyncio.ensure_future(writer.send("1"))
+    queued = asyncio.ensure_future(writer.send("2"))
+    await asyncio.sleep(0)
+
+    writer.close()
+
+    with pytest.raises(ConnectionError):
+        await queued
+
+    await first
+    assert writer.idle
+
+
+class WriterHandler(WebSocketAsync):
+    pass
+
+
+class WriterClient(WSRPCClient):
+    pass
+
+
+WriterClient.add_route("echo", lambda _, value: value)
+
+
+@pytest.fixture
+def handler():
+    return WriterHandler
+
+
+async def test_serialized_writes(session, handler, socket_path, monkeypatch):
+    async def echo(socket, value):
+        # Concurrent calls of the client from the server side
+        return await asyncio.gather(
+            *[socket.proxy.echo(value=i) for i in range(value)]
+        )
+
+    handler.add_route("echo", echo)
+
+    client = WriterClient(session.make_url(socket_path))
+
+    writing = 0
+    overlapped = False
+
+    async def _write_frame(frame):
+        nonlocal writing, overlapped
+        writing += 1
+        overlapped = overlapped or writing > 1
+        try:
+            await asyncio.sleep(0)
+            await WriterClient._write_frame(client, frame)
+        finally:
+            writing -= 1
+
+    async with client:
+        monkeypatch.setattr(client, "_write_frame", _write_frame)
+
+        results = await asyncio.gather(
+            *[client.proxy.echo(value=10) for _ in range(10)]
+        )
+
+    assert results == [list(range(10))] * 10
+    assert not overlapped
+    assert client.writer.written >= 110
+
+
+async def test_deprecated_send_lock(session, socket_path):
+    client = WriterClient(session.make_url(socket_path))
+
+    with pytest.warns(DeprecationWarning):
+        lock = client.send_lock
+
+    assert isinstance(lock, asyncio.Lock)
+
+    with pytest.warns(DeprecationWarning):
+        assert client.send_lock is lock
+
+    await client.close()
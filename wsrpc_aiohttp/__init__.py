@@ -1,10 +1,39 @@
 from pathlib import Path
 
 from .websocket import decorators
+from .websocket.admission import OverloadPolicy
+from .websocket.backplane import (
+    Backplane,
+    MemoryBackplane,
+    UnixSocketBackplane,
+)
 from .websocket.client import WSRPCClient
-from .websocket.common import ClientException, WSRPCBase, WSRPCError
+from .websocket.codec import CBORCodec, Codec, MsgPackCodec
+from .websocket.common import (
+    ClientException,
+    RateLimitedError,
+    WSRPCBase,
+    WSRPCError,
+)
+from .websocket.executors import (
+    InlineExecutor,
+    ProcessExecutor,
+    RouteExecutor,
+    ThreadExecutor,
+)
 from .websocket.handler import WebSocketAsync, WebSocketBase, WebSocketThreaded
-from .websocket.route import AllowedRoute, PrefixRoute, Route, WebSocketRoute
+from .websocket.keepalive import KeepaliveMode
+from .websocket.metrics import Metrics
+from .websocket.pool import BalancingStrategy, WSRPCClientPool
+from .websocket.ratelimit import RateLimit, RateLimitPolicy
+from .websocket.reconnect import ReconnectPolicy
+from .websocket.route import (
+    AllowedRoute,
+    PrefixRoute,
+    Route,
+    RouteScope,
+    WebSocketRoute,
+)
 from .websocket.tools import serializer
 
 STATIC_DIR = str(Path(__file__).parent.resolve() / "static")
@@ -12,12 +41,32 @@ STATIC_DIR = str(Path(__file__).parent.resolve() / "static")
 
 __all__ = (
     "AllowedRoute",
+    "Backplane",
+    "BalancingStrategy",
+    "CBORCodec",
     "ClientException",
+    "Codec",
+    "InlineExecutor",
+    "KeepaliveMode",
+    "MemoryBackplane",
+    "Metrics",
+    "MsgPackCodec",
+    "OverloadPolicy",
     "PrefixRoute",
+    "ProcessExecutor",
+    "RateLimit",
+    "RateLimitPolicy",
+    "RateLimitedError",
+    "ReconnectPolicy",
     "Route",
+    "RouteExecutor",
+    "RouteScope",
     "STATIC_DIR",
+    "ThreadExecutor",
+    "UnixSocketBackplane",
     "WSRPCBase",
     "WSRPCClient",
+    "WSRPCClientPool",
     "WSRPCError",
     "WebSocketAsync",
     "WebSocketBase",
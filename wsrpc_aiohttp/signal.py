@@ -1,14 +1,59 @@
+import asyncio
 import inspect
 import logging
+from enum import Enum
+from typing import Any, Awaitable, Optional, Set
 
 log = logging.getLogger(__name__)
 
 
+class SignalMode(str, Enum):
+    """How the receivers of the signal are called"""
+
+    # One after another, the caller waits for all of them
+    SEQUENTIAL = "sequential"
+    # Concurrently, the caller waits for all of them
+    CONCURRENT = "concurrent"
+    # Concurrently in the background tasks, the caller does not wait
+    BACKGROUND = "background"
+
+
+# Exhausted iterator is reusable, awaiting it returns None right away
+_EXHAUSTED = iter(())
+
+
+class _Done:
+    """Awaitable which is returned instead of the coroutine when there
+    is nothing to wait for"""
+
+    __slots__ = ()
+
+    def __await__(self):
+        return _EXHAUSTED
+
+
+_DONE = _Done()
+
+
 class Signal:
-    __slots__ = ("_receivers", "_is_frozen")
+    """Set of the coroutine functions called on the event.
+
+    :param mode: see :class:`SignalMode`
+    :param timeout: how long each receiver might run, the receivers
+                    which did not finish in time are cancelled
+    """
+
+    __slots__ = ("_receivers", "_is_frozen", "mode", "timeout", "_tasks")
 
-    def __init__(self):
-        self._receivers = set()
+    def __init__(
+        self,
+        mode: SignalMode = SignalMode.SEQUENTIAL,
+        timeout: Optional[float] = None,
+    ):
+        self._receivers: Any = set()
+        self.mode = SignalMode(mode)
+        self.timeout = timeout
+        self._tasks: Set[asyncio.Task] = set()
 
     def connect(self, receiver):
         if self.is_frozen:
@@ -21,15 +66,69 @@ class Signal:
 
         self._receivers.add(receiver)
 
-    async def call(self, *args, **kwargs):
+    def __bool__(self) -> bool:
+        return bool(self._receivers)
+
+    def __len__(self) -> int:
+        return len(self._receivers)
+
+    def call(self, *args, **kwargs) -> Awaitable[None]:
+        """Calls the receivers, returns the awaitable which is
+        resolved according to the ``mode``.
+
+        No coroutine is created when the signal has no receivers,
+        the callers of the hot paths might also check the signal
+        with ``if signal:`` to skip building the arguments.
+        """
+        if not self._receivers:
+            return _DONE
+
+        if self.mode is SignalMode.SEQUENTIAL:
+            return self._call_sequential(args, kwargs)
+
+        if self.mode is SignalMode.CONCURRENT:
+            return self._call_concurrent(args, kwargs)
+
         for receiver in self._receivers:
-            try:
+            task = asyncio.ensure_future(self._run(receiver, args, kwargs))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        return _DONE
+
+    async def _run(self, receiver, args, kwargs) -> None:
+        try:
+            if self.timeout is None:
                 await receiver(*args, **kwargs)
-            except Exception:
-                log.exception("Exception in signal handler")
+            else:
+                await asyncio.wait_for(
+                    receiver(*args, **kwargs), timeout=self.timeout
+                )
+        except asyncio.TimeoutError:
+            log.warning(
+                "Signal handler %r did not finish in %r seconds",
+                receiver,
+                self.timeout,
+            )
+        except Exception:
+            log.exception("Exception in signal handler")
+
+    async def _call_sequential(self, args, kwargs) -> None:
+        for receiver in self._receivers:
+            await self._run(receiver, args, kwargs)
+
+    async def _call_concurrent(self, args, kwargs) -> None:
+        await asyncio.gather(
+            *[self._run(receiver, args, kwargs) for receiver in self._receivers]
+        )
+
+    async def drain(self) -> None:
+        """Waits for the receivers running in the background"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
 
     def copy(self):
-        clone = Signal()
+        clone = Signal(mode=self.mode, timeout=self.timeout)
         # unfreeze on copy
         clone._receivers = set(self._receivers)
         return clone
@@ -27,12 +27,13 @@ else:
     from typing_extensions import Concatenate, ParamSpec
 
 
-FrameMappingItemType = Mapping[IntEnum, Callable[[WSMessage], Any]]
-LocksCollectionType = DefaultDict[int, asyncio.Lock]
-FutureCollectionType = DefaultDict[int, asyncio.Future]
+FrameMappingItemType = Mapping[IntEnum, str]
+LocksCollectionType = Dict[int, asyncio.Lock]
 TimeoutType = Union[int, float]
 LoadsType = Callable[..., Any]
-DumpsType = Callable[..., str]
+# JSON might be serialized to the bytes, e.g. by orjson
+FrameType = Union[str, bytes, bytearray, memoryview]
+DumpsType = Callable[..., FrameType]
 
 
 class AbstractWebSocket(ABC):
@@ -155,6 +156,8 @@ EventListenerType = Callable[[EventType], Any]
 
 
 class WSRPCBase(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def __init__(
         self,
@@ -186,7 +189,7 @@ class WSRPCBase(ABC):
         raise NotImplementedError
 
     @classmethod
-    def get_clients(cls) -> Dict[str, "AbstractWSRPC"]:
+    def get_clients(cls) -> Dict[Any, "AbstractWSRPC"]:
         raise NotImplementedError
 
     @property
@@ -195,7 +198,7 @@ class WSRPCBase(ABC):
         raise NotImplementedError
 
     @property
-    def clients(self) -> Dict[str, "AbstractWSRPC"]:
+    def clients(self) -> Dict[Any, "AbstractWSRPC"]:
         """Property which contains the socket clients"""
         raise NotImplementedError
 
@@ -267,6 +270,10 @@ class WSRPCBase(ABC):
         """
         raise NotImplementedError
 
+    async def notify(self, method: str, **params: Any) -> None:
+        """Call remote function without waiting for the result"""
+        raise NotImplementedError
+
     async def emit(self, event: Any) -> None:
         pass
 
@@ -307,6 +314,8 @@ P = ParamSpec("P")
 
 
 class AbstractWSRPC(WSRPCBase, ABC):
+    __slots__ = ()
+
     @classmethod
     @abstractmethod
     def add_route(
@@ -315,6 +324,7 @@ class AbstractWSRPC(WSRPCBase, ABC):
         handler: Union[
             Callable[Concatenate[WSRPC, P], Any], Type[AbstractRoute]
         ],
+        executor: Any = None,
     ) -> None:
         """Expose local function through RPC
 
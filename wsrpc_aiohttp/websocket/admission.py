@@ -0,0 +1,161 @@
+import asyncio
+from collections import deque
+from enum import Enum
+from typing import Deque, Optional
+
+
+class OverloadPolicy(str, Enum):
+    """What to do with an incoming call when all execution slots are busy"""
+
+    # Hold the call until a slot is released, the socket is still read,
+    # so the running calls receive the replies, credits and pongs.
+    # Reading stops while more than ``max_queue`` calls are held.
+    BACKPRESSURE = "backpressure"
+    # Keep reading and park the call in a bounded queue
+    QUEUE = "queue"
+    # Reply with an ``OverloadedError`` immediately
+    REJECT = "reject"
+
+
+class AdmissionControl:
+    """Per connection limit of the concurrently executed calls.
+
+    Slots are handed over to the waiters in FIFO order, so a released slot
+    never becomes available for the caller which did not wait for it.
+    """
+
+    __slots__ = (
+        "limit",
+        "policy",
+        "max_queue",
+        "in_flight",
+        "queued",
+        "rejected",
+        "_waiters",
+        "_drained",
+    )
+
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        policy: OverloadPolicy = OverloadPolicy.BACKPRESSURE,
+        max_queue: int = 0,
+    ):
+        self.limit = limit
+        self.policy = OverloadPolicy(policy)
+        self.max_queue = max_queue
+
+        # Gauge of the running calls
+        self.in_flight = 0
+        # Counters of calls which had to wait for a slot or were rejected
+        self.queued = 0
+        self.rejected = 0
+
+        # Created on the first waiter, most connections never wait
+        self._waiters: Optional[Deque[asyncio.Future]] = None
+        # Resolved when the queue is not longer than max_queue
+        self._drained: Optional[asyncio.Future] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters) if self._waiters else 0
+
+    def is_full(self) -> bool:
+        return self.limit is not None and self.in_flight >= self.limit
+
+    def can_enqueue(self) -> bool:
+        return self.queue_depth < self.max_queue
+
+    def try_acquire(self) -> bool:
+        if self.is_full() or self._waiters:
+            return False
+
+        self.in_flight += 1
+        return True
+
+    def enqueue(self) -> asyncio.Future:
+        """Registers a waiter synchronously, the returned future will be
+        resolved when the slot is handed over to it."""
+        waiter = asyncio.get_event_loop().create_future()
+        if self._waiters is None:
+            self._waiters = deque()
+        self._waiters.append(waiter)
+        self.queued += 1
+        return waiter
+
+    async def wait(self, waiter: asyncio.Future) -> None:
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was already handed over
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+
+    def is_overflowed(self) -> bool:
+        return self.queue_depth > self.max_queue
+
+    async def wait_queue(self) -> None:
+        """Waits until no more than ``max_queue`` calls wait for a slot"""
+        while self.is_overflowed():
+            if self._drained is None:
+                self._drained = asyncio.get_event_loop().create_future()
+            await asyncio.shield(self._drained)
+
+    def _check_drained(self) -> None:
+        if self._drained is None or self.is_overflowed():
+            return
+
+        if not self._drained.done():
+            self._drained.set_result(None)
+        self._drained = None
+
+    async def acquire(self) -> None:
+        if self.try_acquire():
+            return
+        await self.wait(self.enqueue())
+
+    def reject(self) -> None:
+        self.rejected += 1
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+
+            # Hand the slot over, in_flight stays the same
+            waiter.set_result(None)
+            self._check_drained()
+            return
+
+        self.in_flight -= 1
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        if not self._waiters:
+            return
+
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+        self._check_drained()
+
+    def __repr__(self):
+        return (
+            "<{0}: in_flight={1} limit={2} queue={3} "
+            "queued={4} rejected={5}>".format(
+                self.__class__.__name__,
+                self.in_flight,
+                self.limit,
+                self.queue_depth,
+                self.queued,
+                self.rejected,
+            )
+        )
+
+
+__all__ = ("AdmissionControl", "OverloadPolicy")
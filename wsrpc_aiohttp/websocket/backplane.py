@@ -0,0 +1,562 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .abc import TimeoutType
+from .common import ClientException, WSRPCBase
+from .tools import serializer
+
+log = logging.getLogger(__name__)
+
+BatchType = Dict[str, Any]
+MessageType = Dict[str, Any]
+
+
+class Backplane(ABC):
+    """Relays the broadcasts and the calls of the clients between the
+    nodes, e.g. the worker processes of the server.
+
+    Every node announces the connections of its handler, so the backplane
+    knows on which node the client is connected. Messages are not sent
+    one by one, they are collected and sent to every node as one batch
+    per event-loop iteration or per ``flush_interval`` seconds.
+
+    .. code-block:: python
+
+        backplane = UnixSocketBackplane("/run/wsrpc")
+        backplane.install(WebSocketAsync)
+
+        app.on_startup.append(lambda _: backplane.start())
+        app.on_cleanup.append(lambda _: backplane.close())
+
+    Subclasses implement the transport.
+
+    :param node_id: unique name of the node, generated when omitted
+    :param timeout: how long the replies of the other nodes are awaited
+    :param flush_interval: delay of the batches in seconds
+    """
+
+    __slots__ = (
+        "node_id",
+        "timeout",
+        "flush_interval",
+        "clients",
+        "handler",
+        "relayed",
+        "batches",
+        "_loop",
+        "_outbox",
+        "_flushing",
+        "_requests",
+        "_serial",
+        "_tasks",
+    )
+
+    def __init__(
+        self,
+        node_id: Optional[str] = None,
+        timeout: TimeoutType = 30,
+        flush_interval: float = 0,
+    ):
+        self.node_id = node_id or "{0}-{1}-{2}".format(
+            socket.gethostname(), os.getpid(), uuid.uuid4().hex[:8]
+        )
+        self.timeout = timeout
+        self.flush_interval = flush_interval
+        # Clients of the other nodes, client id to node id
+        self.clients: Dict[str, str] = {}
+        self.handler: Any = None
+        # Counters of the sent messages and batches
+        self.relayed = 0
+        self.batches = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._outbox: Dict[str, List[MessageType]] = {}
+        self._flushing = False
+        self._requests: Dict[int, Tuple[str, asyncio.Future]] = {}
+        self._serial = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    def install(self, handler: Any) -> "Backplane":
+        """Relays the broadcasts and the calls of the handler class"""
+        handler.BACKPLANE = self
+        self.handler = handler
+        return self
+
+    def uninstall(self) -> None:
+        if self.handler is not None and self.handler.BACKPLANE is self:
+            self.handler.BACKPLANE = None
+        self.handler = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.get_event_loop()
+        return self._loop
+
+    @abstractmethod
+    def peers(self) -> List[str]:
+        """Identifiers of the other nodes"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def _open(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def _shutdown(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def _transmit(self, node: str, batch: BatchType) -> None:
+        """Delivers the batch to the node, the receiving node passes
+        it to ``_receive``"""
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        """Joins the other nodes and requests their clients"""
+        self._loop = asyncio.get_event_loop()
+        await self._open()
+        self._publish(dict(t="sync"))
+        self._announce(None)
+
+    async def close(self) -> None:
+        self._publish(dict(t="bye"))
+        await self._send_outbox()
+
+        for node in {node for node, _ in self._requests.values()}:
+            self._node_gone(node)
+
+        for task in tuple(self._tasks):
+            task.cancel()
+
+        await self._shutdown()
+        self.clients.clear()
+
+    def address(self, client_id: Any) -> str:
+        """Address of the local connection which is unique across the
+        nodes, the connection ids are unique within the process only"""
+        return "{0}/{1}".format(self.node_id, client_id)
+
+    def joined(self, client_id: Any) -> None:
+        """Announces the new connection of the local handler"""
+        self._publish(dict(t="join", clients=[self.address(client_id)]))
+
+    def left(self, client_id: Any) -> None:
+        self._publish(dict(t="leave", clients=[self.address(client_id)]))
+
+    def _announce(self, node: Optional[str]) -> None:
+        if self.handler is None:
+            return
+
+        clients = [
+            self.address(client_id) for client_id in self.handler.get_clients()
+        ]
+        if clients:
+            self._publish(dict(t="join", clients=clients), node)
+
+    def _create_task(self, coro) -> asyncio.Task:
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _publish(self, message: MessageType, node: Optional[str] = None):
+        """Puts the message to the batch of the node,
+        or of every node when ``None``"""
+        for peer in self.peers() if node is None else (node,):
+            self._outbox.setdefault(peer, []).append(message)
+
+        if self._outbox and not self._flushing:
+            self._flushing = True
+
+            if self.flush_interval:
+                self.loop.call_later(self.flush_interval, self._flush)
+            else:
+                self.loop.call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self._create_task(self._send_outbox())
+
+    async def _send_outbox(self) -> None:
+        outbox, self._outbox = self._outbox, {}
+        self._flushing = False
+
+        for node, messages in outbox.items():
+            try:
+                await self._transmit(
+                    node, dict(node=self.node_id, messages=messages)
+                )
+            except Exception as e:
+                log.warning("Failed to relay to the node %s: %r", node, e)
+                self._node_gone(node)
+                continue
+
+            self.relayed += len(messages)
+            self.batches += 1
+
+    def _node_gone(self, node: str) -> None:
+        for client_id, client_node in tuple(self.clients.items()):
+            if client_node == node:
+                del self.clients[client_id]
+
+        for serial, (target, future) in tuple(self._requests.items()):
+            if target == node and not future.done():
+                future.set_exception(
+                    ConnectionError("Node {0} has gone".format(node))
+                )
+
+    async def _request(
+        self,
+        node: str,
+        message: MessageType,
+        timeout: Optional[TimeoutType] = None,
+    ) -> MessageType:
+        """Sends the message to the node and waits for the reply"""
+        self._serial += 1
+        serial = self._serial
+        future = self.loop.create_future()
+        self._requests[serial] = (node, future)
+
+        try:
+            self._publish(dict(message, req=serial), node)
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        finally:
+            self._requests.pop(serial, None)
+
+    def _reply(self, node: str, serial: int, **kwargs) -> None:
+        self._publish(dict(t="reply", req=serial, **kwargs), node)
+
+    def _receive(self, batch: BatchType) -> None:
+        node = batch["node"]
+
+        for message in batch["messages"]:
+            try:
+                self._dispatch(node, message)
+            except Exception:
+                log.exception("Failed to handle %r from %s", message, node)
+
+    def _dispatch(self, node: str, message: MessageType) -> None:
+        kind = message["t"]
+
+        if kind == "reply":
+            request = self._requests.get(message["req"])
+            if request is not None and not request[1].done():
+                request[1].set_result(message)
+        elif kind == "join":
+            for client_id in message["clients"]:
+                self.clients[client_id] = node
+        elif kind == "leave":
+            for client_id in message["clients"]:
+                if self.clients.get(client_id) == node:
+                    del self.clients[client_id]
+        elif kind == "sync":
+            self._announce(node)
+        elif kind == "bye":
+            self._node_gone(node)
+        elif kind == "broadcast":
+            self._create_task(self._handle_broadcast(node, message))
+        elif kind == "call":
+            self._create_task(self._handle_call(node, message))
+        else:
+            log.warning("Unknown message %r from %s", message, node)
+
+    async def broadcast(
+        self, func: str, params: Dict[str, Any], wait_replies: bool = True
+    ) -> List[Any]:
+        """Broadcasts the call to the clients of the other nodes, returns
+        their results, the errors are returned as the exceptions"""
+        message = dict(t="broadcast", func=func, params=params)
+
+        if not wait_replies:
+            self._publish(message)
+            return []
+
+        nodes = self.peers()
+        replies = await asyncio.gather(
+            *[self._request(node, message) for node in nodes],
+            return_exceptions=True,
+        )
+
+        results: List[Any] = []
+        for node, reply in zip(nodes, replies):
+            if isinstance(reply, BaseException):
+                log.warning("Node %s did not broadcast: %r", node, reply)
+                continue
+
+            for item in reply["results"]:
+                if "error" in item:
+                    results.append(ClientException(item["error"]))
+                else:
+                    results.append(item.get("result"))
+
+        return results
+
+    async def call(
+        self,
+        client_id: Any,
+        func: str,
+        params: Dict[str, Any],
+        timeout: Optional[TimeoutType] = None,
+    ) -> Any:
+        """Calls the client connected to the other node by its
+        :meth:`address`"""
+        node = self.clients.get(str(client_id))
+        if node is None:
+            raise KeyError(client_id)
+
+        reply = await self._request(
+            node,
+            dict(
+                t="call",
+                client=str(client_id),
+                func=func,
+                params=params,
+                timeout=timeout,
+            ),
+            timeout,
+        )
+
+        if "error" in reply:
+            raise ClientException(reply["error"])
+        return reply.get("result")
+
+    async def _handle_broadcast(self, node: str, message: MessageType):
+        serial = message.get("req")
+
+        results = await self.handler._broadcast(
+            message["func"],
+            None,
+            True,
+            serial is not None,
+            self.handler.BROADCAST_CHUNK_SIZE,
+            message["params"],
+            relay=False,
+        )
+
+        if serial is None:
+            return
+
+        self._reply(
+            node,
+            serial,
+            results=[
+                dict(error=_format_error(result))
+                if isinstance(result, BaseException)
+                else dict(result=result)
+                for result in results
+            ],
+        )
+
+    async def _handle_call(self, node: str, message: MessageType):
+        serial = message["req"]
+        client = self.handler.find_client(message["client"])
+
+        try:
+            if client is None:
+                raise KeyError("Client {0} not found".format(message["client"]))
+
+            result = await client.call(
+                message["func"],
+                timeout=message.get("timeout"),
+                **message["params"],
+            )
+        except Exception as e:
+            self._reply(node, serial, error=_format_error(e))
+            return
+
+        self._reply(node, serial, result=result)
+
+    def __repr__(self):
+        return "<{0}: {1} clients={2}>".format(
+            self.__class__.__name__, self.node_id, len(self.clients)
+        )
+
+
+def _format_error(e: BaseException) -> Any:
+    if isinstance(e, ClientException):
+        return e.raw
+    return WSRPCBase._format_error(e)
+
+
+class MemoryHub:
+    """Nodes of the :class:`MemoryBackplane` within one process"""
+
+    __slots__ = ("nodes",)
+
+    def __init__(self):
+        self.nodes: Dict[str, "MemoryBackplane"] = {}
+
+
+class MemoryBackplane(Backplane):
+    """Backplane of the nodes within one process, e.g. the several
+    applications or handler classes in one event loop, and the tests"""
+
+    __slots__ = ("hub",)
+
+    def __init__(self, hub: MemoryHub, **kwargs):
+        super().__init__(**kwargs)
+        self.hub = hub
+
+    def peers(self) -> List[str]:
+        return [node for node in self.hub.nodes if node != self.node_id]
+
+    async def _open(self) -> None:
+        self.hub.nodes[self.node_id] = self
+
+    async def _shutdown(self) -> None:
+        self.hub.nodes.pop(self.node_id, None)
+
+    async def _transmit(self, node: str, batch: BatchType) -> None:
+        target = self.hub.nodes.get(node)
+        if target is None:
+            raise ConnectionError("Node {0} is not running".format(node))
+
+        target.loop.call_soon_threadsafe(target._receive, batch)
+
+
+class UnixSocketBackplane(Backplane):
+    """Backplane of the processes on the same host.
+
+    Every node listens on the ``<node_id>.sock`` socket in the
+    ``directory``, and the other nodes are discovered by their sockets
+    in it. Batches are sent as the length prefixed JSON documents.
+
+    :param directory: directory shared by the nodes
+    :param discovery_interval: how often the directory is listed
+    """
+
+    __slots__ = (
+        "directory",
+        "discovery_interval",
+        "_server",
+        "_connections",
+        "_accepted",
+        "_peers",
+        "_discovered_at",
+    )
+
+    SUFFIX = ".sock"
+    HEADER = struct.Struct("!I")
+
+    def __init__(self, directory: str, discovery_interval: float = 1, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        self.discovery_interval = discovery_interval
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[str, asyncio.StreamWriter] = {}
+        self._accepted: Set[asyncio.StreamWriter] = set()
+        self._peers: List[str] = []
+        self._discovered_at = 0.0
+
+    @property
+    def path(self) -> str:
+        return self._path(self.node_id)
+
+    def _path(self, node: str) -> str:
+        return os.path.join(self.directory, node + self.SUFFIX)
+
+    def peers(self) -> List[str]:
+        now = time.monotonic()
+
+        if now - self._discovered_at >= self.discovery_interval:
+            self._discovered_at = now
+            self._peers = [
+                name[: -len(self.SUFFIX)]
+                for name in sorted(os.listdir(self.directory))
+                if name.endswith(self.SUFFIX)
+                and name != self.node_id + self.SUFFIX
+            ]
+
+        return self._peers
+
+    def _receive(self, batch: BatchType) -> None:
+        # The node started after the last discovery
+        if batch["node"] not in self._peers:
+            self._peers = self._peers + [batch["node"]]
+
+        super()._receive(batch)
+
+    def _node_gone(self, node: str) -> None:
+        super()._node_gone(node)
+
+        self._peers = [peer for peer in self._peers if peer != node]
+        connection = self._connections.pop(node, None)
+        if connection is not None:
+            connection.close()
+
+    async def _open(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._server = await asyncio.start_unix_server(
+            self._serve, path=self.path
+        )
+        self._discovered_at = 0.0
+
+    async def _shutdown(self) -> None:
+        for writer in (*self._connections.values(), *self._accepted):
+            writer.close()
+        self._connections.clear()
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        with suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._accepted.add(writer)
+
+        try:
+            while True:
+                header = await reader.readexactly(self.HEADER.size)
+                (size,) = self.HEADER.unpack(header)
+                self._receive(json.loads(await reader.readexactly(size)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._accepted.discard(writer)
+            writer.close()
+
+    async def _transmit(self, node: str, batch: BatchType) -> None:
+        writer = self._connections.get(node)
+
+        try:
+            if writer is None or writer.is_closing():
+                _, writer = await asyncio.open_unix_connection(self._path(node))
+                self._connections[node] = writer
+
+            data = json.dumps(batch, default=serializer).encode()
+            writer.write(self.HEADER.pack(len(data)) + data)
+            await writer.drain()
+        except OSError as e:
+            connection = self._connections.pop(node, None)
+            if connection is not None:
+                connection.close()
+
+            if isinstance(e, ConnectionRefusedError):
+                # Nobody listens, the socket of the crashed node is stale
+                with suppress(OSError):
+                    os.unlink(self._path(node))
+
+            self._discovered_at = 0.0
+            raise
+
+
+__all__ = (
+    "Backplane",
+    "MemoryBackplane",
+    "MemoryHub",
+    "UnixSocketBackplane",
+)
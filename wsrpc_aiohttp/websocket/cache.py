@@ -0,0 +1,187 @@
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Union
+
+
+class CachePolicy(NamedTuple):
+    """Results of the route are cached for ``ttl`` seconds (forever when
+    ``None``), up to ``maxsize`` least recently used results are kept"""
+
+    ttl: Optional[float] = None
+    maxsize: int = 1024
+
+
+class CachedResult:
+    """Result of the call and its encoded reply templates"""
+
+    __slots__ = ("result", "expires", "frames")
+
+    def __init__(self, result: Any, expires: Optional[float]):
+        self.result = result
+        self.expires = expires
+        # Encoded {"result": ...} frames per encoder, the serial of the
+        # call is spliced in, so the hit does not serialize the result
+        self.frames: Dict[Any, Any] = {}
+
+
+def make_key(args: Sequence[Any], kwargs: Dict[str, Any]) -> Optional[str]:
+    """Canonical form of the call params, ``None`` when the params
+    could not be compared by value"""
+    if not args and not kwargs:
+        return ""
+
+    try:
+        return json.dumps(
+            [args, kwargs],
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+class ResultCache:
+    """LRU cache of the results of one method with the TTL eviction.
+
+    Expired results are evicted lazily on the lookup and as the least
+    recently used ones.
+    """
+
+    __slots__ = ("ttl", "maxsize", "hits", "misses", "_items")
+
+    def __init__(self, policy: CachePolicy = CachePolicy()):
+        self.ttl = policy.ttl
+        self.maxsize = policy.maxsize
+        # Counters of the lookups
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[str, CachedResult]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str, now: float) -> Optional[CachedResult]:
+        item = self._items.get(key)
+
+        if item is not None and item.expires is not None:
+            if item.expires <= now:
+                del self._items[key]
+                item = None
+
+        if item is None:
+            self.misses += 1
+            return None
+
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item
+
+    def put(self, key: str, result: Any, now: float) -> CachedResult:
+        expires = None if self.ttl is None else now + self.ttl
+        item = self._items[key] = CachedResult(result, expires)
+        self._items.move_to_end(key)
+
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+        return item
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drops the result of the params ``key`` or all the results"""
+        if key is None:
+            self._items.clear()
+        else:
+            self._items.pop(key, None)
+
+    @property
+    def ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self):
+        return "<{0}: size={1} hits={2} misses={3}>".format(
+            self.__class__.__name__, len(self._items), self.hits, self.misses
+        )
+
+
+class SingleFlight:
+    """In-flight calls of one method by their params.
+
+    The first call of the params executes the method, the identical
+    calls made until it finishes wait for its :class:`CachedResult`
+    instead. The future resolves to ``None`` when the result could not
+    be shared (e.g. it is streamed or the call was cancelled), then the
+    waiters execute the method themselves.
+    """
+
+    __slots__ = ("executed", "coalesced", "_flights")
+
+    def __init__(self):
+        # Counters of the executed calls and of the calls which
+        # waited for the identical in-flight one
+        self.executed = 0
+        self.coalesced = 0
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def join(self, key: str) -> Optional[asyncio.Future]:
+        """Returns the future of the identical in-flight call"""
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+        return flight
+
+    def start(
+        self, key: str, loop: asyncio.AbstractEventLoop
+    ) -> asyncio.Future:
+        flight = self._flights[key] = loop.create_future()
+        self.executed += 1
+        return flight
+
+    def finish(
+        self,
+        key: str,
+        flight: asyncio.Future,
+        outcome: Union[CachedResult, BaseException, None],
+    ) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+        if flight.done():
+            return
+
+        if isinstance(outcome, Exception):
+            flight.set_exception(outcome)
+            # Nobody might wait for it, do not log it as never retrieved
+            flight.exception()
+        elif isinstance(outcome, CachedResult):
+            flight.set_result(outcome)
+        else:
+            flight.set_result(None)
+
+    @property
+    def ratio(self) -> float:
+        """Share of the calls served by the other call's execution"""
+        calls = self.executed + self.coalesced
+        return self.coalesced / calls if calls else 0.0
+
+    def __repr__(self):
+        return "<{0}: in_flight={1} executed={2} coalesced={3}>".format(
+            self.__class__.__name__,
+            len(self._flights),
+            self.executed,
+            self.coalesced,
+        )
+
+
+__all__ = (
+    "CachePolicy",
+    "CachedResult",
+    "ResultCache",
+    "SingleFlight",
+    "make_key",
+)
@@ -1,20 +1,46 @@
+import asyncio
 import json
 import logging
-from asyncio import Lock
-from typing import Optional, Union
+import warnings
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Optional, Union
 
 import aiohttp
 from yarl import URL
 
+from .codec import Codec, find_codec
 from .common import WSRPCBase
+from .reconnect import ReconnectPolicy
 from .tools import Lazy, awaitable
 
 log = logging.getLogger(__name__)
 SocketType = Optional[aiohttp.ClientWebSocketResponse]
+ReconnectHookType = Callable[["WSRPCClient"], Any]
+
+# The sends of the reconnection hook are not queued
+_in_reconnect_hook: ContextVar[bool] = ContextVar(
+    "in_reconnect_hook", default=False
+)
 
 
 class WSRPCClient(WSRPCBase):
-    """WSRPC Client class"""
+    """WSRPC Client class
+
+    :param codecs: binary codecs (see
+                   :class:`wsrpc_aiohttp.websocket.codec.Codec`) which
+                   will be offered to the server in order of the
+                   preference, JSON is used when the server supports none
+    :param reconnect: :class:`wsrpc_aiohttp.ReconnectPolicy`, when passed
+                      the lost connection will be restored, and the calls
+                      made meanwhile will wait for it
+    :param on_reconnect: function or coroutine function which receives
+                         the client after each reconnection, e.g. to
+                         restore the subscriptions. Calls made by it are
+                         sent before the waiting ones.
+    :param close_session: close the ``session`` together with the
+                          client, pass ``False`` when the session is
+                          shared with the other clients
+    """
 
     def __init__(
         self,
@@ -24,18 +50,58 @@ class WSRPCClient(WSRPCBase):
         session: Optional[aiohttp.ClientSession] = None,
         loads=json.loads,
         dumps=json.dumps,
+        codecs: Iterable[Codec] = (),
+        reconnect: Optional[ReconnectPolicy] = None,
+        on_reconnect: Optional[ReconnectHookType] = None,
+        close_session: bool = True,
         **kwargs,
     ):
         WSRPCBase.__init__(
             self, loop=loop, timeout=timeout, loads=loads, dumps=dumps
         )
         self._url = URL(str(endpoint))
+        # The own session is always closed with the client
+        self._close_session = close_session or session is None
         self._session = session or aiohttp.ClientSession(**kwargs)
-        self.send_lock = Lock()
+        self._codecs = tuple(codecs)
 
         self.socket: SocketType = None
         self.closed = False
 
+        self._reconnect_policy = reconnect
+        self._on_reconnect = on_reconnect
+        # Resolved when the lost connection is restored
+        self._reconnected: Optional[asyncio.Future] = None
+        self._reconnect_queue = 0
+        # Frames of the idempotent calls which are waiting for the reply
+        self._replay: Dict[int, Dict[str, Any]] = {}
+        self.reconnects = 0
+        self._send_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def send_lock(self) -> asyncio.Lock:
+        """Deprecated, the frames are written by the single writer (see
+        :attr:`writer`) and are not sent under this lock anymore. Use
+        ``await client.writer.drain()`` to wait for the sent frames."""
+        warnings.warn(
+            "WSRPCClient.send_lock is deprecated and does not guard "
+            "the writes anymore, see WSRPCClient.writer",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+
+        if self._send_lock is None:
+            self._send_lock = asyncio.Lock()
+        return self._send_lock
+
+    @property
+    def connected(self) -> bool:
+        return (
+            self.socket is not None
+            and not self.socket.closed
+            and self._reconnected is None
+        )
+
     # noinspection PyMethodOverriding
     async def close(self):
         """Close the client connect connection"""
@@ -43,42 +109,205 @@ class WSRPCClient(WSRPCBase):
         if self.closed:
             return
 
+        self.closed = True
+        self._stop_reconnecting(
+            aiohttp.ClientConnectionError("Connection was closed.")
+        )
+
         await super().close()
 
         if self.socket:
             await self.socket.close()
 
-        await self._session.close()
+        if self._close_session:
+            await self._session.close()
 
     async def connect(self):
         """Perform connection to the server"""
 
-        self.socket = await self._session.ws_connect(str(self._url))
+        self.socket = await self._session.ws_connect(
+            str(self._url), protocols=[codec.name for codec in self._codecs]
+        )
+        self._codec = find_codec(self._codecs, self.socket.protocol)
         self._create_task(self.__handle_connection())
 
     async def __handle_connection(self):
-        while True:
-            async for message in self.socket:  # type: aiohttp.WSMessage
-                await self._on_message(message)
-            else:
-                log.info("Connection was closed")
-                self._loop.create_task(self.close())
-                break
+        async for message in self.socket:  # type: aiohttp.WSMessage
+            await self._on_message(message)
+
+        log.info("Connection was closed")
+
+        if self._reconnect_policy is None or self.closed:
+            self._loop.create_task(self.close())
+            return
+
+        self._connection_lost()
+
+    def _connection_lost(self) -> None:
+        """Fails the calls which can not be sent again and starts
+        the reconnection"""
+        if self._reconnected is not None:
+            return
+
+        self._reconnected = self._loop.create_future()
+        error = ConnectionError("Connection lost")
+
+        for serial in self._pending_calls.serials():
+            if serial not in self._replay:
+                self._pending_calls.reject(serial, error)
+
+        for stream in tuple(self._streams.values()):
+            stream.feed_exception(error)
+
+        for window in self._stream_windows.values():
+            window.cancel()
+
+        self._create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        policy: ReconnectPolicy = self._reconnect_policy  # type: ignore
+        attempt = 0
+
+        while policy.should_retry(attempt) and not self.closed:
+            await asyncio.sleep(policy.delay(attempt))
+            attempt += 1
+
+            try:
+                await self.connect()
+            except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as e:
+                log.warning(
+                    "Reconnection attempt %d to %s failed: %r",
+                    attempt,
+                    self._url,
+                    e,
+                )
+                continue
+
+            self.reconnects += 1
+            log.info("Reconnected to %s after %d attempts", self._url, attempt)
+
+            await self._after_reconnect()
+            return
+
+        log.error("Giving up reconnecting to %s", self._url)
+        self._stop_reconnecting(
+            aiohttp.ClientConnectionError("Reconnection failed")
+        )
+        self._loop.create_task(self.close())
+
+    async def _after_reconnect(self) -> None:
+        token = _in_reconnect_hook.set(True)
 
-    async def _send(self, **kwargs):
         try:
-            log.debug(
-                "Sending message to %s serial %s: %s",
-                self._url,
-                Lazy(lambda: kwargs.get("id")),
-                Lazy(lambda: kwargs),
+            if self._on_reconnect is not None:
+                await awaitable(self._on_reconnect)(self)
+
+            for serial, payload in tuple(self._replay.items()):
+                if serial in self._pending_calls:
+                    await self._send_frame(self._encode(payload))
+        except Exception:
+            log.exception("Failed to restore the state after reconnection")
+        finally:
+            _in_reconnect_hook.reset(token)
+
+        self._stop_reconnecting()
+
+    def _stop_reconnecting(
+        self, exc: Optional[BaseException] = None
+    ) -> None:
+        waiter, self._reconnected = self._reconnected, None
+
+        if waiter is None or waiter.done():
+            return
+
+        if exc is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(exc)
+            # Retrieve the exception when nobody waits for it
+            waiter.exception()
+
+    async def _wait_reconnected(self) -> None:
+        policy: ReconnectPolicy = self._reconnect_policy  # type: ignore
+
+        if self._reconnect_queue >= policy.max_queue:
+            raise aiohttp.ClientConnectionError(
+                "Too many calls are waiting for the reconnection"
             )
 
-            if self.socket.closed:
-                raise aiohttp.ClientConnectionError("Connection was closed.")
+        self._reconnect_queue += 1
+        try:
+            await asyncio.shield(self._reconnected)  # type: ignore
+        finally:
+            self._reconnect_queue -= 1
+
+    def _is_reconnecting(self) -> bool:
+        """Whether the sends have to wait for the reconnection, the lost
+        connection is noticed here when the reading task did not yet"""
+        if self._reconnect_policy is None or self.closed:
+            return False
+
+        socket = self.socket
+        if self._reconnected is None and socket is not None and socket.closed:
+            self._connection_lost()
+
+        return self._reconnected is not None and not _in_reconnect_hook.get()
+
+    async def call(self, func: str, timeout=None, **kwargs):
+        """See :meth:`WSRPCBase.call`. The ``timeout`` covers the wait
+        for the reconnection as well as the wait for the reply."""
+        timeout = timeout or self._timeout
+
+        if timeout is not None and self._is_reconnecting():
+            # The reconnection is waited for within the call timeout
+            deadline = self._loop.time() + timeout
 
-            async with self.send_lock:
-                return await self.socket.send_json(kwargs, dumps=self._dumps)
+            while self._is_reconnecting():
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    raise asyncio.TimeoutError
+
+                await asyncio.wait_for(self._wait_reconnected(), timeout)
+
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                raise asyncio.TimeoutError
+
+        return await super().call(func, timeout=timeout, **kwargs)
+
+    def _remember(self, serial: int, payload: Dict[str, Any]) -> None:
+        future = self._pending_calls.get(serial)
+        if future is None:
+            return
+
+        self._replay[serial] = payload
+        future.add_done_callback(lambda _: self._replay.pop(serial, None))
+
+    async def _send(self, **kwargs):
+        log.debug(
+            "Sending message to %s serial %s: %s",
+            self._url,
+            Lazy(lambda: kwargs.get("id")),
+            Lazy(lambda: kwargs),
+        )
+
+        if self._reconnect_policy is not None and not self.closed:
+            if self._is_reconnecting():
+                await self._wait_reconnected()
+
+            method = kwargs.get("method")
+            if method is not None and "id" in kwargs:
+                if self._reconnect_policy.is_idempotent(method):
+                    self._remember(kwargs["id"], kwargs)
+
+        if self.socket.closed:
+            raise aiohttp.ClientConnectionError("Connection was closed.")
+
+        await self._send_payload(kwargs)
+
+    async def _write_frame(self, frame):
+        try:
+            await super()._write_frame(frame)
         except aiohttp.WebSocketError:
             self._loop.create_task(self.close())
             raise
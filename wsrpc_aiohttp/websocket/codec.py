@@ -0,0 +1,98 @@
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Optional
+
+from .tools import serializer
+
+try:
+    import msgpack  # type: ignore
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import cbor2  # type: ignore
+except ImportError:  # pragma: no cover
+    cbor2 = None  # type: ignore
+
+
+class Codec(ABC):
+    """Binary frame codec.
+
+    The codec is chosen per connection during the handshake, ``name`` is
+    used as the WebSocket subprotocol. Connections without a negotiated
+    codec keep using JSON text frames.
+
+    .. code-block:: python
+
+        class MyCodec(Codec):
+            name = "wsrpc.my-codec"
+
+            def dumps(self, value) -> bytes:
+                ...
+
+            def loads(self, data: bytes):
+                ...
+    """
+
+    name: str
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return "<{0}: {1}>".format(self.__class__.__name__, self.name)
+
+
+class MsgPackCodec(Codec):
+    """MessagePack codec, requires the ``msgpack`` package.
+    ``bytes`` are transferred as is."""
+
+    name = "wsrpc.msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError("The msgpack package is not installed")
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=serializer, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def _cbor_default(encoder, value):
+    encoder.encode(serializer(value))
+
+
+class CBORCodec(Codec):
+    """CBOR codec, requires the ``cbor2`` package.
+    ``bytes`` are transferred as is."""
+
+    name = "wsrpc.cbor"
+
+    def __init__(self):
+        if cbor2 is None:
+            raise RuntimeError("The cbor2 package is not installed")
+
+    def dumps(self, value: Any) -> bytes:
+        return cbor2.dumps(value, default=_cbor_default)
+
+    def loads(self, data: bytes) -> Any:
+        return cbor2.loads(data)
+
+
+def find_codec(
+    codecs: Iterable[Codec], protocol: Optional[str]
+) -> Optional[Codec]:
+    """Returns the codec negotiated as the WebSocket subprotocol"""
+    for codec in codecs:
+        if codec.name == protocol:
+            return codec
+    return None
+
+
+__all__ = ("CBORCodec", "Codec", "MsgPackCodec", "find_codec")
@@ -1,11 +1,14 @@
 import abc
 import asyncio
+import inspect
 import json
 import logging
 import types
 import typing as t
 from collections import defaultdict
+from enum import IntEnum
 from functools import partial
+from time import perf_counter
 
 import aiohttp
 
@@ -19,16 +22,35 @@ from .abc import (
     EventListenerCollectionType,
     EventListenerType,
     FrameMappingItemType,
-    FutureCollectionType,
+    FrameType,
     LoadsType,
-    LocksCollectionType,
     Proxy,
     RouteCollectionType,
     RouteType,
     TimeoutType,
 )
-from .route import Route
-from .tools import Singleton, awaitable, serializer
+from .admission import AdmissionControl, OverloadPolicy
+from .cache import (
+    CachedResult,
+    CachePolicy,
+    ResultCache,
+    SingleFlight,
+    make_key,
+)
+from .codec import Codec
+from .metrics import OTHER_METHOD, Metrics
+from .pending import PendingCalls
+from .ratelimit import (
+    RateLimit,
+    RateLimiter,
+    RateLimitPolicy,
+    TokenBucket,
+)
+from .route import Route, RouteScope, routes_generation
+from .stream import CallStream, StreamWindow
+from .tools import RecentSerials, Singleton, awaitable, serializer
+from .workers import CallWorkers
+from .writer import FrameWriter
 
 
 class WSRPCError(Exception):
@@ -48,6 +70,23 @@ class PingTimeoutError(WSRPCError):
     pass
 
 
+class OverloadedError(WSRPCError):
+    pass
+
+
+class TooManyPendingCallsError(WSRPCError):
+    pass
+
+
+class RateLimitedError(WSRPCError):
+    pass
+
+
+class SerialLock(asyncio.Lock):
+    # How many calls hold or wait for the lock
+    users = 0
+
+
 def ping(_, **kwargs):
     return kwargs
 
@@ -72,6 +111,26 @@ CallItem = t.NamedTuple(
 )
 
 
+DispatchEntry = t.NamedTuple(
+    "DispatchEntry",
+    (
+        # Function or the Route class
+        ("callee", t.Callable[..., t.Any]),
+        # Should the socket be passed as the first argument
+        ("inject_socket", bool),
+        # Route name and method name for Route classes
+        ("route", t.Optional[str]),
+        ("method", t.Optional[str]),
+        # RouteExecutor of the route, the handler's one is used when None
+        ("executor", t.Any),
+    ),
+)
+
+ResolvedType = t.Tuple[t.Callable[..., t.Any], bool, t.Any]
+
+DispatchTableType = t.Dict[str, DispatchEntry]
+
+
 def _route_maker() -> t.Dict[str, RouteType]:
     return {"ping": ping}  # type: ignore
 
@@ -81,30 +140,186 @@ class WSRPCBase(AbstractWSRPC):
 
     _ROUTES: RouteCollectionType = defaultdict(_route_maker)
     _CLIENTS: ClientCollectionType = defaultdict(dict)
-    _CLEAN_LOCK_TIMEOUT: t.Union[int, float] = 2
+    # Compiled tables with the EXECUTOR and the routes generation
+    # they were compiled with
+    _DISPATCH: t.Dict[
+        t.Type["WSRPCBase"], t.Tuple[t.Any, int, DispatchTableType]
+    ] = {}
+    _ROUTE_EXECUTORS: t.DefaultDict[
+        t.Type["WSRPCBase"], t.Dict[str, t.Any]
+    ] = defaultdict(dict)
+
+    # RouteExecutor for the routes without their own executor,
+    # when None the _executor method is used
+    EXECUTOR: t.Any = None
+    # Metrics collector, see Metrics.install
+    METRICS: t.Optional[Metrics] = None
+    MAX_PENDING_CALLS: t.Optional[int] = 65536
+
+    # Merge outgoing frames queued within the same event-loop iteration
+    # or within COALESCE_WINDOW seconds into one batch frame
+    COALESCE_FRAMES: bool = False
+    COALESCE_WINDOW: float = 0
+
+    # How many outgoing frames might wait for the writer before
+    # the senders will wait for the capacity, None means unlimited
+    MAX_WRITE_QUEUE: t.Optional[int] = 1024
+
+    # Lock-free mode drops the calls with recently seen serials instead
+    # of executing duplicates one by one under a per-serial lock
+    LOCK_FREE_DISPATCH: bool = False
+    RECENT_SERIALS_SIZE: int = 128
+
+    # Send JSON serialized to bytes as the binary frames, so the remote
+    # side passes them to loads without decoding. The binary frames are
+    # not supported by the browser client and the older versions.
+    JSON_BINARY_FRAMES: bool = False
+
+    # How many chunks of the streamed call might be sent
+    # before the caller returns the credit
+    STREAM_CREDIT: int = 64
+
+    _DATA_FRAMES = frozenset(
+        (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY)
+    )
+
+    MAX_CONCURRENT_REQUESTS: t.Optional[int] = None
+    MAX_QUEUED_REQUESTS: int = 0
+    # How long the worker task which executed the incoming call waits
+    # for the next one, zero means the task per call
+    WORKER_IDLE_TIMEOUT: float = 1
+    OVERLOAD_POLICY: OverloadPolicy = OverloadPolicy.BACKPRESSURE
+
+    # Token bucket rate limits of the incoming calls of each connection,
+    # of each method of the connection and of all the connections
+    RATE_LIMIT: t.Optional[RateLimit] = None
+    METHOD_RATE_LIMITS: t.Mapping[str, RateLimit] = {}
+    GLOBAL_RATE_LIMIT: t.Optional[RateLimit] = None
+    RATE_LIMIT_POLICY: RateLimitPolicy = RateLimitPolicy.REJECT
+    _GLOBAL_BUCKETS: t.Dict[
+        t.Type["WSRPCBase"], t.Tuple[RateLimit, TokenBucket]
+    ] = {}
+
+    # Frame type to the name of the method which handles it,
+    # built once per class by _create_type_mapping
+    _TYPE_MAPPINGS: t.Dict[t.Type["WSRPCBase"], FrameMappingItemType] = {}
+    # Whether the replies and the events are resolved right in the
+    # reading loop, see _inline_replies
+    _INLINE_REPLIES: t.Dict[t.Type["WSRPCBase"], bool] = {}
+    # Caches of the results of the decorators.cached routes
+    _RESULT_CACHES: t.Dict[t.Type["WSRPCBase"], t.Dict[str, ResultCache]] = {}
+    # In-flight calls of the decorators.single_flight routes
+    _FLIGHTS: t.Dict[t.Type["WSRPCBase"], t.Dict[str, SingleFlight]] = {}
 
     __slots__ = (
+        "_admission",
+        "_rate_limiter",
+        "_bound",
+        "_bound_table",
+        "_codec",
         "_handlers",
+        "_json_dumps",
+        "_json_loads",
         "_loop",
         "_pending_tasks",
         "_locks",
-        "_futures",
+        "_recent_serials",
+        "_pending_calls",
         "_serial",
         "_timeout",
         "_event_listeners",
-        "_message_type_mapping",
+        "_workers",
+        "_writer",
+        "_streams",
+        "_stream_windows",
     )
 
     ON_CALL_START = Signal()
     ON_CALL_SUCCESS = Signal()
     ON_CALL_FAIL = Signal()
 
-    _pending_tasks: t.Set[t.Union[asyncio.Task, asyncio.Handle]]
+    _pending_tasks: t.Optional[t.Set[asyncio.Task]]
     _handlers: t.Dict[str, RouteType]
+    socket: t.Any
 
-    def _dumps(self, value: t.Any) -> t.Any:
+    def _dumps(self, value: t.Any) -> FrameType:
         return self._json_dumps(value, default=serializer)
 
+    def _encode_template(
+        self,
+        templates: t.Dict[t.Any, FrameType],
+        payload: t.Dict[str, t.Any],
+        serial: t.Optional[int],
+    ) -> FrameType:
+        """Encodes the payload once per encoder, the serial is spliced
+        into the JSON template instead of encoding the payload again"""
+        key = self._codec or self._json_dumps
+        template = templates.get(key)
+        if template is None:
+            template = templates[key] = self._encode(payload)
+
+        if serial is None:
+            # Notification frame is the same for the every client
+            return template
+
+        if self._codec is None:
+            if isinstance(template, str) and template.endswith("}"):
+                return '{0},"id":{1}}}'.format(template[:-1], serial)
+
+            if isinstance(template, (bytes, bytearray, memoryview)):
+                template = templates[key] = bytes(template)
+
+                if template.endswith(b"}"):
+                    return b'%s,"id":%d}' % (template[:-1], serial)
+
+        return self._encode(dict(payload, id=serial))
+
+    def _encode(self, payload: t.Any) -> FrameType:
+        metrics = self.METRICS
+        if metrics is None:
+            if self._codec is None:
+                return self._dumps(payload)
+            return self._codec.dumps(payload)
+
+        started = perf_counter()
+        if self._codec is None:
+            frame = self._dumps(payload)
+        else:
+            frame = self._codec.dumps(payload)
+        metrics.encoded(perf_counter() - started)
+        return frame
+
+    async def _write_frame(self, frame: FrameType) -> None:
+        if self.METRICS is not None:
+            self.METRICS.frame_sent(len(frame))
+
+        if isinstance(frame, str):
+            await self.socket.send_str(frame)
+        elif self._codec is not None or self.JSON_BINARY_FRAMES:
+            await self.socket.send_bytes(frame)
+        else:
+            await self._write_text_bytes(frame)
+
+    async def _write_text_bytes(
+        self, frame: t.Union[bytes, bytearray, memoryview]
+    ) -> None:
+        """Sends UTF-8 encoded JSON as the text frame without the
+        decode and encode round trip"""
+        send_frame = getattr(self.socket, "send_frame", None)
+
+        if send_frame is None:
+            # aiohttp<3.11 has no public API to send the raw text frame
+            await self.socket.send_str(bytes(frame).decode())
+            return
+
+        await send_frame(frame, aiohttp.WSMsgType.TEXT)
+
+    async def _send_frame(self, frame: FrameType) -> None:
+        await self.writer.send(frame)
+
+    async def _send_payload(self, payload: t.Dict[str, t.Any]) -> None:
+        await self.writer.send_payload(payload)
+
     def __init__(
         self,
         loop: t.Optional[asyncio.AbstractEventLoop] = None,
@@ -114,40 +329,161 @@ class WSRPCBase(AbstractWSRPC):
     ):
         self._json_dumps = dumps
         self._json_loads = loads
+        self._codec: t.Optional[Codec] = None
         self._loop = loop or asyncio.get_event_loop()
         self._handlers = {}
-        self._pending_tasks = set()
+        self._bound: t.Dict[str, ResolvedType] = {}
+        # Dispatch table the bound methods were resolved from
+        self._bound_table: t.Optional[DispatchTableType] = None
+        # Collections which most connections never use are
+        # created on demand, see _create_task and writer
+        self._pending_tasks = None
         self._serial = 0
         self._timeout: t.Optional[TimeoutType] = timeout
-        self._locks: LocksCollectionType = defaultdict(asyncio.Lock)
-        self._futures: FutureCollectionType = defaultdict(
-            self._loop.create_future
+        self._locks: t.Dict[int, SerialLock] = {}
+        self._recent_serials: t.Optional[RecentSerials] = None
+        if self.LOCK_FREE_DISPATCH:
+            self._recent_serials = RecentSerials(self.RECENT_SERIALS_SIZE)
+        self._pending_calls = PendingCalls(self.MAX_PENDING_CALLS)
+        self._writer: t.Optional[FrameWriter] = None
+        self._workers: t.Optional[CallWorkers] = None
+        # Streamed calls of this side and the credits of the
+        # streamed calls of the remote side
+        self._streams: t.Dict[int, CallStream] = {}
+        self._stream_windows: t.Dict[int, StreamWindow] = {}
+        self._event_listeners: t.Optional[EventListenerCollectionType] = None
+        self._admission = AdmissionControl(
+            limit=self.MAX_CONCURRENT_REQUESTS,
+            policy=self.OVERLOAD_POLICY,
+            max_queue=self.MAX_QUEUED_REQUESTS,
         )
-        self._event_listeners: EventListenerCollectionType = set()
-        self._message_type_mapping = self._create_type_mapping()
-
-    def _create_type_mapping(self) -> FrameMappingItemType:
-        return types.MappingProxyType(
-            {
-                aiohttp.WSMsgType.TEXT: self.handle_message,
-                aiohttp.WSMsgType.BINARY: self.handle_binary,
-                aiohttp.WSMsgType.CLOSE: self.close,
-                aiohttp.WSMsgType.CLOSED: self.close,
-            }
+        self._rate_limiter = self._create_rate_limiter()
+
+    @classmethod
+    def get_global_bucket(cls) -> t.Optional[TokenBucket]:
+        """Token bucket shared by the connections of the class"""
+        limit = cls.GLOBAL_RATE_LIMIT
+        if limit is None:
+            return None
+
+        item = cls._GLOBAL_BUCKETS.get(cls)
+        if item is None or item[0] is not limit:
+            item = cls._GLOBAL_BUCKETS[cls] = (
+                limit,
+                TokenBucket(limit, asyncio.get_event_loop().time()),
+            )
+
+        return item[1]
+
+    def _create_rate_limiter(self) -> t.Optional[RateLimiter]:
+        shared = self.get_global_bucket()
+
+        if (
+            self.RATE_LIMIT is None
+            and not self.METHOD_RATE_LIMITS
+            and shared is None
+        ):
+            return None
+
+        return RateLimiter(
+            connection=self.RATE_LIMIT,
+            methods=self.METHOD_RATE_LIMITS,
+            shared=shared,
+            policy=self.RATE_LIMIT_POLICY,
+            now=self._loop.time(),
         )
 
+    @property
+    def rate_limiter(self) -> t.Optional[RateLimiter]:
+        """Rate limits of the incoming calls, ``None`` when
+        no limits are configured"""
+        return self._rate_limiter
+
+    @property
+    def admission(self) -> AdmissionControl:
+        """Admission control of the incoming calls. Contains gauges of
+        the running and queued calls and counters of the queued and
+        rejected ones."""
+        return self._admission
+
+    @property
+    def writer(self) -> FrameWriter:
+        """Outgoing frames queue. Its ``depth`` is the backpressure
+        signal, ``await writer.wait_capacity()`` waits until the frame
+        might be queued and ``await writer.drain()`` until all the
+        queued frames are written."""
+        writer = self._writer
+        if writer is None:
+            writer = self._writer = FrameWriter(
+                self,
+                max_size=self.MAX_WRITE_QUEUE,
+                coalesce=self.COALESCE_FRAMES,
+                window=self.COALESCE_WINDOW,
+            )
+        return writer
+
+    @property
+    def pending_calls(self) -> int:
+        """Gauge of the outgoing calls which are waiting for the reply"""
+        return len(self._pending_calls)
+
+    @classmethod
+    def _create_type_mapping(cls) -> t.Dict[IntEnum, str]:
+        return {
+            aiohttp.WSMsgType.CLOSE: "close",
+            aiohttp.WSMsgType.CLOSED: "close",
+        }
+
+    @classmethod
+    def get_type_mapping(cls) -> FrameMappingItemType:
+        """Names of the methods which handle the control frames,
+        shared by the connections of the class"""
+        mapping = cls._TYPE_MAPPINGS.get(cls)
+
+        if mapping is None:
+            mapping = cls._TYPE_MAPPINGS[cls] = types.MappingProxyType(
+                cls._create_type_mapping()
+            )
+
+        return mapping
+
+    @classmethod
+    def _inline_replies(cls) -> bool:
+        """Results, errors and events are resolved synchronously in the
+        reading loop, unless the subclass overrides the coroutines which
+        handle them, then every such frame is handled in its own task"""
+        inline = cls._INLINE_REPLIES.get(cls)
+
+        if inline is None:
+            inline = cls._INLINE_REPLIES[cls] = (
+                cls.handle_result is WSRPCBase.handle_result
+                and cls.handle_error is WSRPCBase.handle_error
+                and cls.handle_event is WSRPCBase.handle_event
+            )
+
+        return inline
+
+    @property
+    def workers(self) -> CallWorkers:
+        """Tasks which execute the incoming calls"""
+        workers = self._workers
+        if workers is None:
+            workers = self._workers = CallWorkers(
+                self._create_task, idle_timeout=self.WORKER_IDLE_TIMEOUT
+            )
+        return workers
+
     def _create_task(self, coro):
         task: asyncio.Task = self._loop.create_task(coro)
-        self._pending_tasks.add(task)
-        task.add_done_callback(partial(self._pending_tasks.remove))
 
-        return task
+        tasks = self._pending_tasks
+        if tasks is None:
+            tasks = self._pending_tasks = set()
 
-    def _call_later(self, timer, callback, *args, **kwargs):
-        def handler():
-            self._create_task(awaitable(callback)(*args, **kwargs))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
 
-        self._pending_tasks.add(self._loop.call_later(timer, handler))
+        return task
 
     async def close(self, message=None):
         """Cancel all pending tasks"""
@@ -168,27 +504,57 @@ class WSRPCBase(AbstractWSRPC):
         if message:
             log.info("Closing WebSocket because message %r received", message)
 
-        for task in tuple(self._pending_tasks):
+        self._pending_calls.reject_all(ConnectionError("Connection closed"))
+
+        if self._writer is not None:
+            self._writer.close()
+
+        for stream in tuple(self._streams.values()):
+            stream.feed_exception(ConnectionError("Connection closed"))
+
+        for window in self._stream_windows.values():
+            window.cancel()
+
+        for task in tuple(self._pending_tasks or ()):
             task.cancel()
 
             if hasattr(task, "cancelled") and not task.cancelled():
                 self._loop.create_task(task_waiter(task))
 
+    @property
+    def codec(self) -> t.Optional[Codec]:
+        """Binary codec negotiated for this connection,
+        ``None`` means JSON text frames are used"""
+        return self._codec
+
     async def handle_binary(self, message: aiohttp.WSMessage):
-        log.warning("Unhandled message %r %r", message.type, message.data)
+        # Binary frames without the codec are JSON documents,
+        # the frame bytes are passed to loads as is
+        if self._codec is None:
+            loads = self._json_loads
+        else:
+            loads = self._codec.loads
+
+        if self.METRICS is None:
+            data = loads(message.data)
+        else:
+            started = perf_counter()
+            data = loads(message.data)
+            self.METRICS.decoded(perf_counter() - started)
+
+        log.debug("Got message: %r", data)
+        await self._handle_data(data)
 
     async def _call_method(self, call_item: CallItem):
         try:
             if not isinstance(call_item.method, Nothing) and call_item.serial:
-                log.debug(
-                    "Acquiring lock for %r serial %r", self, call_item.serial
+                return await self._call_locked(call_item)
+            elif not isinstance(call_item.method, Nothing):
+                # Notification, nobody waits for the reply
+                args, kwargs = self.prepare_args(call_item.params)
+                return await self.handle_method(
+                    call_item.method, None, args, kwargs
                 )
-                async with self._locks[call_item.serial]:
-                    args, kwargs = self.prepare_args(call_item.params)
-
-                    return await self.handle_method(
-                        call_item.method, call_item.serial, args, kwargs
-                    )
             elif not isinstance(call_item.result, Nothing):
                 return await self.handle_result(
                     call_item.serial, call_item.result
@@ -207,11 +573,47 @@ class WSRPCBase(AbstractWSRPC):
                 await self._send(
                     error=self._format_error(e), id=call_item.serial
                 )
-        finally:
-            self._call_later(
-                self._CLEAN_LOCK_TIMEOUT, self.__clean_lock, call_item.serial
+
+    async def _call_locked(self, call_item: CallItem):
+        serial = t.cast(int, call_item.serial)
+
+        if self._recent_serials is not None:
+            if not self._recent_serials.add(serial):
+                log.warning(
+                    "Dropping call %r of %r, serial %r is duplicated",
+                    call_item.method,
+                    self,
+                    serial,
+                )
+                return None
+
+            args, kwargs = self.prepare_args(call_item.params)
+            return await self.handle_method(
+                call_item.method, serial, args, kwargs
             )
 
+        lock = self._locks.get(serial)
+
+        if lock is None:
+            lock = self._locks[serial] = SerialLock()
+
+        lock.users += 1
+
+        try:
+            log.debug("Acquiring lock for %r serial %r", self, serial)
+            async with lock:
+                args, kwargs = self.prepare_args(call_item.params)
+
+                return await self.handle_method(
+                    call_item.method, serial, args, kwargs
+                )
+        finally:
+            lock.users -= 1
+
+            if not lock.users:
+                log.debug("Delete lock for %s serial %s", self, serial)
+                self._locks.pop(serial, None)
+
     @staticmethod
     def _parse_message(data: dict) -> CallItem:
         message_id = data.get("id")  # type: t.Optional[int]
@@ -245,22 +647,184 @@ class WSRPCBase(AbstractWSRPC):
 
     async def handle_message(self, message: aiohttp.WSMessage):
         # noinspection PyTypeChecker, PyNoneFunctionAssignment
-        data: dict = message.json(loads=self._json_loads)
+        if self.METRICS is None:
+            data: dict = message.json(loads=self._json_loads)
+        else:
+            started = perf_counter()
+            data = message.json(loads=self._json_loads)
+            self.METRICS.decoded(perf_counter() - started)
+
         log.debug("Got message: %r", data)
+        await self._handle_data(data)
+
+    async def _handle_data(self, data: t.Union[dict, list]):
+        if isinstance(data, list):
+            # Batch frame, items are dispatched as the separate frames
+            for item in data:
+                if isinstance(item, dict):
+                    await self._handle_data(item)
+            return
 
-        serial = data.get("id")
+        serial: t.Any = data.get("id")
 
-        if serial is None:
-            return await self.handle_event(data)
+        if serial is None and "method" not in data:
+            if self._inline_replies():
+                self._dispatch_event(data)
+            else:
+                self._create_task(self.handle_event(data))
+            return
+
+        if "method" not in data:
+            # Frames of the streamed calls are handled in order
+            stream = self._streams.get(serial)
+            if stream is not None:
+                if "error" in data:
+                    stream.feed_exception(ClientException(data["error"]))
+                else:
+                    stream.feed(data)
+                return
+
+            if "credit" in data or "cancel" in data:
+                window = self._stream_windows.get(serial)
+                if window is not None:
+                    window.update(data)
+                return
 
         call_item = self._parse_message(data)
-        await self._call_method(call_item)
+
+        if isinstance(call_item.method, Nothing):
+            if self._inline_replies():
+                self._resolve_reply(call_item)
+            else:
+                self._create_task(self._call_method(call_item))
+            return
+
+        limiter = self._rate_limiter
+        if limiter is not None:
+            method = t.cast(str, call_item.method)
+            delay = limiter.acquire(method, self._loop.time())
+            if delay and not await self._throttle(call_item, delay):
+                return
+
+        if serial and data.get("stream"):
+            self._stream_windows[serial] = StreamWindow(data["stream"])
+
+        await self._admit(call_item)
+
+    async def _throttle(self, call_item: CallItem, delay: float) -> bool:
+        """Delays the call over the rate limit or rejects it, returns
+        whether the call should be executed"""
+        if self.METRICS is not None:
+            method = str(call_item.method)
+            if method not in self.get_dispatch_table():
+                # Unknown names sent by the client must not use up
+                # the per-method series
+                method = OTHER_METHOD
+            self.METRICS.call_throttled(method)
+
+        if self.RATE_LIMIT_POLICY is RateLimitPolicy.DELAY:
+            # Blocks the reading loop like the admission backpressure
+            await asyncio.sleep(delay)
+            return True
+
+        log.warning(
+            "Rejecting call #%r %r of %r, rate limit exceeded",
+            call_item.serial,
+            call_item.method,
+            self,
+        )
+
+        if call_item.serial is not None:
+            error = self._format_error(
+                RateLimitedError("Rate limit exceeded")
+            )
+            error["retry_after"] = round(delay, 3)
+            self._create_task(self._send(error=error, id=call_item.serial))
+
+        return False
+
+    async def _admit(self, call_item: CallItem):
+        admission = self._admission
+
+        if admission.try_acquire():
+            self.workers.submit(self._call_admitted, call_item)
+            return
+
+        if admission.policy is OverloadPolicy.BACKPRESSURE:
+            # Only the call waits for the slot, the reading loop keeps
+            # reading the replies, credits and pongs the running calls
+            # might wait for (e.g. the calls back to the client)
+            self.workers.submit(
+                self._call_admitted, call_item, admission.enqueue()
+            )
+
+            if admission.is_overflowed():
+                # Too many held calls, stop reading until one is admitted
+                await admission.wait_queue()
+            return
+
+        queueing = admission.policy is OverloadPolicy.QUEUE
+        if queueing and admission.can_enqueue():
+            self.workers.submit(
+                self._call_admitted, call_item, admission.enqueue()
+            )
+            return
+
+        admission.reject()
+        log.warning(
+            "Rejecting call #%r %r of %r, too many concurrent requests",
+            call_item.serial,
+            call_item.method,
+            self,
+        )
+
+        if call_item.serial is None:
+            return
+
+        self._stream_windows.pop(call_item.serial, None)
+        self._create_task(
+            self._send(
+                error=self._format_error(
+                    OverloadedError("Too many concurrent requests")
+                ),
+                id=call_item.serial,
+            )
+        )
+
+    async def _call_admitted(
+        self, call_item: CallItem, waiter: t.Optional[asyncio.Future] = None
+    ):
+        if waiter is not None:
+            await self._admission.wait(waiter)
+
+        try:
+            return await self._call_method(call_item)
+        finally:
+            self._admission.release()
+
+            if call_item.serial:
+                self._stream_windows.pop(call_item.serial, None)
 
     async def _on_message(self, msg: aiohttp.WSMessage):
         async def unknown_method(msg: aiohttp.WSMessage):
             log.warning("Unhandled message %r %r", msg.type, msg.data)
 
-        handler = self._message_type_mapping.get(msg.type, unknown_method)
+        if msg.type in self._DATA_FRAMES:
+            if self.METRICS is not None:
+                self.METRICS.frame_received(len(msg.data))
+
+            # Data frames are handled right in the reading loop, so
+            # the admission control is able to stop reading the socket
+            try:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    return await self.handle_message(msg)
+                return await self.handle_binary(msg)
+            except Exception:
+                log.exception("Failed to handle message %r", msg.data)
+                return
+
+        name = self.get_type_mapping().get(msg.type)
+        handler = unknown_method if name is None else getattr(self, name)
         self._create_task(awaitable(handler)(msg))
 
     @classmethod
@@ -268,7 +832,7 @@ class WSRPCBase(AbstractWSRPC):
         return cls._ROUTES[cls]
 
     @classmethod
-    def get_clients(cls) -> t.Dict[str, AbstractWSRPC]:
+    def get_clients(cls) -> t.Dict[t.Any, AbstractWSRPC]:
         return cls._CLIENTS[cls]
 
     @property
@@ -277,7 +841,7 @@ class WSRPCBase(AbstractWSRPC):
         return self.get_routes()
 
     @property
-    def clients(self) -> t.Dict[str, AbstractWSRPC]:
+    def clients(self) -> t.Dict[t.Any, AbstractWSRPC]:
         """Property which contains the socket clients"""
         return self.get_clients()
 
@@ -306,54 +870,328 @@ class WSRPCBase(AbstractWSRPC):
         return hasattr(func, "__self__") and isinstance(func.__self__, Route)
 
     async def handle_method(self, method, serial, args, kwargs):
-        await self.ON_CALL_START.call(
-            method=method, serial=serial, args=args, kwargs=kwargs
-        )
-        callee = self.resolver(method)
+        # Signals are checked first, so no arguments are built
+        # when nobody is connected
+        if self.ON_CALL_START:
+            await self.ON_CALL_START.call(
+                method=method, serial=serial, args=args, kwargs=kwargs
+            )
+
+        callee, inject_socket, executor = self._resolve(method)
+        executor = executor or self.EXECUTOR
+
+        # Params key of the cached and the single-flight routes
+        key = None
+        cached: t.Optional[CachedResult] = None
+        cache = self._route_cache(method, callee)
+        flights = self._route_flights(method, callee)
+        if cache is not None or flights is not None:
+            key = make_key(args, kwargs)
+
+        if key is not None and cache is not None:
+            cached = cache.get(key, self._loop.time())
+            if self.METRICS is not None:
+                self.METRICS.cache_lookup(method, cached is not None)
+
+            if cached is not None:
+                return await self._reply_shared(
+                    method, serial, args, kwargs, cached, 0.0
+                )
+
+        flight: t.Optional[asyncio.Future] = None
+        if key is not None and flights is not None:
+            flight = flights.join(key)
+
+            if flight is not None:
+                if self.METRICS is not None:
+                    self.METRICS.call_coalesced(method)
+
+                started = perf_counter()
+                try:
+                    cached = await asyncio.shield(flight)
+                except Exception as err:
+                    if self.ON_CALL_FAIL:
+                        await self.ON_CALL_FAIL.call(
+                            method=method,
+                            serial=serial,
+                            args=args,
+                            kwargs=kwargs,
+                            err=err,
+                            duration=perf_counter() - started,
+                        )
+                    raise
+
+                if cached is not None:
+                    return await self._reply_shared(
+                        method,
+                        serial,
+                        args,
+                        kwargs,
+                        cached,
+                        perf_counter() - started,
+                    )
 
-        if not self.is_route(callee):
-            a = [self]
-            a.extend(args)
-            args = a
+                # The result could not be shared, executing the call
+                flight = None
+            else:
+                flight = flights.start(key, self._loop)
+
+        if inject_socket and (executor is None or executor.INJECT_SOCKET):
+            func = partial(callee, self, *args, **kwargs)
+        else:
+            func = partial(callee, *args, **kwargs)
+
+        metrics = self.METRICS
+        stats = None if metrics is None else metrics.call_started(method)
+        started = perf_counter()
+
+        streamed = False
+        # Generators are neither cached nor shared
+        shareable = key is not None
 
-        func = partial(callee, *args, **kwargs)
         try:
-            result = await self._executor(func)
-        except Exception as err:
+            if executor is None:
+                result = await self._executor(func)
+            else:
+                result = await executor(func)
+
+            if inspect.isasyncgen(result) or inspect.isgenerator(result):
+                shareable = False
+                window = None
+                if serial is not None:
+                    window = self._stream_windows.get(serial)
+
+                if window is None:
+                    # The caller does not support the streaming
+                    result = [
+                        item async for item in self._iterate(result, executor)
+                    ]
+                else:
+                    await self._stream_result(serial, result, window, executor)
+                    streamed = True
+        except BaseException as err:
+            if flight is not None:
+                flights.finish(key, flight, err)
+
+            duration = perf_counter() - started
+            if stats is not None:
+                Metrics.call_finished(stats, duration, False)
+
+            if not isinstance(err, Exception) or not self.ON_CALL_FAIL:
+                raise
+
             await self.ON_CALL_FAIL.call(
-                method=method, serial=serial, args=args, kwargs=kwargs, err=err
+                method=method,
+                serial=serial,
+                args=args,
+                kwargs=kwargs,
+                err=err,
+                duration=duration,
             )
             raise
 
-        await self.ON_CALL_SUCCESS.call(
-            method=method,
-            serial=serial,
-            args=args,
-            kwargs=kwargs,
-            result=result,
-        )
+        if shareable:
+            if cache is not None:
+                cached = cache.put(key, result, self._loop.time())
+            else:
+                cached = CachedResult(result, None)
+
+        if flight is not None:
+            # Waiters are resolved before the signals are awaited,
+            # so they are not left waiting when the call is cancelled
+            flights.finish(key, flight, cached)
+
+        duration = perf_counter() - started
+        if stats is not None:
+            Metrics.call_finished(stats, duration, True)
+
+        if self.ON_CALL_SUCCESS:
+            await self.ON_CALL_SUCCESS.call(
+                method=method,
+                serial=serial,
+                args=args,
+                kwargs=kwargs,
+                result=result,
+                duration=duration,
+            )
+
+        if serial is None or streamed:
+            return
+
+        if cached is not None:
+            return await self._send_cached(serial, cached)
 
         await self._send(result=result, id=serial)
 
-    async def handle_result(self, serial, result):
-        cb = self._futures.pop(serial, None)
-        if not cb or cb.done():
+    def _route_cache(
+        self, method: str, callee: t.Any
+    ) -> t.Optional[ResultCache]:
+        policy = getattr(callee, "__cache__", None)
+        if policy is None:
+            return None
+        return self.get_result_cache(method, policy)
+
+    def _route_flights(
+        self, method: str, callee: t.Any
+    ) -> t.Optional[SingleFlight]:
+        if not getattr(callee, "__single_flight__", False):
+            return None
+        return self.get_single_flight(method, create=True)
+
+    async def _reply_shared(
+        self,
+        method: str,
+        serial: t.Optional[int],
+        args: t.Any,
+        kwargs: t.Any,
+        cached: CachedResult,
+        duration: float,
+    ) -> None:
+        """Replies with the result of the other execution of the call"""
+        if self.ON_CALL_SUCCESS:
+            await self.ON_CALL_SUCCESS.call(
+                method=method,
+                serial=serial,
+                args=args,
+                kwargs=kwargs,
+                result=cached.result,
+                duration=duration,
+            )
+
+        await self._send_cached(serial, cached)
+
+    async def _send_cached(
+        self, serial: t.Optional[int], cached: CachedResult
+    ) -> None:
+        if serial is None:
             return
-        cb.set_result(result)
 
-    async def handle_error(self, serial, error):
+        frame = self._encode_template(
+            cached.frames, {"result": cached.result}, serial
+        )
+        await self._send_frame(frame)
+
+    @classmethod
+    def get_result_cache(
+        cls, method: str, policy: t.Optional[CachePolicy] = None
+    ) -> t.Optional[ResultCache]:
+        """Cache of the method results shared by the connections of the
+        class, created with the ``policy`` on the first call"""
+        caches = cls._RESULT_CACHES.get(cls)
+        if caches is None:
+            caches = cls._RESULT_CACHES[cls] = {}
+
+        cache = caches.get(method)
+        if cache is None and policy is not None:
+            cache = caches[method] = ResultCache(policy)
+
+        return cache
+
+    @classmethod
+    def get_single_flight(
+        cls, method: str, create: bool = False
+    ) -> t.Optional[SingleFlight]:
+        """In-flight calls of the ``decorators.single_flight`` method
+        shared by the connections of the class, its ``ratio`` is the
+        share of the coalesced calls"""
+        flights = cls._FLIGHTS.get(cls)
+        if flights is None:
+            flights = cls._FLIGHTS[cls] = {}
+
+        single_flight = flights.get(method)
+        if single_flight is None and create:
+            single_flight = flights[method] = SingleFlight()
+
+        return single_flight
+
+    @classmethod
+    def invalidate_cache(cls, method: str, *args, **kwargs) -> None:
+        """Drops the cached result of the method called with the params,
+        without the params drops all the results of the method"""
+        cache = cls.get_result_cache(method)
+        if cache is None:
+            return
+
+        if not args and not kwargs:
+            cache.invalidate()
+            return
+
+        key = make_key(args, kwargs)
+        if key is not None:
+            cache.invalidate(key)
+
+    async def _iterate(
+        self, result: t.Any, executor: t.Any
+    ) -> t.AsyncGenerator[t.Any, None]:
+        if inspect.isasyncgen(result):
+            async for item in result:
+                yield item
+            return
+
+        # Synchronous generators are advanced by the route executor
+        run = self._executor if executor is None else executor
+        stop = object()
+
+        while True:
+            item = await run(partial(next, result, stop))
+            if item is stop:
+                return
+            yield item
+
+    async def _stream_result(
+        self, serial: int, result: t.Any, window: StreamWindow, executor: t.Any
+    ) -> None:
+        """Sends the generator items as the chunk frames, waits for the
+        credit when the caller did not consume the sent chunks yet"""
+        items = self._iterate(result, executor)
+
+        try:
+            async for item in items:
+                if not await window.acquire():
+                    log.debug("Stream #%r was cancelled by %r", serial, self)
+                    return
+
+                await self._send(id=serial, chunk=item)
+        finally:
+            await items.aclose()
+
+            if inspect.isasyncgen(result):
+                await result.aclose()
+            else:
+                result.close()
+
+        await self._send(id=serial, end=True)
+
+    def _resolve_reply(self, call_item: CallItem) -> None:
+        try:
+            if not isinstance(call_item.result, Nothing):
+                self._resolve_result(call_item.serial, call_item.result)
+            elif not isinstance(call_item.error, Nothing):
+                self._resolve_error(call_item.serial, call_item.error)
+            else:
+                self._resolve_result(call_item.serial, None)
+        except Exception:
+            log.exception("Failed to handle the reply %r", call_item)
+
+    def _resolve_result(self, serial, result) -> None:
+        self._pending_calls.resolve(serial, result)
+
+    def _resolve_error(self, serial, error) -> None:
         self._reject(serial, error)
         log.error("Client return error: \n\t%r", error)
 
-    def __clean_lock(self, serial):
-        if serial not in self._locks:
-            return
-        log.debug("Release and delete lock for %s serial %s", self, serial)
-        self._locks.pop(serial)
+    def _dispatch_event(self, event) -> None:
+        for listener in self._event_listeners or ():
+            self._loop.call_soon(listener, event)
+
+    async def handle_result(self, serial, result):
+        self._resolve_result(serial, result)
+
+    async def handle_error(self, serial, error):
+        self._resolve_error(serial, error)
 
     async def handle_event(self, event):
-        for listener in self._event_listeners:
-            self._loop.call_soon(listener, event)
+        self._dispatch_event(event)
 
     @abc.abstractmethod
     async def _send(self, **kwargs):
@@ -364,18 +1202,158 @@ class WSRPCBase(AbstractWSRPC):
         return {"type": str(type(e).__name__), "message": str(e)}
 
     def _reject(self, serial, error):
-        future = self._futures.get(serial)
-
-        if not future:
-            return
-
-        future.set_exception(ClientException(error))
+        self._pending_calls.reject(serial, ClientException(error))
 
     def _unresolvable(self, func_name, *args, **kwargs):
         raise NotImplementedError(
             'Callback function "%r" not implemented' % func_name
         )
 
+    @classmethod
+    def _compile_routes(cls) -> DispatchTableType:
+        """Builds the table of full method names of the registered routes
+        to the ready to call functions or Route classes"""
+        table: DispatchTableType = {}
+        executors = cls._ROUTE_EXECUTORS[cls]
+
+        for name, handler in cls.get_routes().items():
+            callee = handler
+            if isinstance(callee, decorators.ProxyBase):
+                callee = callee.func
+
+            executor = executors.get(name) or getattr(
+                callee, "__executor__", None
+            )
+
+            if isinstance(callee, type) and issubclass(callee, Route):
+                cls._check_route_executor(callee, executor)
+
+                if RouteScope(callee.__scope__) is not RouteScope.CONNECTION:
+                    cls._compile_shared_route(table, name, callee, executor)
+                    continue
+
+                table[name] = DispatchEntry(
+                    callee, False, name, "init", executor
+                )
+
+                for method in callee.__public_methods__():
+                    table["{0}.{1}".format(name, method)] = DispatchEntry(
+                        callee, False, name, method, executor
+                    )
+                continue
+
+            if not callable(callee):
+                continue
+
+            table[name] = DispatchEntry(
+                callee, not cls.is_route(handler), None, None, executor
+            )
+
+        return table
+
+    @classmethod
+    def _check_route_executor(cls, route: t.Any, executor: t.Any) -> None:
+        effective = (
+            executor or getattr(route, "__executor__", None) or cls.EXECUTOR
+        )
+
+        if effective is not None and not effective.INJECT_SOCKET:
+            # Route instances are bound to the socket, so they
+            # can not be sent to the process-pool
+            raise TypeError(
+                "Route class {0!r} can not be executed by {1!r}".format(
+                    route, effective
+                )
+            )
+
+    @staticmethod
+    def _compile_shared_route(
+        table: DispatchTableType, name: str, route: t.Any, executor: t.Any
+    ) -> None:
+        # Methods of the shared instances are resolved once, the socket
+        # is passed explicitly instead of the instance per connection
+        methods = [(name, "init")] + [
+            ("{0}.{1}".format(name, method), method)
+            for method in route.__public_methods__()
+        ]
+
+        for full_name, method in methods:
+            try:
+                callee = route.__shared_method__(method)
+            except NotImplementedError:
+                # The resolver raises for the missing "init"
+                continue
+
+            table[full_name] = DispatchEntry(
+                callee, True, None, None, executor
+            )
+
+    @classmethod
+    def get_dispatch_table(cls) -> DispatchTableType:
+        item = cls._DISPATCH.get(cls)
+        executor = cls.EXECUTOR
+        generation = routes_generation()
+
+        if item is None or item[0] is not executor or item[1] != generation:
+            # Compiled again when the executors configured after the
+            # routes were registered, so they are checked as well
+            item = cls._DISPATCH[cls] = (
+                executor,
+                generation,
+                cls._compile_routes(),
+            )
+
+        return item[2]
+
+    def _resolve(self, method: str) -> ResolvedType:
+        table = self.get_dispatch_table()
+        if self._bound_table is not table:
+            self._rebind(table)
+
+        resolved = self._bound.get(method)
+        if resolved is not None:
+            return resolved
+
+        entry = table.get(method)
+
+        if entry is None:
+            # Unknown or masked method, let the resolver raise
+            # the meaningful error
+            callee = self.resolver(method)
+            return callee, not self.is_route(callee), None
+
+        if entry.route is None:
+            return entry.callee, entry.inject_socket, entry.executor
+
+        handler: t.Any = self._handlers.get(entry.route)  # type: ignore
+        if handler is None:
+            handler = self._handlers[entry.route] = entry.callee(self)
+
+        # Bound methods of the Route instances are cached per connection
+        resolved = (handler(entry.method), False, entry.executor)
+        self._bound[method] = resolved
+        return resolved
+
+    def _rebind(self, table: DispatchTableType) -> None:
+        """Drops the bound methods and the Route instances of the routes
+        which were removed or replaced since they were resolved"""
+        self._bound.clear()
+        self._bound_table = table
+
+        handlers: t.Dict[str, t.Any] = self._handlers
+
+        for name, handler in tuple(handlers.items()):
+            entry = table.get(name)
+            if (
+                entry is not None
+                and entry.route == name
+                and type(handler) is entry.callee
+            ):
+                continue
+
+            del handlers[name]
+            self._create_task(awaitable(handler._onclose)())
+
     def resolver(self, func_name):
         class_name, method = (
             func_name.split(".", 1) if "." in func_name else (func_name, "init")
@@ -395,6 +1373,13 @@ class WSRPCBase(AbstractWSRPC):
             )
         )
 
+        if (
+            isinstance(callee, type)
+            and issubclass(callee, Route)
+            and RouteScope(callee.__scope__) is not RouteScope.CONNECTION
+        ):
+            return callee.__shared_method__(method)
+
         if condition:
             if class_name not in self._handlers:
                 self._handlers[class_name] = callee(self)
@@ -438,9 +1423,13 @@ class WSRPCBase(AbstractWSRPC):
                     return foo + bar
 
         """
-        serial = self._get_serial()
+        if self._pending_calls.is_full():
+            raise TooManyPendingCallsError(
+                "Too many calls are waiting for the reply"
+            )
 
-        future = self._futures[serial]
+        serial = self._get_serial()
+        future = self._pending_calls.create(serial, self._loop)
 
         payload = dict(id=serial, method=func, params=kwargs)
 
@@ -448,17 +1437,75 @@ class WSRPCBase(AbstractWSRPC):
             'Sending request #%r "%s(%r)" to the client.', serial, func, kwargs
         )
 
-        await self._send(**payload)
-        result = await asyncio.wait_for(
-            future, timeout=timeout or self._timeout
+        try:
+            await self._send(**payload)
+
+            timeout = timeout or self._timeout
+            if timeout is None:
+                return await future
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self._pending_calls.discard(serial)
+
+    def stream(
+        self,
+        func: str,
+        credit: t.Optional[int] = None,
+        timeout: t.Optional[TimeoutType] = None,
+        **kwargs,
+    ) -> CallStream:
+        """Call remote function and iterate over the streamed result.
+
+        Items of the generator or the asynchronous generator returned by
+        the remote route are sent as the separate frames as they are
+        produced. No more than ``credit`` items are sent before they will
+        be consumed by the iterator.
+
+        .. code-block:: python
+
+            async def rows(socket: WSRPCBase, *, query):
+                async for row in database.cursor(query):
+                    yield row
+
+            async for row in client.stream("rows", query="SELECT 1"):
+                print(row)
+
+        Regular routes might be called this way as well, their result is
+        yielded as is, and the lists are yielded item by item.
+
+        :param credit: how many items might be buffered,
+                       ``STREAM_CREDIT`` by default
+        :param timeout: timeout of the each item
+        """
+        return CallStream(
+            self,
+            func,
+            kwargs,
+            credit=credit or self.STREAM_CREDIT,
+            timeout=timeout or self._timeout,
         )
-        return result
+
+    async def notify(self, method: str, **params):
+        """Call remote function without waiting for the result.
+
+        The frame has no serial, so the remote side executes the route
+        but does not send a reply, and no future or timeout is allocated
+        on this side. Errors are only logged by the remote side.
+
+        .. code-block:: python
+
+            await socket.notify("telemetry.push", cpu=0.5)
+        """
+        log.debug('Sending notification "%s(%r)"', method, params)
+        await self._send(method=method, params=params)
 
     async def emit(self, event):
         await self._send(**event)
 
     @classmethod
-    def add_route(cls, route: str, handler: RouteType) -> None:
+    def add_route(
+        cls, route: str, handler: RouteType, executor: t.Any = None
+    ) -> None:
         """Expose local function through RPC
 
         :param route: Name which function will be aliased for this function.
@@ -467,6 +1514,12 @@ class WSRPCBase(AbstractWSRPC):
                         :class:`wsrpc_aiohttp.WebSocketRoute`).
                         For route classes the public methods will
                         be registered automatically.
+        :param executor: :class:`wsrpc_aiohttp.RouteExecutor` which
+                         will execute this route instead of the
+                         handler's one.
+        :raises TypeError: when the Route class is added with the
+                           executor which does not pass the socket
+                           (e.g. :class:`wsrpc_aiohttp.ProcessExecutor`)
 
         .. note::
 
@@ -479,15 +1532,30 @@ class WSRPCBase(AbstractWSRPC):
 
         """
         assert callable(handler) or isinstance(handler, Route)
+
+        if isinstance(handler, type) and issubclass(handler, Route):
+            cls._check_route_executor(handler, executor)
+
         if callable(handler):
             handler = decorators.proxy(handler)
 
         cls.get_routes()[route] = handler
 
+        if executor is None:
+            cls._ROUTE_EXECUTORS[cls].pop(route, None)
+        else:
+            cls._ROUTE_EXECUTORS[cls][route] = executor
+
+        cls._DISPATCH.pop(cls, None)
+
     def add_event_listener(self, func: EventListenerType):
+        if self._event_listeners is None:
+            self._event_listeners = set()
         self._event_listeners.add(func)
 
     def remove_event_listeners(self, func):
+        if self._event_listeners is None:
+            raise KeyError(func)
         return self._event_listeners.remove(func)
 
     @classmethod
@@ -500,6 +1568,9 @@ class WSRPCBase(AbstractWSRPC):
         else:
             cls.get_routes().pop(route, None)
 
+        cls._ROUTE_EXECUTORS[cls].pop(route, None)
+        cls._DISPATCH.pop(cls, None)
+
     def __repr__(self):
         if hasattr(self, "id"):
             return "<RPCWebSocket: ID[{0}]>".format(self.id)
@@ -526,4 +1597,12 @@ class WSRPCBase(AbstractWSRPC):
         return Proxy(self.call)
 
 
-__all__ = ("Route", "WSRPCBase", "ClientException", "WSRPCError")
+__all__ = (
+    "ClientException",
+    "OverloadedError",
+    "RateLimitedError",
+    "Route",
+    "TooManyPendingCallsError",
+    "WSRPCBase",
+    "WSRPCError",
+)
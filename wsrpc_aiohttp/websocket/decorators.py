@@ -1,4 +1,7 @@
 from functools import partial
+from typing import Optional
+
+from .cache import CachePolicy
 
 
 class ProxyBase(partial):
@@ -19,3 +22,44 @@ def noproxy(func):
 
 def proxy(func):
     return ProxyFunction(func)
+
+
+def cached(ttl: Optional[float] = None, maxsize: int = 1024):
+    """Caches the results of the route by its params. The cache is
+    shared by the connections of the handler class, see
+    ``WSRPCBase.invalidate_cache``.
+
+    .. code-block:: python
+
+        @decorators.cached(ttl=60)
+        async def get_config(socket, name):
+            return await load_config(name)
+
+    :param ttl: seconds the result is valid for, ``None`` means until
+                the eviction or the invalidation
+    :param maxsize: how many results of the distinct params are kept
+    """
+    policy = CachePolicy(ttl, maxsize)
+
+    def decorator(func):
+        target = func.func if isinstance(func, ProxyBase) else func
+        target.__cache__ = policy
+        return func
+
+    return decorator
+
+
+def single_flight(func):
+    """Concurrent calls of the route with the identical params share one
+    execution, the result is serialized once and sent to every caller,
+    the calls of all the connections of the handler class are coalesced.
+
+    .. code-block:: python
+
+        @decorators.single_flight
+        async def get_feed(socket, user_id):
+            return await load_feed(user_id)
+    """
+    target = func.func if isinstance(func, ProxyBase) else func
+    target.__single_flight__ = True
+    return func
@@ -0,0 +1,172 @@
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .admission import AdmissionControl, OverloadPolicy
+from .common import OverloadedError
+from .tools import awaitable
+
+
+class RouteExecutor(ABC):
+    """Executes the route functions with the limited concurrency.
+
+    Calls above ``max_concurrency`` wait in the queue of ``max_queue``
+    calls, when the queue is full the call fails with
+    :class:`wsrpc_aiohttp.websocket.common.OverloadedError`.
+
+    The executor might be set for the handler class:
+
+    .. code-block:: python
+
+        class Handler(WebSocketAsync):
+            EXECUTOR = ThreadExecutor(max_workers=4)
+
+    for the Route class:
+
+    .. code-block:: python
+
+        class Reports(WebSocketRoute):
+            __executor__ = ThreadExecutor(max_workers=2)
+
+    or for the function route:
+
+    .. code-block:: python
+
+        Handler.add_route("render", render, executor=ProcessExecutor())
+    """
+
+    # Should the socket be passed to the function routes
+    INJECT_SOCKET = True
+
+    def __init__(
+        self, max_concurrency: Optional[int] = None, max_queue: int = 1024
+    ):
+        self.admission = AdmissionControl(
+            limit=max_concurrency,
+            policy=OverloadPolicy.QUEUE,
+            max_queue=max_queue,
+        )
+        self.completed = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self.admission.in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return self.admission.queue_depth
+
+    async def __call__(self, func: Callable[[], Any]) -> Any:
+        admission = self.admission
+
+        if not admission.try_acquire():
+            if not admission.can_enqueue():
+                admission.reject()
+                raise OverloadedError("Executor queue is full")
+
+            await admission.wait(admission.enqueue())
+
+        try:
+            return await self._execute(func)
+        finally:
+            admission.release()
+            self.completed += 1
+
+    @abstractmethod
+    async def _execute(self, func: Callable[[], Any]) -> Any:
+        raise NotImplementedError
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+    def __repr__(self):
+        return "<{0}: in_flight={1} queue={2} completed={3}>".format(
+            self.__class__.__name__,
+            self.in_flight,
+            self.queue_depth,
+            self.completed,
+        )
+
+
+class InlineExecutor(RouteExecutor):
+    """Executes the routes in the event-loop"""
+
+    async def _execute(self, func: Callable[[], Any]) -> Any:
+        return await awaitable(func)()
+
+
+class PoolExecutor(RouteExecutor):
+    def __init__(self, max_workers: int, max_queue: int = 1024):
+        super().__init__(max_concurrency=max_workers, max_queue=max_queue)
+        self.max_workers = max_workers
+        self._pool: Optional[Executor] = None
+
+    @abstractmethod
+    def _create_pool(self) -> Executor:
+        raise NotImplementedError
+
+    @property
+    def pool(self) -> Executor:
+        if self._pool is None:
+            self._pool = self._create_pool()
+        return self._pool
+
+    async def _execute(self, func: Callable[[], Any]) -> Any:
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(self.pool, func)
+
+        if asyncio.iscoroutine(result):
+            return await result
+        return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is None:
+            return
+
+        pool, self._pool = self._pool, None
+        pool.shutdown(wait=wait)
+
+
+class ThreadExecutor(PoolExecutor):
+    """Executes the routes in the dedicated bounded thread-pool"""
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_queue: int = 1024,
+        thread_name_prefix: str = "wsrpc",
+    ):
+        super().__init__(max_workers=max_workers, max_queue=max_queue)
+        self.thread_name_prefix = thread_name_prefix
+
+    def _create_pool(self) -> Executor:
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=self.thread_name_prefix,
+        )
+
+
+class ProcessExecutor(PoolExecutor):
+    """Executes the routes in the process-pool.
+
+    The route function and the call arguments must be picklable, so the
+    socket is not passed to the function routes and the Route classes
+    are not supported.
+    """
+
+    INJECT_SOCKET = False
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 1024):
+        super().__init__(max_workers=max_workers, max_queue=max_queue)
+
+    def _create_pool(self) -> Executor:
+        return ProcessPoolExecutor(max_workers=self.max_workers)
+
+
+__all__ = (
+    "InlineExecutor",
+    "ProcessExecutor",
+    "RouteExecutor",
+    "ThreadExecutor",
+)
@@ -1,11 +1,10 @@
 # encoding: utf-8
 import asyncio
+import itertools
 import json
 import logging
-import uuid
-from collections import defaultdict
 from functools import partial
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 import aiohttp
 from aiohttp import WebSocketError, web
@@ -14,36 +13,67 @@ from aiohttp.abc import AbstractView
 from wsrpc_aiohttp.signal import Signal
 
 from .abc import TimeoutType
+from .admission import OverloadPolicy
+from .backplane import Backplane
+from .codec import Codec, find_codec
 from .common import ClientException, WSRPCBase
+from .keepalive import KeepaliveMode, KeepaliveScheduler
+from .ratelimit import RateLimitPolicy
 from .tools import Lazy, awaitable
 
 global_log = logging.getLogger("wsrpc")
 log = logging.getLogger("wsrpc.handler")
 
 
-class WebSocketBase(WSRPCBase, AbstractView):
-    """Base class for aiohttp websocket handler"""
+class WebSocketBase(WSRPCBase):
+    """Base class for aiohttp websocket handler.
+
+    Instances are fully slotted, subclasses should declare
+    ``__slots__ = ()`` (or their own attributes) to keep every
+    connection without the ``__dict__``. Arbitrary per-connection
+    data is kept in the :attr:`store` mapping instead of the ad-hoc
+    attributes.
+    """
 
     __slots__ = (
         "_request",
         "socket",
         "id",
-        "__pending_tasks",
-        "__handlers",
-        "store",
         "serial",
         "_ping",
+        "_activity",
+        "_activity_seen",
         "protocol_version",
+        "_store",
     )
 
+    _KEEPALIVE: Dict[Type["WebSocketBase"], KeepaliveScheduler] = {}
+    # Connection ids are unique within the process, see address
+    _IDS = itertools.count(1)
+
+    # Idle connections are pinged every KEEPALIVE_PING_TIMEOUT seconds
+    # and closed when no frames were received during the next one,
+    # the falsy value disables the keepalive
     KEEPALIVE_PING_TIMEOUT: TimeoutType = 30
+    KEEPALIVE_MODE: KeepaliveMode = KeepaliveMode.RPC
+    KEEPALIVE_BUCKETS: int = 16
     CLIENT_TIMEOUT: TimeoutType = int(KEEPALIVE_PING_TIMEOUT / 3)
-    MAX_CONCURRENT_REQUESTS: TimeoutType = 25
+    MAX_CONCURRENT_REQUESTS: Optional[int] = 25
+    MAX_QUEUED_REQUESTS: int = 100
+    OVERLOAD_POLICY: OverloadPolicy = OverloadPolicy.BACKPRESSURE
     REQUEST_EXECUTION_TIMEOUT: Optional[TimeoutType] = None
+    BROADCAST_CHUNK_SIZE: int = 1000
+    # Relays the broadcasts and the client calls to the other
+    # processes or hosts, see Backplane.install
+    BACKPLANE: Optional[Backplane] = None
 
     JSON_LOADS = staticmethod(json.loads)
     JSON_DUMPS = staticmethod(json.dumps)
 
+    # Binary codecs in order of the preference, the codec
+    # is negotiated with the client as the WebSocket subprotocol
+    CODECS: Tuple[Codec, ...] = ()
+
     ON_AUTH_SUCCESS = Signal()
     ON_AUTH_FAIL = Signal()
     ON_CONN_OPEN = Signal()
@@ -51,7 +81,7 @@ class WebSocketBase(WSRPCBase, AbstractView):
     ON_CONN_FAIL = Signal()
 
     def __init__(self, request):
-        AbstractView.__init__(self, request)
+        self._request = request
         WSRPCBase.__init__(
             self,
             timeout=self.REQUEST_EXECUTION_TIMEOUT,
@@ -59,11 +89,30 @@ class WebSocketBase(WSRPCBase, AbstractView):
             dumps=self.JSON_DUMPS,
         )
 
-        self._ping = defaultdict(self._loop.create_future)
-        self.id = uuid.uuid4()
+        # Serial (None for the PING frame) and the send time
+        # of the unanswered keepalive ping
+        self._ping: Optional[Tuple[Optional[int], float]] = None
+        # Counter of the received frames and its value on the last
+        # keepalive sweep, connections with new frames are not pinged
+        self._activity = 0
+        self._activity_seen = 0
+        self.id = next(self._IDS)
         self.protocol_version = None
         self.serial = 0
-        self.semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        # Created on the first use, most connections never use it
+        self._store: Optional[Dict[str, Any]] = None
+
+    @property
+    def store(self) -> Dict[str, Any]:
+        """Arbitrary data of the connection, e.g. the authenticated user"""
+        store = self._store
+        if store is None:
+            store = self._store = {}
+        return store
+
+    @store.setter
+    def store(self, value: Dict[str, Any]) -> None:
+        self._store = value
 
     @classmethod
     def configure(
@@ -73,20 +122,73 @@ class WebSocketBase(WSRPCBase, AbstractView):
         max_concurrent_requests=MAX_CONCURRENT_REQUESTS,
         loads=json.loads,
         dumps=json.dumps,
+        overload_policy=OVERLOAD_POLICY,
+        max_queued_requests=MAX_QUEUED_REQUESTS,
+        codecs=CODECS,
+        keepalive_mode=KEEPALIVE_MODE,
+        rate_limit=None,
+        method_rate_limits=None,
+        global_rate_limit=None,
+        rate_limit_policy=RateLimitPolicy.REJECT,
     ):
         """Configures the handler class
 
-        :param dumps: json serializer
+        :param dumps: json serializer, might return ``str`` or UTF-8
+                      encoded ``bytes`` (e.g. ``orjson.dumps``)
         :param loads: json deserializer
-        :param keepalive_timeout: sets timeout of client pong response
-        :param client_timeout: internal lock timeout
+        :param keepalive_timeout: interval of the keepalive pings of the
+                                  idle connections and the timeout of
+                                  the pong response
+        :param client_timeout: connections with the greater ping round
+                               trip time will be closed
         :param max_concurrent_requests: how many concurrent requests might
-                                        be performed by each client
+                                        be performed by each client,
+                                        ``None`` means unlimited
+        :param overload_policy: what to do with the incoming call when
+                                ``max_concurrent_requests`` calls are
+                                running, see
+                                :class:`wsrpc_aiohttp.OverloadPolicy`
+        :param max_queued_requests: how many calls might wait for
+                                    the execution, over it the calls are
+                                    rejected with ``OverloadPolicy.QUEUE``
+                                    and the socket is not read with
+                                    ``OverloadPolicy.BACKPRESSURE``
+        :param codecs: binary codecs (see
+                       :class:`wsrpc_aiohttp.websocket.codec.Codec`)
+                       which might be negotiated with the client
+        :param keepalive_mode: send the ``ping`` RPC calls or the
+                               WebSocket PING frames, see
+                               :class:`wsrpc_aiohttp.KeepaliveMode`
+        :param rate_limit: :class:`wsrpc_aiohttp.RateLimit` of the calls
+                           of each connection
+        :param method_rate_limits: mapping of the method names to their
+                                   rate limits within each connection
+        :param global_rate_limit: rate limit of the calls of all the
+                                  connections of the handler class
+        :param rate_limit_policy: reject the calls over the limit or
+                                  delay reading them, see
+                                  :class:`wsrpc_aiohttp.RateLimitPolicy`
+        :raises ValueError: when a rate limit admits no calls
         """
+        method_rate_limits = dict(method_rate_limits or {})
+
+        for limit in (rate_limit, global_rate_limit):
+            if limit is not None:
+                limit.validate()
+        for limit in method_rate_limits.values():
+            limit.validate()
 
         cls.KEEPALIVE_PING_TIMEOUT = keepalive_timeout
         cls.CLIENT_TIMEOUT = client_timeout
         cls.MAX_CONCURRENT_REQUESTS = max_concurrent_requests
+        cls.OVERLOAD_POLICY = OverloadPolicy(overload_policy)
+        cls.MAX_QUEUED_REQUESTS = max_queued_requests
+        cls.CODECS = tuple(codecs)
+        cls.KEEPALIVE_MODE = KeepaliveMode(keepalive_mode)
+        cls.RATE_LIMIT = rate_limit
+        cls.METHOD_RATE_LIMITS = method_rate_limits
+        cls.GLOBAL_RATE_LIMIT = global_rate_limit
+        cls.RATE_LIMIT_POLICY = RateLimitPolicy(rate_limit_policy)
         cls.JSON_LOADS = staticmethod(loads)
         cls.JSON_DUMPS = staticmethod(dumps)
 
@@ -106,6 +208,18 @@ class WebSocketBase(WSRPCBase, AbstractView):
             if not signal.is_frozen:
                 signal.freeze()
 
+    @property
+    def request(self) -> web.Request:
+        return self._request
+
+    @property
+    def address(self) -> str:
+        """Id of the connection which is unique across the nodes of
+        the ``BACKPLANE``, see :meth:`call_client`"""
+        if self.BACKPLANE is None:
+            return str(self.id)
+        return self.BACKPLANE.address(self.id)
+
     def __await__(self):
         return self.__handle_request().__await__()
 
@@ -126,7 +240,11 @@ class WebSocketBase(WSRPCBase, AbstractView):
         return True
 
     async def __handle_request(self):
-        self.socket = web.WebSocketResponse()
+        self.socket = web.WebSocketResponse(
+            protocols=[codec.name for codec in self.CODECS],
+            # PONG frames are not passed to the reading loop on autoping
+            autoping=self.KEEPALIVE_MODE is not KeepaliveMode.FRAME,
+        )
 
         await self.ON_CONN_OPEN.call(socket=self.socket, request=self.request)
 
@@ -148,11 +266,18 @@ class WebSocketBase(WSRPCBase, AbstractView):
             )
             raise
 
+        self._codec = find_codec(self.CODECS, self.socket.ws_protocol)
+
         try:
             self.clients[self.id] = self
-            self._create_task(self._start_ping())
+            self._keepalive_start()
+
+            if self.BACKPLANE is not None:
+                self.BACKPLANE.joined(self.id)
 
             async for msg in self.socket:
+                self._activity += 1
+
                 try:
                     await self._on_message(msg)
                 except WebSocketError:
@@ -173,36 +298,233 @@ class WebSocketBase(WSRPCBase, AbstractView):
             await self.close()
 
     @classmethod
-    def broadcast(cls, func, callback=None, return_exceptions=True, **kwargs):
+    def broadcast(
+        cls,
+        func,
+        callback=None,
+        return_exceptions=True,
+        wait_replies=True,
+        chunk_size=None,
+        **kwargs,
+    ):
         """Call remote function on all connected clients
 
+        The request is serialized once per codec and the same frame is
+        written to each client socket, only the request serial is spliced
+        in for every client. The frames are queued to the clients without
+        waiting for the writes, so the slow client does not delay the
+        others.
+
         :param func: Remote route name
         :param callback: Function which receive responses
         :param return_exceptions: Return exceptions of client calls
             instead of raise a first one
+        :param wait_replies: Wait for the replies of all clients. Otherwise
+            the function is called as a notification (see
+            :func:`wsrpc_aiohttp.WSRPCBase.notify`) and the returned future
+            will be resolved with ``None`` right after the frames will
+            be written.
+        :param chunk_size: How many sockets are written between the
+            event-loop iterations, ``BROADCAST_CHUNK_SIZE`` by default
+
+        With the ``BACKPLANE`` the clients of the other nodes are called
+        as well and their results follow the local ones, the
+        ``callback`` receives only the replies of the local clients.
         """
 
-        tasks = []
+        return asyncio.ensure_future(
+            cls._broadcast(
+                func,
+                callback,
+                return_exceptions,
+                wait_replies,
+                chunk_size or cls.BROADCAST_CHUNK_SIZE,
+                kwargs,
+            )
+        )
+
+    @classmethod
+    async def _broadcast(
+        cls,
+        func,
+        callback,
+        return_exceptions,
+        wait_replies,
+        chunk_size,
+        params,
+        relay=True,
+    ):
+        templates: Dict[Any, Union[str, bytes]] = {}
+        calls: List[Tuple[WebSocketBase, int, asyncio.Future]] = []
+
+        remote: Optional[asyncio.Future] = None
+        if relay and cls.BACKPLANE is not None:
+            remote = asyncio.ensure_future(
+                cls.BACKPLANE.broadcast(func, params, wait_replies)
+            )
+
+        writes: List[asyncio.Future] = []
+
+        for idx, client in enumerate(tuple(cls.get_clients().values())):
+            if idx and not idx % chunk_size:
+                # Let the event loop breathe between the chunks
+                await asyncio.sleep(0)
+
+            serial = None
+            future = None
+
+            try:
+                if wait_replies:
+                    serial = client._get_serial()
+                    future = client._pending_calls.create(serial, client._loop)
+                    calls.append((client, serial, future))
+
+                    if callback:
+                        future.add_done_callback(partial(callback, client))
+
+                # Frames are queued to every client without waiting for
+                # the write, so the slow client does not delay the others
+                write = client.writer.send_nowait(
+                    client._encode_broadcast(templates, serial, func, params)
+                )
+            except Exception as e:
+                log.warning("Failed to broadcast %r to %r: %r", func, client, e)
+
+                if future is None and wait_replies:
+                    # The call was not registered, the client still
+                    # gets its entry in the results
+                    future = asyncio.get_event_loop().create_future()
+                    calls.append((client, serial, future))
+
+                    if callback:
+                        future.add_done_callback(partial(callback, client))
+
+                if future is not None and not future.done():
+                    future.set_exception(e)
+                continue
+
+            write.add_done_callback(partial(cls._broadcast_written, future))
+            writes.append(write)
+
+        if not wait_replies:
+            if writes:
+                await asyncio.wait(writes)
+            if remote is not None:
+                await remote
+            return None
+
+        if calls:
+            _, pending = await asyncio.wait(
+                [future for _, _, future in calls],
+                timeout=cls.REQUEST_EXECUTION_TIMEOUT,
+            )
+
+            for future in pending:
+                future.set_exception(asyncio.TimeoutError())
+
+        results = []
+        error: Optional[BaseException] = None
+
+        # Every client is cleaned up before the first error is raised
+        for client, serial, future in calls:
+            client._pending_calls.discard(serial)
+
+            if future.cancelled():
+                exc: Optional[BaseException] = asyncio.CancelledError()
+            else:
+                exc = future.exception()
+
+            if error is None and exc is not None and not return_exceptions:
+                error = exc
+
+            results.append(exc if exc is not None else future.result())
+
+        if remote is not None:
+            for result in await remote:
+                if error is None and isinstance(result, Exception):
+                    if not return_exceptions:
+                        error = result
+                results.append(result)
+
+        if error is not None:
+            raise error
+
+        return results
+
+    @staticmethod
+    def _broadcast_written(
+        future: Optional[asyncio.Future], write: asyncio.Future
+    ) -> None:
+        if write.cancelled():
+            exc: Optional[BaseException] = ConnectionError(
+                "Connection closed"
+            )
+        else:
+            exc = write.exception()
+
+        # The reply will never come when the frame was not written
+        if exc is not None and future is not None and not future.done():
+            future.set_exception(exc)
+
+    @classmethod
+    def find_client(cls, client_id: Any) -> Optional["WebSocketBase"]:
+        """Returns the local connection by its id, its string form
+        or its :attr:`address`"""
+        clients = cls.get_clients()
+        client = clients.get(client_id)
+
+        if client is None and isinstance(client_id, str):
+            node, sep, local_id = client_id.rpartition("/")
+            if sep and (
+                cls.BACKPLANE is None or node != cls.BACKPLANE.node_id
+            ):
+                return None
+
+            try:
+                client = clients.get(int(local_id))
+            except ValueError:
+                return None
 
-        for client in cls.get_clients().values():
-            task = asyncio.ensure_future(client.call(func, **kwargs))
+        return client  # type: ignore
+
+    @classmethod
+    async def call_client(
+        cls, client_id: Any, func: str, timeout=None, **kwargs
+    ):
+        """Calls the remote function of the client by its id. With the
+        ``BACKPLANE`` the client might be connected to the other node
+        and is found by its :attr:`address`.
+
+        :raises KeyError: when the client is not connected
+        """
+        client = cls.find_client(client_id)
 
-            if callback:
-                task.add_done_callback(partial(callback, client))
+        if client is not None:
+            return await client.call(func, timeout=timeout, **kwargs)
 
-            tasks.append(task)
+        if cls.BACKPLANE is None:
+            raise KeyError(client_id)
 
-        return asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        return await cls.BACKPLANE.call(client_id, func, kwargs, timeout)
+
+    def _encode_broadcast(self, templates, serial, func, params):
+        return self._encode_template(
+            templates, dict(method=func, params=params), serial
+        )
 
     async def _send(self, **kwargs):
+        log.debug(
+            "Sending message to %s serial %s: %s",
+            Lazy(lambda: str(self.id)),
+            Lazy(lambda: str(kwargs.get("id"))),
+            Lazy(lambda: str(kwargs)),
+        )
+
+        await self._send_payload(kwargs)
+
+    async def _write_frame(self, frame):
         try:
-            log.debug(
-                "Sending message to %s serial %s: %s",
-                Lazy(lambda: str(self.id)),
-                Lazy(lambda: str(kwargs.get("id"))),
-                Lazy(lambda: str(kwargs)),
-            )
-            await self.socket.send_json(kwargs, dumps=self._dumps)
+            await super()._write_frame(frame)
         except aiohttp.WebSocketError:
             self._create_task(self.close())
 
@@ -210,19 +532,18 @@ class WebSocketBase(WSRPCBase, AbstractView):
     def _format_error(e):
         return {"type": str(type(e).__name__), "message": str(e)}
 
-    def _reject(self, serial, error):
-        future = self._futures.get(serial)
-        if future:
-            future.set_exception(ClientException(error))
-
     async def close(self, message=None):
         """Cancel all pending tasks and stop this socket connection"""
+        self._keepalive_stop()
         await self.socket.close()
         await super().close()
 
         if self.id in self.clients:
             self.clients.pop(self.id)
 
+            if self.BACKPLANE is not None:
+                self.BACKPLANE.left(self.id)
+
         for name, obj in self._handlers.items():
             self._loop.create_task(awaitable(obj._onclose)())
 
@@ -234,70 +555,137 @@ class WebSocketBase(WSRPCBase, AbstractView):
             ),
         )
 
-    async def _start_ping(self):
-        while True:
-            if self.socket.closed:
-                return
+    @classmethod
+    def get_keepalive_scheduler(cls) -> KeepaliveScheduler:
+        """Returns the keepalive scheduler of the handler class
+        for the current event loop"""
+        loop = asyncio.get_event_loop()
+        scheduler = cls._KEEPALIVE.get(cls)
+
+        if scheduler is None or scheduler.loop is not loop:
+            scheduler = cls._KEEPALIVE[cls] = KeepaliveScheduler(
+                cls.KEEPALIVE_PING_TIMEOUT,
+                buckets=cls.KEEPALIVE_BUCKETS,
+                loop=loop,
+            )
 
-            future = asyncio.ensure_future(
-                self.call("ping", seq=self._loop.time())
+        scheduler.interval = cls.KEEPALIVE_PING_TIMEOUT
+        return scheduler
+
+    def _keepalive_start(self) -> None:
+        if not self.KEEPALIVE_PING_TIMEOUT:
+            return
+
+        self.get_keepalive_scheduler().add(self)
+
+    def _keepalive_stop(self) -> None:
+        scheduler = self._KEEPALIVE.get(type(self))
+        if scheduler is not None:
+            scheduler.discard(self)
+
+    def _keepalive(self, now: float) -> None:
+        """Called by the keepalive scheduler once per
+        ``KEEPALIVE_PING_TIMEOUT`` seconds"""
+        if self.socket.closed:
+            self._keepalive_stop()
+            return
+
+        if self._activity != self._activity_seen:
+            # Frames were received since the last sweep,
+            # so the connection is alive
+            self._activity_seen = self._activity
+            self._ping = None
+            return
+
+        if self._ping is not None:
+            log.info(
+                'Client "%r" connection should be closed because ping timeout',
+                self,
             )
+            self._keepalive_stop()
+            self._create_task(self.close())
+            return
+
+        if self.KEEPALIVE_MODE is KeepaliveMode.FRAME:
+            self._ping = (None, now)
+            self._create_task(self._send_ping_frame())
+            return
 
-            def on_timeout():
-                if future.done():
-                    return
+        serial = self._get_serial()
+        self._ping = (serial, now)
+        self._create_task(
+            self._send(id=serial, method="ping", params=dict(seq=now))
+        )
 
-                if isinstance(future, asyncio.Task):
-                    future.cancel()
-                    return
+    async def _send_ping_frame(self) -> None:
+        try:
+            await self.socket.ping()
+        except (ConnectionError, RuntimeError, WebSocketError):
+            self._create_task(self.close())
 
-                future.set_exception(TimeoutError)
+    def _pong(self, serial: Optional[int]) -> bool:
+        ping = self._ping
 
-            handle = self._loop.call_later(
-                self.KEEPALIVE_PING_TIMEOUT, on_timeout
+        if ping is None or ping[0] != serial:
+            return False
+
+        self._ping = None
+        # The pong is not the activity of the remote side
+        self._activity_seen = self._activity
+
+        delta = self._loop.time() - ping[1]
+        log.debug("%r Pong recieved: %.4f", self, delta)
+
+        if self.METRICS is not None:
+            self.METRICS.ping(delta)
+
+        if self.CLIENT_TIMEOUT and delta > self.CLIENT_TIMEOUT:
+            log.info(
+                'Client "%r" connection should be closed because ping '
+                "response time gather then client timeout",
+                self,
             )
+            self._keepalive_stop()
+            self._create_task(self.close())
 
-            future.add_done_callback(lambda f: handle.cancel())
+        return True
 
-            try:
-                resp = await future
-                if not resp:
-                    continue
+    def _resolve_result(self, serial, result) -> None:
+        if serial is not None and self._pong(serial):
+            return
 
-                delta = self._loop.time() - resp.get("seq", 0)
+        super()._resolve_result(serial, result)
 
-                log.debug("%r Pong recieved: %.4f" % (self, delta))
+    def _resolve_error(self, serial, error) -> None:
+        if serial is not None and self._pong(serial):
+            return
 
-            except asyncio.CancelledError:
-                break
-            except (TimeoutError, asyncio.TimeoutError):
-                log.info(
-                    'Client "%r" connection should be '
-                    "closed because ping timeout",
-                    self,
-                )
+        super()._resolve_error(serial, error)
 
-                self._loop.create_task(self.close())
-                break
-            except Exception:
-                log.exception("Error when ping remote side.")
-                break
-
-            if delta > self.CLIENT_TIMEOUT:
-                log.info(
-                    'Client "%r" connection should be closed because ping '
-                    "response time gather then client timeout",
-                    self,
-                )
-                self._loop.create_task(self.close())
-                break
+    async def _on_ping_frame(self, msg: aiohttp.WSMessage):
+        await self.socket.pong(msg.data)
+
+    def _on_pong_frame(self, msg: aiohttp.WSMessage):
+        self._pong(None)
 
-            await asyncio.sleep(self.KEEPALIVE_PING_TIMEOUT)
+    @classmethod
+    def _create_type_mapping(cls):
+        mapping = super()._create_type_mapping()
+        mapping[aiohttp.WSMsgType.PING] = "_on_ping_frame"
+        mapping[aiohttp.WSMsgType.PONG] = "_on_pong_frame"
+        return mapping
+
+
+# The router accepts the subclasses of AbstractView, inheriting it would
+# give every connection the __dict__ because the view has no __slots__
+AbstractView.register(WebSocketBase)  # type: ignore[type-abstract]
 
 
 class WebSocketAsync(WebSocketBase):
     """Handler class which execute any route as a coroutine"""
 
+    __slots__ = ()
+
     async def _executor(self, func):
         return await awaitable(func)()
 
@@ -306,6 +694,8 @@ class WebSocketThreaded(WebSocketBase):
     """Handler class which execute any route in the default thread-pool
     of current event loop"""
 
+    __slots__ = ()
+
     async def _executor(self, func):
         return await self._loop.run_in_executor(None, func)
 
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import random
+from enum import Enum
+from typing import Any, Dict, List, Optional, Set
+
+log = logging.getLogger(__name__)
+
+
+class KeepaliveMode(str, Enum):
+    """How the idle connections are pinged"""
+
+    # Call the ``ping`` route of the remote side
+    RPC = "rpc"
+    # Send the WebSocket PING control frame, no RPC support is required
+    FRAME = "frame"
+
+
+class KeepaliveScheduler:
+    """Shared keepalive timer of the connections of one handler class.
+
+    Connections are spread across ``buckets`` by random, the scheduler
+    visits one bucket every ``interval / buckets`` seconds, so every
+    connection is visited once per ``interval`` by the single timer
+    handle, and the pings of the connections accepted at the same time
+    are spread over the whole interval.
+
+    Visited connections implement ``_keepalive(now)``, it decides whether
+    the connection has to be pinged or closed.
+    """
+
+    __slots__ = (
+        "interval",
+        "loop",
+        "_wheel",
+        "_slots",
+        "_cursor",
+        "_handle",
+    )
+
+    def __init__(
+        self,
+        interval: float,
+        buckets: int = 16,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        self.interval = interval
+        self.loop = loop or asyncio.get_event_loop()
+        self._wheel: List[Set[Any]] = [set() for _ in range(max(buckets, 1))]
+        self._slots: Dict[Any, int] = {}
+        self._cursor = 0
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, connection: Any) -> bool:
+        return connection in self._slots
+
+    def add(self, connection: Any) -> None:
+        if connection in self._slots:
+            return
+
+        bucket = random.randrange(len(self._wheel))
+        self._wheel[bucket].add(connection)
+        self._slots[connection] = bucket
+
+        if self._handle is None:
+            self._schedule()
+
+    def discard(self, connection: Any) -> None:
+        bucket = self._slots.pop(connection, None)
+        if bucket is None:
+            return
+
+        self._wheel[bucket].discard(connection)
+
+        if not self._slots and self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule(self) -> None:
+        self._handle = self.loop.call_later(
+            self.interval / len(self._wheel), self._tick
+        )
+
+    def _tick(self) -> None:
+        self._handle = None
+        bucket = self._wheel[self._cursor]
+        self._cursor = (self._cursor + 1) % len(self._wheel)
+        now = self.loop.time()
+
+        for connection in tuple(bucket):
+            try:
+                connection._keepalive(now)
+            except Exception:
+                log.exception("Keepalive of %r failed", connection)
+
+        if self._slots and self._handle is None:
+            self._schedule()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        for bucket in self._wheel:
+            bucket.clear()
+        self._slots.clear()
+
+    def __repr__(self):
+        return "<{0}: connections={1} interval={2}>".format(
+            self.__class__.__name__, len(self), self.interval
+        )
+
+
+__all__ = ("KeepaliveMode", "KeepaliveScheduler")
@@ -0,0 +1,408 @@
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+
+from aiohttp import web
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+PING_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+# Label of the methods above the ``max_methods`` limit
+OTHER_METHOD = "__other__"
+
+
+class Histogram:
+    """Fixed buckets histogram, the counts are not cumulative until
+    the exposition."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # The last one is the ``+Inf`` bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Iterable[Tuple[str, int]]:
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield repr(float(bound)), total
+        yield "+Inf", self.count
+
+
+class MethodStats:
+    __slots__ = (
+        "in_flight",
+        "success",
+        "fail",
+        "throttled",
+        "cache_hits",
+        "cache_misses",
+        "coalesced",
+        "duration",
+    )
+
+    def __init__(self, buckets: Sequence[float]):
+        self.in_flight = 0
+        self.success = 0
+        self.fail = 0
+        self.throttled = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced = 0
+        self.duration = Histogram(buckets)
+
+
+class Metrics:
+    """Aggregated instrumentation of the handler classes.
+
+    Counters are plain integers updated from the event loop thread, so
+    recording does not need any locks and costs a few attribute updates
+    per call and per frame.
+
+    .. code-block:: python
+
+        metrics = Metrics()
+        metrics.install(WebSocketAsync)
+
+        app.router.add_route("*", "/ws/", WebSocketAsync)
+        app.router.add_get("/metrics", metrics.handler)
+
+    The ``/metrics`` route returns the Prometheus text exposition format.
+
+    :param namespace: prefix of the metric names
+    :param buckets: call duration histogram buckets in seconds
+    :param max_methods: how many distinct method labels are tracked,
+                        calls of the other methods are accounted as
+                        ``__other__`` so unknown method names sent by
+                        the clients can not bloat the output
+    """
+
+    __slots__ = (
+        "namespace",
+        "buckets",
+        "max_methods",
+        "methods",
+        "frames_in",
+        "frames_out",
+        "bytes_in",
+        "bytes_out",
+        "encode_seconds",
+        "encode_count",
+        "decode_seconds",
+        "decode_count",
+        "ping_rtt",
+        "_handlers",
+    )
+
+    def __init__(
+        self,
+        namespace: str = "wsrpc",
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        max_methods: int = 1000,
+    ):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self.max_methods = max_methods
+        self.methods: Dict[str, MethodStats] = {}
+
+        # Frame sizes are the lengths of the frame payloads, i.e.
+        # characters for the text frames and bytes for the binary ones
+        self.frames_in = 0
+        self.frames_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+        self.encode_seconds = 0.0
+        self.encode_count = 0
+        self.decode_seconds = 0.0
+        self.decode_count = 0
+
+        self.ping_rtt = Histogram(PING_BUCKETS)
+        self._handlers: Set[Any] = set()
+
+    def install(self, handler: Any) -> "Metrics":
+        """Enables the metrics for the handler class and its subclasses"""
+        handler.METRICS = self
+        self._handlers.add(handler)
+        return self
+
+    def uninstall(self, handler: Any) -> None:
+        handler.METRICS = None
+        self._handlers.discard(handler)
+
+    def _method(self, method: str) -> MethodStats:
+        stats = self.methods.get(method)
+        if stats is not None:
+            return stats
+
+        if len(self.methods) >= self.max_methods:
+            method = OTHER_METHOD
+            stats = self.methods.get(method)
+            if stats is not None:
+                return stats
+
+        stats = self.methods[method] = MethodStats(self.buckets)
+        return stats
+
+    def call_started(self, method: str) -> MethodStats:
+        stats = self._method(method)
+        stats.in_flight += 1
+        return stats
+
+    @staticmethod
+    def call_finished(stats: MethodStats, duration: float, ok: bool) -> None:
+        stats.in_flight -= 1
+        stats.duration.observe(duration)
+
+        if ok:
+            stats.success += 1
+        else:
+            stats.fail += 1
+
+    def call_throttled(self, method: str) -> None:
+        self._method(method).throttled += 1
+
+    def call_coalesced(self, method: str) -> None:
+        self._method(method).coalesced += 1
+
+    def cache_lookup(self, method: str, hit: bool) -> None:
+        stats = self._method(method)
+        if hit:
+            stats.cache_hits += 1
+        else:
+            stats.cache_misses += 1
+
+    def frame_received(self, size: int) -> None:
+        self.frames_in += 1
+        self.bytes_in += size
+
+    def frame_sent(self, size: int) -> None:
+        self.frames_out += 1
+        self.bytes_out += size
+
+    def encoded(self, seconds: float) -> None:
+        self.encode_seconds += seconds
+        self.encode_count += 1
+
+    def decoded(self, seconds: float) -> None:
+        self.decode_seconds += seconds
+        self.decode_count += 1
+
+    def ping(self, rtt: float) -> None:
+        self.ping_rtt.observe(rtt)
+
+    def connections(self) -> Dict[str, int]:
+        """Gauge of the open connections per handler class, the
+        subclasses of the installed classes are reported as well"""
+        result: Dict[str, int] = {}
+        handlers = list(self._handlers)
+        seen = set()
+
+        while handlers:
+            handler = handlers.pop()
+            if handler in seen:
+                continue
+            seen.add(handler)
+            # Subclasses inherit METRICS, unless they were uninstalled
+            if handler.METRICS is not self:
+                continue
+
+            result[handler.__name__] = len(handler.get_clients())
+            handlers.extend(handler.__subclasses__())
+
+        return result
+
+    def render(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        ns = self.namespace
+
+        def header(name: str, kind: str, doc: str) -> str:
+            lines.append("# HELP {0}_{1} {2}".format(ns, name, doc))
+            lines.append("# TYPE {0}_{1} {2}".format(ns, name, kind))
+            return "{0}_{1}".format(ns, name)
+
+        def histogram(name: str, value: Histogram, labels: str = "") -> None:
+            sep = "," if labels else ""
+            for bound, count in value.cumulative():
+                lines.append(
+                    '{0}_bucket{{{1}{2}le="{3}"}} {4}'.format(
+                        name, labels, sep, bound, count
+                    )
+                )
+            suffix = "{{{0}}}".format(labels) if labels else ""
+            lines.append("{0}_sum{1} {2!r}".format(name, suffix, value.sum))
+            lines.append("{0}_count{1} {2}".format(name, suffix, value.count))
+
+        methods = sorted(self.methods.items())
+
+        name = header("calls_total", "counter", "Finished incoming calls")
+        for method, stats in methods:
+            label = _escape(method)
+            lines.append(
+                '{0}{{method="{1}",status="success"}} {2}'.format(
+                    name, label, stats.success
+                )
+            )
+            lines.append(
+                '{0}{{method="{1}",status="fail"}} {2}'.format(
+                    name, label, stats.fail
+                )
+            )
+
+        name = header(
+            "calls_throttled_total", "counter", "Calls over the rate limit"
+        )
+        for method, stats in methods:
+            lines.append(
+                '{0}{{method="{1}"}} {2}'.format(
+                    name, _escape(method), stats.throttled
+                )
+            )
+
+        name = header(
+            "calls_coalesced_total",
+            "counter",
+            "Calls served by the identical in-flight call",
+        )
+        for method, stats in methods:
+            if stats.coalesced:
+                lines.append(
+                    '{0}{{method="{1}"}} {2}'.format(
+                        name, _escape(method), stats.coalesced
+                    )
+                )
+
+        name = header(
+            "cache_lookups_total", "counter", "Result cache lookups"
+        )
+        for method, stats in methods:
+            if not (stats.cache_hits or stats.cache_misses):
+                continue
+
+            label = _escape(method)
+            lines.append(
+                '{0}{{method="{1}",result="hit"}} {2}'.format(
+                    name, label, stats.cache_hits
+                )
+            )
+            lines.append(
+                '{0}{{method="{1}",result="miss"}} {2}'.format(
+                    name, label, stats.cache_misses
+                )
+            )
+
+        name = header("calls_in_flight", "gauge", "Running incoming calls")
+        for method, stats in methods:
+            lines.append(
+                '{0}{{method="{1}"}} {2}'.format(
+                    name, _escape(method), stats.in_flight
+                )
+            )
+
+        name = header(
+            "call_duration_seconds", "histogram", "Incoming call duration"
+        )
+        for method, stats in methods:
+            histogram(
+                name, stats.duration, 'method="{0}"'.format(_escape(method))
+            )
+
+        for name, doc, counter in (
+            ("frames_received_total", "Received frames", self.frames_in),
+            ("frames_sent_total", "Sent frames", self.frames_out),
+            ("received_bytes_total", "Received payload", self.bytes_in),
+            ("sent_bytes_total", "Sent payload", self.bytes_out),
+        ):
+            lines.append(
+                "{0} {1}".format(header(name, "counter", doc), counter)
+            )
+
+        name = header(
+            "serialization_seconds", "summary", "Frames serialization time"
+        )
+        for operation, seconds, count in (
+            ("encode", self.encode_seconds, self.encode_count),
+            ("decode", self.decode_seconds, self.decode_count),
+        ):
+            lines.append(
+                '{0}_sum{{operation="{1}"}} {2!r}'.format(
+                    name, operation, seconds
+                )
+            )
+            lines.append(
+                '{0}_count{{operation="{1}"}} {2}'.format(
+                    name, operation, count
+                )
+            )
+
+        histogram(
+            header("ping_rtt_seconds", "histogram", "Keepalive ping RTT"),
+            self.ping_rtt,
+        )
+
+        name = header("connections", "gauge", "Open connections")
+        for handler, count in sorted(self.connections().items()):
+            lines.append(
+                '{0}{{handler="{1}"}} {2}'.format(name, _escape(handler), count)
+            )
+
+        lines.append("")
+        return "\n".join(lines)
+
+    async def handler(self, request: web.Request) -> web.Response:
+        """aiohttp handler which exposes the metrics"""
+        return web.Response(
+            text=self.render(),
+            content_type="text/plain",
+            headers={"X-Content-Type-Options": "nosniff"},
+        )
+
+    def __repr__(self):
+        return "<{0}: methods={1} frames_in={2} frames_out={3}>".format(
+            self.__class__.__name__,
+            len(self.methods),
+            self.frames_in,
+            self.frames_out,
+        )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+__all__ = ("Histogram", "Metrics")
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+
+class PendingCalls:
+    """Table of the outgoing calls which are waiting for the reply.
+
+    Every entry is removed exactly once: when the reply or the error
+    arrives, when the caller gives up waiting, or when the connection
+    is closed. ``len()`` of the table is the gauge of outstanding calls.
+    """
+
+    __slots__ = ("_futures", "max_size")
+
+    def __init__(self, max_size: Optional[int] = None):
+        self._futures: Dict[int, asyncio.Future] = {}
+        self.max_size = max_size
+
+    def __len__(self) -> int:
+        return len(self._futures)
+
+    def __contains__(self, serial: int) -> bool:
+        return serial in self._futures
+
+    def serials(self) -> List[int]:
+        return list(self._futures)
+
+    def is_full(self) -> bool:
+        return self.max_size is not None and len(self) >= self.max_size
+
+    def create(
+        self, serial: int, loop: asyncio.AbstractEventLoop
+    ) -> asyncio.Future:
+        future = loop.create_future()
+        self._futures[serial] = future
+        return future
+
+    def get(self, serial: int) -> Optional[asyncio.Future]:
+        return self._futures.get(serial)
+
+    def discard(self, serial: int) -> Optional[asyncio.Future]:
+        return self._futures.pop(serial, None)
+
+    def resolve(self, serial: int, result: Any) -> bool:
+        future = self._futures.pop(serial, None)
+        if future is None or future.done():
+            return False
+
+        future.set_result(result)
+        return True
+
+    def reject(self, serial: int, exc: BaseException) -> bool:
+        future = self._futures.pop(serial, None)
+        if future is None or future.done():
+            return False
+
+        future.set_exception(exc)
+        return True
+
+    def reject_all(self, exc: BaseException) -> None:
+        futures, self._futures = self._futures, {}
+
+        for future in futures.values():
+            if not future.done():
+                future.set_exception(exc)
+
+
+__all__ = ("PendingCalls",)
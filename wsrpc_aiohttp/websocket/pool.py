@@ -0,0 +1,307 @@
+import asyncio
+import logging
+from enum import Enum
+from typing import Any, Iterable, List, Optional, Set, Type, Union
+
+from yarl import URL
+
+from .abc import Proxy, TimeoutType
+from .client import WSRPCClient
+from .stream import CallStream
+
+log = logging.getLogger(__name__)
+
+EndpointType = Union[URL, str]
+
+
+class BalancingStrategy(str, Enum):
+    """How the calls are spread across the pool members"""
+
+    # The member with the fewest calls waiting for the reply
+    LEAST_IN_FLIGHT = "least-in-flight"
+    # Members in turn
+    ROUND_ROBIN = "round-robin"
+
+
+class WSRPCClientPool:
+    """Pool of the client connections to one or more endpoints.
+
+    Every connection has its own socket and reading task, so the pool
+    is not limited by the throughput of the single WebSocket.
+
+    .. code-block:: python
+
+        async with WSRPCClientPool(
+            ["ws://10.0.0.1/ws/", "ws://10.0.0.2/ws/"], size=8
+        ) as pool:
+            await pool.proxy.storage.get(key="foo")
+
+    Members are checked with the ``ping`` route every
+    ``health_check_interval`` seconds. The member which lost the
+    connection or did not answer within ``health_check_timeout`` is
+    excluded from the balancing, closed when its pending calls will
+    be finished (or after ``drain_timeout``) and replaced with the new
+    connection to the same endpoint.
+
+    :param endpoints: endpoint or endpoints, members are distributed
+                      across them evenly
+    :param size: number of the connections
+    :param strategy: see :class:`BalancingStrategy`
+    :param client_class: class of the members
+    :param client_kwargs: keyword arguments of the members. The
+                          ``session`` passed here is shared by the
+                          members and is not closed by the pool.
+    """
+
+    __slots__ = (
+        "endpoints",
+        "size",
+        "strategy",
+        "health_check_interval",
+        "health_check_timeout",
+        "drain_timeout",
+        "replaced",
+        "_client_class",
+        "_client_kwargs",
+        "_members",
+        "_cursor",
+        "_health_task",
+        "_drain_tasks",
+        "closed",
+    )
+
+    def __init__(
+        self,
+        endpoints: Union[EndpointType, Iterable[EndpointType]],
+        size: int = 4,
+        strategy: BalancingStrategy = BalancingStrategy.LEAST_IN_FLIGHT,
+        health_check_interval: Optional[TimeoutType] = 10,
+        health_check_timeout: TimeoutType = 5,
+        drain_timeout: TimeoutType = 30,
+        client_class: Type[WSRPCClient] = WSRPCClient,
+        **client_kwargs: Any,
+    ):
+        if isinstance(endpoints, (str, URL)):
+            endpoints = (endpoints,)
+
+        self.endpoints: List[URL] = [URL(str(e)) for e in endpoints]
+        if not self.endpoints:
+            raise ValueError("At least one endpoint is required")
+
+        self.size = size
+        self.strategy = BalancingStrategy(strategy)
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.drain_timeout = drain_timeout
+        # Counter of the replaced members
+        self.replaced = 0
+        self.closed = False
+
+        self._client_class = client_class
+        if client_kwargs.get("session") is not None:
+            # The closed or replaced member must keep the shared session
+            client_kwargs.setdefault("close_session", False)
+        self._client_kwargs = client_kwargs
+        self._members: List[Optional[WSRPCClient]] = [None] * size
+        self._cursor = 0
+        self._health_task: Optional[asyncio.Task] = None
+        self._drain_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def members(self) -> List[WSRPCClient]:
+        """Connected members of the pool"""
+        return [
+            member
+            for member in self._members
+            if member is not None and member.connected
+        ]
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def _endpoint(self, index: int) -> URL:
+        return self.endpoints[index % len(self.endpoints)]
+
+    async def _connect_member(self, index: int) -> WSRPCClient:
+        client = self._client_class(
+            self._endpoint(index), **self._client_kwargs
+        )
+
+        try:
+            await client.connect()
+        except BaseException:
+            await client.close()
+            raise
+
+        self._members[index] = client
+        return client
+
+    async def connect(self) -> None:
+        """Connects all members, fails when none of them
+        could be connected"""
+        results = await asyncio.gather(
+            *[self._connect_member(idx) for idx in range(self.size)],
+            return_exceptions=True,
+        )
+
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if len(errors) == len(results):
+            raise errors[0]
+
+        for error in errors:
+            log.warning("Failed to connect the pool member: %r", error)
+
+        if self.health_check_interval and self._health_task is None:
+            self._health_task = asyncio.ensure_future(self._health_check())
+
+    def _choose(self) -> WSRPCClient:
+        size = len(self._members)
+        start = self._cursor
+        self._cursor = (start + 1) % size
+
+        best: Optional[WSRPCClient] = None
+
+        for offset in range(size):
+            member = self._members[(start + offset) % size]
+            if member is None or not member.connected:
+                continue
+
+            if self.strategy is BalancingStrategy.ROUND_ROBIN:
+                return member
+
+            if best is None or member.pending_calls < best.pending_calls:
+                best = member
+
+                if not best.pending_calls:
+                    break
+
+        if best is None:
+            raise ConnectionError("No connected members in the pool")
+
+        return best
+
+    async def call(self, func: str, timeout=None, **kwargs):
+        """Calls the remote function with the chosen member,
+        see :func:`wsrpc_aiohttp.WSRPCBase.call`"""
+        return await self._choose().call(func, timeout=timeout, **kwargs)
+
+    async def notify(self, method: str, **params) -> None:
+        await self._choose().notify(method, **params)
+
+    def stream(self, func: str, **kwargs) -> CallStream:
+        return self._choose().stream(func, **kwargs)
+
+    @property
+    def proxy(self) -> Proxy:
+        return Proxy(self.call)
+
+    async def _is_healthy(self, member: WSRPCClient) -> bool:
+        if not member.connected:
+            return False
+
+        try:
+            await member.call("ping", timeout=self.health_check_timeout)
+        except Exception as e:
+            log.warning("Pool member %r failed health check: %r", member, e)
+            return False
+
+        return True
+
+    async def check(self) -> None:
+        """Checks the members once, replaces the unhealthy ones"""
+        members = list(enumerate(self._members))
+        results = await asyncio.gather(
+            *[
+                self._is_healthy(member) if member is not None else _false()
+                for _, member in members
+            ]
+        )
+
+        for (idx, member), healthy in zip(members, results):
+            if healthy or self.closed:
+                continue
+
+            if member is not None and self._members[idx] is member:
+                self._members[idx] = None
+                self._drain(member)
+
+            try:
+                await self._connect_member(idx)
+            except Exception as e:
+                log.warning(
+                    "Failed to replace the pool member %s: %r",
+                    self._endpoint(idx),
+                    e,
+                )
+                continue
+
+            self.replaced += 1
+
+    async def _health_check(self) -> None:
+        while not self.closed:
+            await asyncio.sleep(self.health_check_interval)  # type: ignore
+
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Pool health check failed")
+
+    def _drain(self, member: WSRPCClient) -> None:
+        async def drain():
+            deadline = asyncio.get_event_loop().time() + self.drain_timeout
+
+            while (
+                member.pending_calls
+                and member.connected
+                and asyncio.get_event_loop().time() < deadline
+            ):
+                await asyncio.sleep(0.1)
+
+            await member.close()
+
+        task = asyncio.ensure_future(drain())
+        self._drain_tasks.add(task)
+        task.add_done_callback(self._drain_tasks.discard)
+
+    async def close(self) -> None:
+        if self.closed:
+            return
+
+        self.closed = True
+
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+
+        members = [m for m in self._members if m is not None]
+        self._members = [None] * self.size
+
+        await asyncio.gather(
+            *[member.close() for member in members],
+            *list(self._drain_tasks),
+            return_exceptions=True,
+        )
+
+    async def __aenter__(self) -> "WSRPCClientPool":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    def __repr__(self):
+        return "<{0}: {1}/{2} members {3}>".format(
+            self.__class__.__name__,
+            len(self),
+            self.size,
+            self.strategy.value,
+        )
+
+
+async def _false() -> bool:
+    return False
+
+
+__all__ = ("BalancingStrategy", "WSRPCClientPool")
@@ -0,0 +1,192 @@
+from enum import Enum
+from typing import Dict, Mapping, NamedTuple, Optional
+
+
+class RateLimitPolicy(str, Enum):
+    """What to do with an incoming call over the rate limit"""
+
+    # Reply with a ``RateLimitedError`` immediately
+    REJECT = "reject"
+    # Stop reading from the socket until the call fits the limit
+    DELAY = "delay"
+
+
+class RateLimit(NamedTuple):
+    """Sustained ``rate`` of the calls per second, up to ``burst`` calls
+    (``rate`` by default, at least one) might be made at once"""
+
+    rate: float
+    burst: Optional[float] = None
+
+    def validate(self) -> "RateLimit":
+        """Raises ``ValueError`` for the limit which admits no calls"""
+        if not self.rate > 0:
+            raise ValueError(
+                "Rate must be positive, got {0!r}".format(self.rate)
+            )
+        if self.burst is not None and not self.burst >= 1:
+            raise ValueError(
+                "Burst must be at least one, got {0!r}".format(self.burst)
+            )
+        return self
+
+
+class TokenBucket:
+    """Token bucket refilled lazily on every consumption.
+
+    Consumption costs a few float operations and allocates nothing,
+    so the bucket might be checked for every incoming frame.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated", "throttled")
+
+    def __init__(self, limit: RateLimit, now: float = 0.0):
+        limit.validate()
+        self.rate = float(limit.rate)
+        self.burst = max(float(limit.burst or limit.rate), 1.0)
+        self.tokens = self.burst
+        self.updated = now
+        # Counter of the calls over the limit
+        self.throttled = 0
+
+    def consume(self, now: float, reserve: bool = False) -> float:
+        """Takes one token, returns ``0`` on success or the seconds
+        until the token will be available.
+
+        With ``reserve`` the token is taken anyway and the bucket goes
+        into debt, so the delayed calls are admitted in their order.
+        """
+        tokens = self.tokens + (now - self.updated) * self.rate
+        if tokens > self.burst:
+            tokens = self.burst
+        self.updated = now
+
+        if tokens >= 1:
+            self.tokens = tokens - 1
+            return 0.0
+
+        self.throttled += 1
+        wait = (1 - tokens) / self.rate
+
+        if reserve:
+            tokens -= 1
+
+        self.tokens = tokens
+        return wait
+
+    def refund(self) -> None:
+        """Returns the token taken by the call which was rejected by
+        the other bucket"""
+        self.tokens += 1
+
+    def __repr__(self):
+        return "<{0}: {1}/s burst={2} tokens={3:.2f}>".format(
+            self.__class__.__name__, self.rate, self.burst, self.tokens
+        )
+
+
+class RateLimiter:
+    """Rate limits of the incoming calls of one connection.
+
+    The call takes a token from the connection bucket, from the bucket
+    of its method and from the bucket shared by the all connections of
+    the handler class, the buckets which are not configured are skipped.
+    """
+
+    __slots__ = (
+        "connection",
+        "shared",
+        "policy",
+        "throttled",
+        "_limits",
+        "_methods",
+    )
+
+    def __init__(
+        self,
+        connection: Optional[RateLimit] = None,
+        methods: Optional[Mapping[str, RateLimit]] = None,
+        shared: Optional[TokenBucket] = None,
+        policy: RateLimitPolicy = RateLimitPolicy.REJECT,
+        now: float = 0.0,
+    ):
+        self.connection: Optional[TokenBucket] = None
+        if connection is not None:
+            self.connection = TokenBucket(connection, now)
+
+        self.shared = shared
+        self.policy = RateLimitPolicy(policy)
+        # Counter of the throttled calls of the connection
+        self.throttled = 0
+
+        self._limits: Mapping[str, RateLimit] = methods or {}
+        # Method buckets are created lazily, so their limits are
+        # checked here rather than in the middle of the call
+        for limit in self._limits.values():
+            limit.validate()
+        self._methods: Dict[str, TokenBucket] = {}
+
+    def _method_bucket(self, method: str, now: float) -> Optional[TokenBucket]:
+        bucket = self._methods.get(method)
+        if bucket is not None:
+            return bucket
+
+        limit = self._limits.get(method)
+        if limit is None:
+            return None
+
+        bucket = self._methods[method] = TokenBucket(limit, now)
+        return bucket
+
+    def acquire(self, method: str, now: float) -> float:
+        """Returns ``0`` when the call might be executed, otherwise the
+        seconds to reject with or to delay the call for"""
+        reserve = self.policy is RateLimitPolicy.DELAY
+        delay = 0.0
+
+        connection = self.connection
+        if connection is not None:
+            delay = connection.consume(now, reserve)
+            if delay and not reserve:
+                self.throttled += 1
+                return delay
+
+        bucket = self._method_bucket(method, now) if self._limits else None
+        if bucket is not None:
+            wait = bucket.consume(now, reserve)
+            if wait and not reserve:
+                if connection is not None:
+                    connection.refund()
+                self.throttled += 1
+                return wait
+            delay = max(delay, wait)
+
+        shared = self.shared
+        if shared is not None:
+            wait = shared.consume(now, reserve)
+            if wait and not reserve:
+                if connection is not None:
+                    connection.refund()
+                if bucket is not None:
+                    bucket.refund()
+                self.throttled += 1
+                return wait
+            delay = max(delay, wait)
+
+        if delay:
+            self.throttled += 1
+
+        return delay
+
+    def __repr__(self):
+        return "<{0}: {1} throttled={2}>".format(
+            self.__class__.__name__, self.policy.value, self.throttled
+        )
+
+
+__all__ = (
+    "RateLimit",
+    "RateLimitPolicy",
+    "RateLimiter",
+    "TokenBucket",
+)
@@ -0,0 +1,86 @@
+import random
+from typing import FrozenSet, Iterable, Optional
+
+
+class ReconnectPolicy:
+    """How :class:`wsrpc_aiohttp.WSRPCClient` restores the lost connection.
+
+    The delay before the ``n``-th attempt grows exponentially from
+    ``initial_delay`` up to ``max_delay``, and the random part of it
+    (``jitter``, from 0 to 1) spreads the reconnections of the many
+    clients which lost the connection at the same time.
+
+    .. code-block:: python
+
+        client = WSRPCClient(
+            "ws://127.0.0.1:8080/ws/",
+            reconnect=ReconnectPolicy(
+                max_attempts=10,
+                idempotent_methods=("storage.get", "ping"),
+            ),
+            on_reconnect=subscribe,
+        )
+
+    :param max_attempts: attempts in a row before the client will be
+                         closed, ``None`` means retry forever
+    :param max_queue: how many calls might wait for the reconnection,
+                      the calls above fail with ``ClientConnectionError``
+    :param idempotent_methods: the calls of these methods which were in
+                               flight when the connection was lost are
+                               sent again after the reconnection, the
+                               other ones fail with ``ConnectionError``
+    """
+
+    __slots__ = (
+        "initial_delay",
+        "max_delay",
+        "factor",
+        "jitter",
+        "max_attempts",
+        "max_queue",
+        "idempotent_methods",
+    )
+
+    def __init__(
+        self,
+        initial_delay: float = 0.1,
+        max_delay: float = 30,
+        factor: float = 2,
+        jitter: float = 0.5,
+        max_attempts: Optional[int] = None,
+        max_queue: int = 1024,
+        idempotent_methods: Iterable[str] = (),
+    ):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = min(max(jitter, 0), 1)
+        self.max_attempts = max_attempts
+        self.max_queue = max_queue
+        self.idempotent_methods: FrozenSet[str] = frozenset(idempotent_methods)
+
+    def delay(self, attempt: int) -> float:
+        """Delay before the attempt, starting from 0"""
+        # The exponent is limited to prevent the float overflow
+        delay = min(
+            self.initial_delay * self.factor ** min(attempt, 64),
+            self.max_delay,
+        )
+        return delay - delay * self.jitter * random.random()
+
+    def should_retry(self, attempt: int) -> bool:
+        return self.max_attempts is None or attempt < self.max_attempts
+
+    def is_idempotent(self, method: str) -> bool:
+        return method in self.idempotent_methods
+
+    def __repr__(self):
+        return "<{0}: delay={1}..{2} attempts={3}>".format(
+            self.__class__.__name__,
+            self.initial_delay,
+            self.max_delay,
+            self.max_attempts,
+        )
+
+
+__all__ = ("ReconnectPolicy",)
@@ -1,8 +1,21 @@
 import asyncio
+import inspect
 import logging
 from abc import ABCMeta
+from enum import Enum
+from functools import wraps
 from types import MappingProxyType
-from typing import Any, Callable, Mapping, Optional
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+)
 
 from . import decorators
 from .abc import AbstractRoute, AbstractWebSocket
@@ -10,6 +23,147 @@ from .abc import AbstractRoute, AbstractWebSocket
 log = logging.getLogger("wsrpc")
 
 
+class RouteScope(str, Enum):
+    """Which connections share the instance of the Route class"""
+
+    # Instance per connection, created on the first call
+    CONNECTION = "connection"
+    # One instance for all the connections of the process
+    SINGLETON = "singleton"
+    # Instances are borrowed for the call from the pool, so the
+    # instance is never used by two calls at once
+    POOLED = "pooled"
+
+
+class RoutePool:
+    """Idle instances of the pooled route.
+
+    The call borrows the idle instance or creates the new one, up to
+    ``max_size`` instances are kept for the next calls. The generator
+    methods return the instance when the stream is exhausted or closed.
+    """
+
+    __slots__ = ("route", "max_size", "created", "_idle", "_methods")
+
+    def __init__(self, route: Any, max_size: int):
+        self.route = route
+        self.max_size = max_size
+        # Counter of the created instances
+        self.created = 0
+        self._idle: List[Any] = []
+        self._methods: Dict[str, Callable[..., Any]] = {}
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def acquire(self) -> Any:
+        if self._idle:
+            return self._idle.pop()
+
+        self.created += 1
+        return self.route(None)
+
+    def release(self, instance: Any) -> None:
+        if len(self._idle) < self.max_size:
+            self._idle.append(instance)
+
+    def method(self, name: str) -> Callable[..., Any]:
+        """Function which calls the method of the borrowed instance"""
+        method = self._methods.get(name)
+        if method is not None:
+            return method
+
+        instance = self.acquire()
+        try:
+            # Raises for the unknown and masked methods
+            bound = instance(name)
+        finally:
+            self.release(instance)
+
+        if inspect.iscoroutinefunction(bound):
+
+            @wraps(bound)
+            async def func(*args, **kwargs):
+                instance = self.acquire()
+                try:
+                    return await instance(name)(*args, **kwargs)
+                finally:
+                    self.release(instance)
+
+        else:
+
+            @wraps(bound)
+            def func(*args, **kwargs):
+                instance = self.acquire()
+                try:
+                    result = instance(name)(*args, **kwargs)
+                except BaseException:
+                    self.release(instance)
+                    raise
+
+                # The streamed result keeps the instance borrowed
+                # until it is exhausted or closed
+                if inspect.isgenerator(result):
+                    return self._stream(instance, result)
+                if inspect.isasyncgen(result):
+                    return self._astream(instance, result)
+
+                self.release(instance)
+                return result
+
+        method = self._methods[name] = func
+        return method
+
+    def _stream(self, instance: Any, stream: Generator) -> Generator:
+        try:
+            return (yield from stream)
+        finally:
+            self.release(instance)
+
+    async def _astream(
+        self, instance: Any, stream: AsyncGenerator
+    ) -> AsyncGenerator:
+        try:
+            async for item in stream:
+                yield item
+        finally:
+            try:
+                await stream.aclose()
+            finally:
+                self.release(instance)
+
+    def __repr__(self):
+        return "<{0}: {1} idle={2} created={3}>".format(
+            self.__class__.__name__,
+            self.route.__name__,
+            len(self._idle),
+            self.created,
+        )
+
+
+# Instances of the singleton routes and pools of the pooled ones
+_SHARED: Dict[Any, Any] = {}
+
+# Attributes of the Route classes captured by the dispatch tables
+_COMPILED_ATTRIBUTES = frozenset(("__executor__", "__scope__"))
+_GENERATION = 0
+
+
+def _changed(name: str) -> None:
+    global _GENERATION
+
+    if name in _COMPILED_ATTRIBUTES:
+        # The dispatch tables are compiled again on the next call
+        _GENERATION += 1
+
+
+def routes_generation() -> int:
+    """Counter of the changes of the Route classes attributes which
+    are captured by the compiled dispatch tables"""
+    return _GENERATION
+
+
 # noinspection PyUnresolvedReferences
 class RouteMeta(ABCMeta):
     def __new__(cls, clsname, superclasses, attributedict):
@@ -52,6 +206,14 @@ class RouteMeta(ABCMeta):
 
         return instance
 
+    def __setattr__(cls, name, value):
+        super().__setattr__(name, value)
+        _changed(name)
+
+    def __delattr__(cls, name):
+        super().__delattr__(name)
+        _changed(name)
+
 
 ProxyCollectionType = Mapping[str, Callable[..., Any]]
 
@@ -60,13 +222,28 @@ class RouteBase(AbstractRoute, metaclass=RouteMeta):
     __proxy__: ProxyCollectionType = MappingProxyType({})
     __no_proxy__: ProxyCollectionType = MappingProxyType({})
 
-    def __init__(self, socket: AbstractWebSocket):
-        super().__init__(socket)
+    # RouteExecutor for the methods of this route. Underscored name
+    # keeps it away from the remote side.
+    __executor__: Any = None
+
+    # Instances of the shared scopes are created without the socket,
+    # their methods receive the socket as the first argument
+    __scope__: RouteScope = RouteScope.CONNECTION
+    # How many idle instances of the pooled route are kept
+    __pool_size__: int = 64
+
+    def __init__(self, socket: Optional[AbstractWebSocket]):
+        super().__init__(socket)  # type: ignore
         self.__socket = socket
         self.__loop: Optional[asyncio.AbstractEventLoop] = None
 
     @property
     def socket(self) -> AbstractWebSocket:
+        if self.__socket is None:
+            raise RuntimeError(
+                "{0!r} is shared by the connections, the socket is passed "
+                "to its methods".format(self)
+            )
         return self.__socket
 
     @property
@@ -86,6 +263,38 @@ class RouteBase(AbstractRoute, metaclass=RouteMeta):
     def __is_method_masked__(cls, name, func):
         return None
 
+    @classmethod
+    def __public_methods__(cls) -> Iterable[str]:
+        """Names of the methods callable by the remote side"""
+        return tuple(
+            name for name in cls.__proxy__ if name not in cls.__no_proxy__
+        )
+
+    @classmethod
+    def __shared__(cls) -> Any:
+        """Instance of the singleton route or the pool of the pooled one"""
+        shared = _SHARED.get(cls)
+
+        if shared is None:
+            if RouteScope(cls.__scope__) is RouteScope.POOLED:
+                shared = RoutePool(cls, cls.__pool_size__)
+            else:
+                shared = cls(None)
+            _SHARED[cls] = shared
+
+        return shared
+
+    @classmethod
+    def __shared_method__(cls, method: str) -> Callable[..., Any]:
+        """Method of the shared route, takes the socket as the first
+        argument"""
+        shared = cls.__shared__()
+
+        if isinstance(shared, RoutePool):
+            return shared.method(method)
+
+        return shared(method)
+
 
 class Route(RouteBase):
     def _method_lookup(self, method):
@@ -126,6 +335,15 @@ class PrefixRoute(Route):
     def _method_lookup(self, method):
         return super()._method_lookup(self.PREFIX + method)
 
+    @classmethod
+    def __public_methods__(cls) -> Iterable[str]:
+        prefix_length = len(cls.PREFIX)
+        return tuple(
+            name[prefix_length:]
+            for name in super().__public_methods__()
+            if name.startswith(cls.PREFIX)
+        )
+
 
 class WebSocketRoute(AllowedRoute):
     @classmethod
@@ -133,4 +351,13 @@ class WebSocketRoute(AllowedRoute):
         return decorators.noproxy(func)
 
 
-__all__ = ("RouteBase", "Route", "WebSocketRoute", "AllowedRoute", "decorators")
+__all__ = (
+    "AllowedRoute",
+    "PrefixRoute",
+    "Route",
+    "RouteBase",
+    "RoutePool",
+    "RouteScope",
+    "WebSocketRoute",
+    "decorators",
+)
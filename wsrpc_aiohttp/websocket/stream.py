@@ -0,0 +1,233 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+
+class StreamWindow:
+    """Credit of the streamed call on the executing side.
+
+    Every sent chunk takes one credit, the caller returns the credits
+    with the ``{"id": serial, "credit": n}`` frames as it consumes the
+    chunks, so no more than the granted credit is buffered by the caller.
+    """
+
+    __slots__ = ("credit", "cancelled", "_waiter")
+
+    def __init__(self, credit: int):
+        self.credit = max(int(credit), 1)
+        self.cancelled = False
+        self._waiter: Optional[asyncio.Future] = None
+
+    def update(self, data: Dict[str, Any]) -> None:
+        if data.get("cancel"):
+            self.cancelled = True
+        else:
+            self.credit += int(data.get("credit") or 0)
+
+        self._wake()
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def acquire(self) -> bool:
+        """Takes one credit, returns ``False`` when the caller
+        cancelled the stream"""
+        while not self.cancelled and self.credit <= 0:
+            self._waiter = asyncio.get_event_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+        if self.cancelled:
+            return False
+
+        self.credit -= 1
+        return True
+
+
+class CallStream:
+    """Asynchronous iterator over the chunks of the streamed call.
+
+    The call is sent on the first iteration. The executing side sends the
+    items of the generator returned by the route as the chunk frames, and
+    a value returned by a regular route is yielded as is (lists are
+    yielded item by item).
+
+    .. code-block:: python
+
+        async with client.stream("reports.rows", since=yesterday) as rows:
+            async for row in rows:
+                process(row)
+    """
+
+    __slots__ = (
+        "_socket",
+        "_method",
+        "_params",
+        "_credit",
+        "_timeout",
+        "_serial",
+        "_buffer",
+        "_waiter",
+        "_consumed",
+        "_done",
+        "_exception",
+    )
+
+    def __init__(
+        self,
+        socket: Any,
+        method: str,
+        params: Dict[str, Any],
+        credit: int,
+        timeout: Optional[float] = None,
+    ):
+        self._socket = socket
+        self._method = method
+        self._params = params
+        self._credit = max(int(credit), 1)
+        self._timeout = timeout
+        self._serial: Optional[int] = None
+        self._buffer: Deque[Any] = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._consumed = 0
+        self._done = False
+        self._exception: Optional[BaseException] = None
+
+    @property
+    def serial(self) -> Optional[int]:
+        return self._serial
+
+    @property
+    def buffered(self) -> int:
+        """How many received chunks were not consumed yet"""
+        return len(self._buffer)
+
+    async def _start(self) -> None:
+        socket = self._socket
+        self._serial = socket._get_serial()
+        socket._streams[self._serial] = self
+
+        try:
+            await socket._send(
+                id=self._serial,
+                method=self._method,
+                params=self._params,
+                stream=self._credit,
+            )
+        except BaseException:
+            self._finish()
+            raise
+
+    def feed(self, data: Dict[str, Any]) -> None:
+        """Handles the chunk, end or result frame of the stream"""
+        if self._done:
+            return
+
+        if "chunk" in data:
+            self._buffer.append(data["chunk"])
+        elif "result" in data:
+            # The route returned a regular value
+            result = data["result"]
+            if isinstance(result, list):
+                self._buffer.extend(result)
+            else:
+                self._buffer.append(result)
+            self._close()
+        elif data.get("end"):
+            self._close()
+
+        self._wake()
+
+    def feed_exception(self, exc: BaseException) -> None:
+        self._close(exc)
+        self._wake()
+
+    def _close(self, exc: Optional[BaseException] = None) -> None:
+        self._done = True
+        self._exception = exc
+        self._finish()
+
+    def _finish(self) -> None:
+        if self._serial is not None:
+            self._socket._streams.pop(self._serial, None)
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def __aiter__(self) -> "CallStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._serial is None:
+            await self._start()
+
+        while not self._buffer:
+            if self._done:
+                if self._exception is not None:
+                    raise self._exception
+                raise StopAsyncIteration
+
+            self._waiter = asyncio.get_event_loop().create_future()
+            try:
+                if self._timeout is None:
+                    await self._waiter
+                else:
+                    await asyncio.wait_for(self._waiter, self._timeout)
+            except BaseException:
+                await self.aclose()
+                raise
+            finally:
+                self._waiter = None
+
+        item = self._buffer.popleft()
+        self._consumed += 1
+
+        # Credits are returned by the halves of the window
+        if not self._done and self._consumed * 2 >= self._credit:
+            consumed, self._consumed = self._consumed, 0
+            await self._socket._send(id=self._serial, credit=consumed)
+
+        return item
+
+    async def aclose(self) -> None:
+        """Stops the stream, the executing side closes the generator"""
+        if self._done:
+            return
+
+        self._close()
+
+        if self._serial is None:
+            return
+
+        try:
+            await self._socket._send(id=self._serial, cancel=True)
+        except Exception:
+            log.debug("Failed to cancel the stream #%r", self._serial)
+
+    async def __aenter__(self) -> "CallStream":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
+
+    def __repr__(self):
+        return "<{0}: #{1} {2} buffered={3}>".format(
+            self.__class__.__name__,
+            self._serial,
+            self._method,
+            len(self._buffer),
+        )
+
+
+__all__ = ("CallStream", "StreamWindow")
@@ -1,6 +1,8 @@
 import asyncio
 import base64
+import inspect
 from functools import singledispatch, wraps
+from typing import List, Optional, Set
 
 
 class Lazy:
@@ -55,6 +57,38 @@ class Singleton(metaclass=SingletonMeta):
         return cls.__instance__
 
 
+class RecentSerials:
+    """Bounded set of the recently seen serials. When the capacity is
+    exceeded the oldest serial is forgotten."""
+
+    __slots__ = ("_ring", "_seen", "_position")
+
+    def __init__(self, size: int):
+        self._ring: List[Optional[int]] = [None] * size
+        self._seen: Set[int] = set()
+        self._position = 0
+
+    def __contains__(self, serial: int) -> bool:
+        return serial in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def add(self, serial: int) -> bool:
+        """Remembers the serial, returns ``False`` if it was seen before"""
+        if serial in self._seen:
+            return False
+
+        oldest = self._ring[self._position]
+        if oldest is not None:
+            self._seen.discard(oldest)
+
+        self._ring[self._position] = serial
+        self._seen.add(serial)
+        self._position = (self._position + 1) % len(self._ring)
+        return True
+
+
 def awaitable(func):
     if asyncio.iscoroutinefunction(func):
         return func
@@ -63,16 +97,12 @@ def awaitable(func):
     async def wrap(*args, **kwargs):
         result = func(*args, **kwargs)
 
-        is_awaitable = (
-            asyncio.iscoroutine(result)
-            or asyncio.isfuture(result)
-            or hasattr(result, "__await__")
-        )
-        if is_awaitable:
+        # Generators are not awaitable, they are returned as is
+        if inspect.isawaitable(result):
             return await result
         return result
 
     return wrap
 
 
-__all__ = ("Lazy", "Singleton", "awaitable", "serializer")
+__all__ = ("Lazy", "RecentSerials", "Singleton", "awaitable", "serializer")
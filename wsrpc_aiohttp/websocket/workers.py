@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from collections import deque
+from contextvars import Context, copy_context
+from typing import Any, Awaitable, Callable, Deque, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Function, its arguments and the context of the submitter, the new
+# worker already runs in the copy of it, so it is None then
+JobType = Tuple[Callable[..., Awaitable[Any]], Tuple[Any, ...], Any]
+# Worker waiting for the next call and since when it waits
+IdleType = Tuple[asyncio.Future, float]
+
+
+class _InContext:
+    """Awaitable which executes every step of the coroutine in the
+    context, so the reused worker isolates the calls like the separate
+    tasks would"""
+
+    __slots__ = ("_coro", "_context")
+
+    def __init__(self, coro, context: Context):
+        self._coro = coro
+        self._context = context
+
+    def __await__(self):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._context.run(self._coro.send, None)
+
+    def send(self, value):
+        return self._context.run(self._coro.send, value)
+
+    def throw(self, *args):
+        return self._context.run(self._coro.throw, *args)
+
+    def close(self):
+        return self._context.run(self._coro.close)
+
+
+class CallWorkers:
+    """Tasks executing the incoming calls of one connection.
+
+    The worker which finished the call picks up the next one instead of
+    exiting, so the connection with the steady flow of the calls reuses a
+    few tasks instead of creating the task per call. The worker waits for
+    the next call up to ``idle_timeout`` seconds, the falsy value makes
+    every worker execute exactly one call.
+
+    Workers are not limited in number, the concurrency is limited by the
+    admission control before the call is submitted. Every call runs in
+    the copy of the submitter's context, as the separate task would, so
+    context variables set by a call are not visible to the next ones.
+    """
+
+    __slots__ = (
+        "idle_timeout",
+        "spawned",
+        "executed",
+        "_spawn",
+        "_idle",
+        "_sweeper",
+        "_workers",
+    )
+
+    def __init__(
+        self,
+        spawn: Callable[[Awaitable[Any]], "asyncio.Task"],
+        idle_timeout: float = 1,
+    ):
+        self.idle_timeout = idle_timeout
+        # Counters of the created tasks and of the executed calls
+        self.spawned = 0
+        self.executed = 0
+
+        self._spawn = spawn
+        # Workers waiting for the next call, the last one is reused
+        # first, so the surplus workers stay on the left and time out
+        self._idle: Deque[IdleType] = deque()
+        # Single timer which expires the idle workers, instead of
+        # the timer per call
+        self._sweeper: Optional[asyncio.TimerHandle] = None
+        self._workers = 0
+
+    @property
+    def size(self) -> int:
+        return self._workers
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def submit(self, func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        """Executes ``await func(*args)`` in the idle or in the new worker"""
+        idle = self._idle
+
+        while idle:
+            waiter, _ = idle.pop()
+            if not waiter.done():
+                waiter.set_result((func, args, copy_context()))
+                return
+
+        self._workers += 1
+        self.spawned += 1
+        self._spawn(self._work(func, args))
+
+    def _sweep(self) -> None:
+        self._sweeper = None
+        idle = self._idle
+
+        if not idle:
+            return
+
+        loop = idle[0][0].get_loop()
+        expires = loop.time() - self.idle_timeout
+
+        while idle and idle[0][1] <= expires:
+            waiter, _ = idle.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+        if idle:
+            self._sweeper = loop.call_at(
+                idle[0][1] + self.idle_timeout, self._sweep
+            )
+
+    async def _next(self) -> Optional[JobType]:
+        loop = asyncio.get_event_loop()
+        waiter = loop.create_future()
+        item = (waiter, loop.time())
+        self._idle.append(item)
+
+        if self._sweeper is None:
+            self._sweeper = loop.call_later(self.idle_timeout, self._sweep)
+
+        try:
+            return await waiter
+        finally:
+            if not waiter.done():
+                self._idle.remove(item)
+
+    async def _work(self, func, args) -> None:
+        job: Optional[JobType] = (func, args, None)
+
+        try:
+            while job is not None:
+                func, args, context = job
+
+                try:
+                    if context is None:
+                        await func(*args)
+                    else:
+                        await _InContext(func(*args), context)
+                except Exception:
+                    log.exception("Unhandled exception in %r", func)
+
+                self.executed += 1
+
+                if not self.idle_timeout:
+                    return
+
+                job = await self._next()
+        finally:
+            self._workers -= 1
+
+    def __repr__(self):
+        return "<{0}: size={1} idle={2} spawned={3} executed={4}>".format(
+            self.__class__.__name__,
+            self._workers,
+            len(self._idle),
+            self.spawned,
+            self.executed,
+        )
+
+
+__all__ = ("CallWorkers",)
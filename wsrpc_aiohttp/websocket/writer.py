@@ -0,0 +1,283 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Iterable, List, Optional, Tuple
+
+from .abc import FrameType
+
+# Frame or payload, whether it is the payload, future of the sender
+QueueItemType = Tuple[Any, bool, asyncio.Future]
+
+
+class FrameWriter:
+    """Outgoing frames queue of the connection.
+
+    Frames are written by the single writer, so the concurrent senders
+    never interleave their writes and do not contend for a lock. The
+    sender which finds the writer idle writes its frame right away, the
+    frames sent meanwhile are queued and written back to back by the
+    writer task which is started after it. Every sender waits until its
+    own frame is written and receives the error of the write.
+
+    With ``coalesce`` the queued payloads are merged into the batch
+    frames of up to ``max_batch`` items, and ``window`` delays the writer
+    task for the given seconds (corking), so more payloads are merged.
+
+    The queue depth is the backpressure signal, the senders wait for the
+    capacity when ``max_size`` frames are queued.
+    """
+
+    __slots__ = (
+        "max_size",
+        "max_batch",
+        "coalesce",
+        "window",
+        "written",
+        "_owner",
+        "_queue",
+        "_busy",
+        "_task",
+        "_waiters",
+    )
+
+    def __init__(
+        self,
+        owner: Any,
+        max_size: Optional[int] = 1024,
+        coalesce: bool = False,
+        window: float = 0,
+        max_batch: int = 256,
+    ):
+        # Owner provides _write_frame, _encode, _create_task and _loop
+        self._owner = owner
+        self.max_size = max_size
+        self.max_batch = max(max_batch, 1)
+        self.coalesce = coalesce
+        self.window = window
+        # Counter of the written frames
+        self.written = 0
+
+        # Created when the frame has to be queued for the first time
+        self._queue: Optional[Deque[QueueItemType]] = None
+        self._busy = False
+        self._task: Optional[asyncio.Task] = None
+        self._waiters: Optional[List[asyncio.Future]] = None
+
+    @property
+    def depth(self) -> int:
+        """Gauge of the frames waiting for the writer"""
+        return len(self._queue) if self._queue else 0
+
+    def __len__(self) -> int:
+        return self.depth
+
+    @property
+    def idle(self) -> bool:
+        return not self._busy and not self._queue
+
+    def is_full(self) -> bool:
+        if not self.max_size:
+            return False
+        return self.depth >= self.max_size
+
+    async def wait_capacity(self) -> None:
+        """Waits until the frame might be queued without exceeding
+        the ``max_size``"""
+        while self.is_full():
+            await self._wait()
+
+    async def drain(self) -> None:
+        """Waits until all queued frames are written"""
+        while not self.idle:
+            await self._wait()
+
+    async def _wait(self) -> None:
+        future = self._owner._loop.create_future()
+        if self._waiters is None:
+            self._waiters = []
+        self._waiters.append(future)
+
+        try:
+            await future
+        finally:
+            waiters = self._waiters
+            if not future.done() and waiters and future in waiters:
+                waiters.remove(future)
+
+    def _wake(self) -> None:
+        waiters, self._waiters = self._waiters, None
+
+        for waiter in waiters or ():
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def send(self, frame: FrameType) -> None:
+        """Writes the encoded frame"""
+        if self._busy or self._queue:
+            await self._enqueue(frame, False)
+            return
+
+        # Nobody writes, so the frame is written without queueing
+        self._busy = True
+        try:
+            await self._owner._write_frame(frame)
+            self.written += 1
+        finally:
+            self._release()
+
+    def send_nowait(self, frame: FrameType) -> asyncio.Future:
+        """Queues the encoded frame and returns the future resolved when
+        it is written. When the queue is full the frame waits for the
+        capacity in the task, the caller does not wait in either case."""
+        if self.is_full():
+            return self._owner._create_task(self.send(frame))
+
+        future = self._owner._loop.create_future()
+        if self._queue is None:
+            self._queue = deque()
+        self._queue.append((frame, False, future))
+
+        if not self._busy:
+            self._start()
+
+        return future
+
+    async def send_payload(self, payload: Any) -> None:
+        """Encodes and writes the payload, with ``coalesce`` the payload
+        is merged with the other queued ones"""
+        if not self.coalesce:
+            await self.send(self._owner._encode(payload))
+            return
+
+        await self._enqueue(payload, True)
+
+    async def _enqueue(self, item: Any, is_payload: bool) -> None:
+        if self.is_full():
+            await self.wait_capacity()
+
+        future = self._owner._loop.create_future()
+        if self._queue is None:
+            self._queue = deque()
+        self._queue.append((item, is_payload, future))
+
+        if not self._busy:
+            self._start()
+
+        await future
+
+    def _release(self) -> None:
+        if self._queue:
+            self._start()
+            return
+
+        self._busy = False
+        if self._waiters:
+            self._wake()
+
+    def _start(self) -> None:
+        self._busy = True
+        self._task = self._owner._create_task(self._run())
+
+    async def _run(self) -> None:
+        queue: Deque[QueueItemType] = self._queue  # type: ignore
+
+        try:
+            if self.coalesce and self.window:
+                await asyncio.sleep(self.window)
+
+            while queue:
+                if self.coalesce and queue[0][1]:
+                    await self._write_batch()
+                else:
+                    frame, _, future = queue.popleft()
+                    await self._write(frame, (future,))
+
+                if self._waiters:
+                    self._wake()
+        finally:
+            self._task = None
+            self._busy = False
+            # Not empty only when the writer was cancelled
+            self.fail(ConnectionError("Connection closed"))
+
+            if self._waiters:
+                self._wake()
+
+    async def _write_batch(self) -> None:
+        queue: Deque[QueueItemType] = self._queue  # type: ignore
+        items: List[QueueItemType] = []
+
+        while queue and queue[0][1] and len(items) < self.max_batch:
+            items.append(queue.popleft())
+
+        encode = self._owner._encode
+        payloads = [payload for payload, _, _ in items]
+
+        try:
+            frame = encode(payloads[0] if len(payloads) == 1 else payloads)
+        except Exception:
+            # Only the sender of the broken payload receives the error
+            for payload, _, future in items:
+                try:
+                    frame = encode(payload)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+
+                await self._write(frame, (future,))
+            return
+
+        await self._write(frame, [future for _, _, future in items])
+
+    async def _write(
+        self, frame: FrameType, futures: Iterable[asyncio.Future]
+    ) -> None:
+        try:
+            await self._owner._write_frame(frame)
+        except asyncio.CancelledError:
+            self._reject(futures, ConnectionError("Connection closed"))
+            raise
+        except Exception as e:
+            self._reject(futures, e)
+            return
+
+        self.written += 1
+
+        for future in futures:
+            if not future.done():
+                future.set_result(None)
+
+    @staticmethod
+    def _reject(futures: Iterable[asyncio.Future], exc: BaseException) -> None:
+        for future in futures:
+            if not future.done():
+                future.set_exception(exc)
+
+    def fail(self, exc: BaseException) -> None:
+        """Rejects the queued frames"""
+        queue = self._queue
+
+        while queue:
+            _, _, future = queue.popleft()
+            if not future.done():
+                future.set_exception(exc)
+
+    def close(self, exc: Optional[BaseException] = None) -> None:
+        """Stops the writer and rejects the queued frames"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        self._busy = False
+        self.fail(exc or ConnectionError("Connection closed"))
+
+        if self._waiters:
+            self._wake()
+
+    def __repr__(self):
+        return "<{0}: depth={1} written={2}>".format(
+            self.__class__.__name__, self.depth, self.written
+        )
+
+
+__all__ = ("FrameWriter",)